@@ -0,0 +1,3 @@
+"""Analytics kernels and caches for Playwisee."""
+
+__all__ = ["approx", "backends", "benchmarks", "cache", "cube", "entities", "filters", "kpis", "legs", "merge", "montecarlo", "risk", "rollups", "stores", "tickets"]
@@ -0,0 +1,211 @@
+"""Sample-based first view of very large histories.
+
+Grouping millions of legs into tickets and rollups takes a while. For large
+frames the dashboard first renders estimates from a stratified ticket sample,
+then swaps in exact values once the full pipeline finishes in the background.
+
+Tickets are sampled whole (all of their legs) by thresholding a hash of the
+ticket keys, so no groupby over the full frame is needed. Strata are month x
+product; every stratum is sampled at the base rate or at a rate that keeps at
+least ``MIN_ROWS_PER_STRATUM`` rows, whichever is higher. Estimates are
+Horvitz-Thompson sums weighted by ``1 / rate`` and confidence intervals use
+the linearized variance of a ratio under Poisson sampling. The sample has a
+fixed target size, so the first view costs one hashing pass plus work on a
+bounded number of tickets however large the file is.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from analytics.rollups import period_start, pick_granularity
+from analytics.tickets import TICKET_KEYS, group_tickets
+
+# Frames with at least this many canonical rows get the sampled first view.
+APPROX_MIN_ROWS = int(os.environ.get("PLAYWISE_APPROX_ROWS", "250000"))
+
+SAMPLE_ROWS = 50_000
+MIN_ROWS_PER_STRATUM = 200
+
+# Two-sided 95% normal quantile.
+CI_Z = 1.96
+
+_HASH_SCALE = float(2**64)
+
+
+@dataclass
+class ApproxSummary:
+    roi: float
+    roi_ci: float
+    win_rate: float
+    win_rate_ci: float
+    stake: int
+    profit: int
+    tickets: int
+    sampled_tickets: int
+    sampled_rows: int
+    total_rows: int
+
+
+@dataclass
+class Approximation:
+    summary: ApproxSummary
+    by_product: pd.DataFrame
+    by_ticket: pd.DataFrame
+    curve: pd.DataFrame
+
+
+def _month_codes(dates: pd.Series) -> np.ndarray:
+    return dates.to_numpy(dtype="datetime64[ns]").astype("datetime64[M]").astype(np.int64)
+
+
+def stratified_sample(
+    df: pd.DataFrame,
+    sample_rows: int = SAMPLE_ROWS,
+    min_rows_per_stratum: int = MIN_ROWS_PER_STRATUM,
+) -> pd.DataFrame:
+    """Return sampled tickets with a ``weight`` column (inverse inclusion rate).
+
+    Args:
+        df: Canonical rows (legs or bets) with the ticket key columns.
+        sample_rows: Target number of sampled rows across all strata.
+        min_rows_per_stratum: Rows kept from each month/product stratum even
+            when the base rate would leave it nearly empty.
+    """
+
+    # Integer stratum ids (month * n_products + product) keep this to a couple
+    # of vectorized passes over the full frame.
+    product_codes, products = pd.factorize(df["product"], use_na_sentinel=False)
+    strata = _month_codes(df["date"]) * len(products) + product_codes
+    codes, uniques = pd.factorize(strata)
+    counts = np.bincount(codes, minlength=len(uniques))
+
+    base_rate = min(sample_rows / max(len(df), 1), 1.0)
+    rates = np.clip(np.maximum(base_rate, min_rows_per_stratum / np.maximum(counts, 1)), 0.0, 1.0)
+
+    # Every leg of a ticket shares its hash and stratum, so tickets are kept whole.
+    hashes = pd.util.hash_pandas_object(df[TICKET_KEYS], index=False).to_numpy()
+    keep = hashes / _HASH_SCALE < rates[codes]
+
+    sample = group_tickets(df[keep])
+    sample_strata = _month_codes(sample["date"]) * len(products) + products.get_indexer(sample["product"])
+    stratum = pd.Index(uniques).get_indexer(sample_strata)
+    sample["weight"] = 1.0 / rates[stratum]
+    sample.attrs["sampled_rows"] = int(keep.sum())
+    return sample
+
+
+def ratio_estimate(y: np.ndarray, x: np.ndarray, weight: np.ndarray) -> Tuple[float, float]:
+    """Weighted ratio ``sum(w*y) / sum(w*x)`` and its 95% half-width."""
+
+    total_x = float(np.dot(weight, x))
+    if total_x <= 0:
+        return 0.0, 0.0
+    ratio = float(np.dot(weight, y)) / total_x
+    residual = y - ratio * x
+    variance = float(np.dot(weight * (weight - 1.0), residual**2)) / total_x**2
+    return ratio, CI_Z * float(np.sqrt(max(variance, 0.0)))
+
+
+def estimate_summary(sample: pd.DataFrame, total_rows: int) -> ApproxSummary:
+    weight = sample["weight"].to_numpy(dtype=float)
+    bets = sample["bets"].to_numpy(dtype=float)
+    profit = sample["Profit"].to_numpy(dtype=float)
+    won = (sample["wins"].to_numpy() > 0).astype(float)
+
+    roi, roi_ci = ratio_estimate(profit, bets, weight)
+    win_rate, win_rate_ci = ratio_estimate(won, np.ones_like(won), weight)
+    return ApproxSummary(
+        roi=roi * 100,
+        roi_ci=roi_ci * 100,
+        win_rate=win_rate * 100,
+        win_rate_ci=win_rate_ci * 100,
+        stake=int(round(np.dot(weight, bets))),
+        profit=int(round(np.dot(weight, profit))),
+        tickets=int(round(weight.sum())),
+        sampled_tickets=len(sample),
+        sampled_rows=int(sample.attrs.get("sampled_rows", len(sample))),
+        total_rows=total_rows,
+    )
+
+
+def weighted_breakdown(sample: pd.DataFrame, column: str) -> pd.DataFrame:
+    """Estimated stake/return/profit (cents) and ROI % with CI per ``column`` value."""
+
+    frame = pd.DataFrame(
+        {
+            column: sample[column],
+            "w": sample["weight"],
+            "stake": sample["weight"] * sample["bets"],
+            "ret": sample["weight"] * sample["wins"],
+        }
+    )
+    totals = frame.groupby(column)[["stake", "ret"]].sum()
+    ratio = np.where(totals["stake"] > 0, (totals["ret"] - totals["stake"]) / totals["stake"], 0.0)
+
+    residual = sample["Profit"] - sample[column].map(pd.Series(ratio, index=totals.index)) * sample["bets"]
+    spread = (frame["w"] * (frame["w"] - 1.0) * residual**2).groupby(frame[column]).sum()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        half_width = np.where(
+            totals["stake"] > 0, CI_Z * np.sqrt(spread.to_numpy()) / totals["stake"], 0.0
+        )
+
+    return pd.DataFrame(
+        {
+            "stake": totals["stake"].round().astype(np.int64),
+            "ret": totals["ret"].round().astype(np.int64),
+            "profit": (totals["ret"] - totals["stake"]).round().astype(np.int64),
+            "roi": ratio * 100,
+            "roi ±": half_width * 100,
+        },
+        index=totals.index,
+    )
+
+
+def weighted_curve(sample: pd.DataFrame) -> pd.DataFrame:
+    """Estimated cumulative profit (cents) per rollup period."""
+
+    if sample.empty:
+        return pd.DataFrame(columns=["date", "Profit", "CumProfit"])
+    granularity = pick_granularity(sample["date"].min(), sample["date"].max())
+    curve = (
+        pd.DataFrame(
+            {
+                "date": period_start(sample["date"], granularity),
+                "Profit": sample["weight"] * sample["Profit"],
+            }
+        )
+        .groupby("date", as_index=False)
+        .sum()
+    )
+    return curve.assign(CumProfit=curve["Profit"].cumsum())
+
+
+def approximate_dashboard(df: pd.DataFrame) -> Approximation:
+    """Sample ``df`` once and derive the first-view KPIs, breakdowns and curve."""
+
+    sample = stratified_sample(df)
+    return Approximation(
+        summary=estimate_summary(sample, len(df)),
+        by_product=weighted_breakdown(sample, "product"),
+        by_ticket=weighted_breakdown(sample, "ticket type"),
+        curve=weighted_curve(sample),
+    )
+
+
+__all__ = [
+    "APPROX_MIN_ROWS",
+    "ApproxSummary",
+    "Approximation",
+    "approximate_dashboard",
+    "estimate_summary",
+    "ratio_estimate",
+    "stratified_sample",
+    "weighted_breakdown",
+    "weighted_curve",
+]
@@ -0,0 +1,254 @@
+"""Second-level storage backends for :class:`analytics.cache.FrameCache`.
+
+The in-memory LRU in ``FrameCache`` is per process. A backend sits behind it:
+
+* ``spill`` (default) keeps entries evicted from memory in a local directory
+  and reloads them on demand. Only the owning process writes there.
+* ``disk`` shares a directory between worker processes. Every built value is
+  written through, so a worker can reuse frames another worker parsed.
+* ``sqlite`` shares a single SQLite file between workers with the same
+  write-through behaviour. It suits deployments with several Streamlit
+  servers behind a local load balancer.
+* ``memory`` disables the second level entirely.
+
+Select one with ``PLAYWISE_CACHE_BACKEND``. ``PLAYWISE_CACHE_DIR`` and
+``PLAYWISE_CACHE_PATH`` point the directory and SQLite backends at their
+storage. The default locations sit in a per-user ``0700`` directory under the
+system temp dir. Cached values are pickles, so a directory or file owned by
+another user, or a directory others can write to, is never read.
+"""
+
+from __future__ import annotations
+
+import abc
+import getpass
+import hashlib
+import os
+import pickle
+import shutil
+import sqlite3
+import stat
+import tempfile
+import threading
+import weakref
+from pathlib import Path
+from typing import Any, Hashable
+
+# ``None`` on platforms without POSIX ownership; those skip the owner checks.
+_UID = os.getuid() if hasattr(os, "getuid") else None
+_USER = str(_UID) if _UID is not None else getpass.getuser()
+
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get("PLAYWISE_CACHE_DIR", os.path.join(tempfile.gettempdir(), f"playwise-cache-{_USER}"))
+)
+DEFAULT_SQLITE_PATH = Path(
+    os.environ.get("PLAYWISE_CACHE_PATH", str(DEFAULT_CACHE_DIR / "frames.sqlite"))
+)
+
+MISSING = object()
+
+
+def _key_name(key: Hashable) -> str:
+    return hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+
+
+def _owned(info: os.stat_result) -> bool:
+    return _UID is None or info.st_uid == _UID
+
+
+def _secure_directory(directory: Path) -> bool:
+    """Create ``directory`` (mode ``0700``) and check that only this user controls it."""
+
+    try:
+        directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        info = os.lstat(directory)
+    except OSError:
+        return False
+    return stat.S_ISDIR(info.st_mode) and _owned(info) and not info.st_mode & 0o022
+
+
+class CacheBackend(abc.ABC):
+    """Interface for storage shared behind the in-memory LRU.
+
+    ``shared`` backends are written through on every build so other worker
+    processes can read the value; private ones only receive evicted entries.
+    """
+
+    shared = False
+
+    @abc.abstractmethod
+    def load(self, key: Hashable) -> Any:
+        """Return the stored value, or ``MISSING`` if it is absent or unreadable."""
+
+    @abc.abstractmethod
+    def contains(self, key: Hashable) -> bool:
+        """Whether a value is stored under ``key``."""
+
+    @abc.abstractmethod
+    def store(self, key: Hashable, value: Any) -> None:
+        """Persist ``value``; failures are swallowed so the cache stays optional."""
+
+    @abc.abstractmethod
+    def discard(self, key: Hashable) -> None:
+        """Remove ``key`` if present."""
+
+
+class DirectoryBackend(CacheBackend):
+    """Pickle files in a directory, one per key."""
+
+    def __init__(self, directory: Path = DEFAULT_CACHE_DIR, shared: bool = False):
+        self.directory = Path(directory)
+        self.shared = shared
+        self._secure: bool | None = None
+
+    @classmethod
+    def temporary(cls, parent: Path = DEFAULT_CACHE_DIR) -> "DirectoryBackend":
+        """A private backend in a fresh directory, removed with the backend or at exit."""
+
+        base = parent if _secure_directory(parent) else None
+        backend = cls(Path(tempfile.mkdtemp(prefix="spill-", dir=base)), shared=False)
+        weakref.finalize(backend, shutil.rmtree, backend.directory, True)
+        return backend
+
+    def _ready(self) -> bool:
+        if self._secure is None:
+            self._secure = _secure_directory(self.directory)
+        return self._secure
+
+    def _path(self, key: Hashable) -> Path:
+        return self.directory / f"{_key_name(key)}.pkl"
+
+    def load(self, key: Hashable) -> Any:
+        if not self._ready():
+            return MISSING
+        path = self._path(key)
+        try:
+            with open(path, "rb") as handle:
+                if not _owned(os.fstat(handle.fileno())):
+                    return MISSING
+                value = pickle.load(handle)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return MISSING
+        return value
+
+    def contains(self, key: Hashable) -> bool:
+        return self._ready() and self._path(key).is_file()
+
+    def store(self, key: Hashable, value: Any) -> None:
+        if not self._ready():
+            return
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "wb") as handle:
+                pickle.dump(value, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except (OSError, pickle.PicklingError):
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+
+    def discard(self, key: Hashable) -> None:
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+
+class SQLiteBackend(CacheBackend):
+    """Pickled values in one SQLite table, shared by every worker process."""
+
+    shared = True
+
+    def __init__(self, path: Path = DEFAULT_SQLITE_PATH, timeout_s: float = 30.0):
+        self.path = Path(path)
+        self.timeout_s = timeout_s
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if not _secure_directory(self.path.parent):
+                raise sqlite3.OperationalError(f"{self.path.parent} is not private to this user")
+            try:
+                if not _owned(os.lstat(self.path)):
+                    raise sqlite3.OperationalError(f"{self.path} belongs to another user")
+            except OSError:
+                pass
+            conn = sqlite3.connect(self.path, timeout=self.timeout_s)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS frames (key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+            )
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    def load(self, key: Hashable) -> Any:
+        try:
+            row = self._connection().execute(
+                "SELECT value FROM frames WHERE key = ?", (_key_name(key),)
+            ).fetchone()
+        except sqlite3.Error:
+            return MISSING
+        if row is None:
+            return MISSING
+        try:
+            return pickle.loads(row[0])
+        except (pickle.UnpicklingError, EOFError):
+            return MISSING
+
+    def contains(self, key: Hashable) -> bool:
+        try:
+            row = self._connection().execute(
+                "SELECT 1 FROM frames WHERE key = ?", (_key_name(key),)
+            ).fetchone()
+        except sqlite3.Error:
+            return False
+        return row is not None
+
+    def store(self, key: Hashable, value: Any) -> None:
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO frames (key, value) VALUES (?, ?)",
+                (_key_name(key), sqlite3.Binary(payload)),
+            )
+            conn.commit()
+        except (sqlite3.Error, pickle.PicklingError):
+            pass
+
+    def discard(self, key: Hashable) -> None:
+        try:
+            conn = self._connection()
+            conn.execute("DELETE FROM frames WHERE key = ?", (_key_name(key),))
+            conn.commit()
+        except sqlite3.Error:
+            pass
+
+
+def make_backend(name: str | None = None) -> CacheBackend | None:
+    """Build the backend named by ``name`` or ``PLAYWISE_CACHE_BACKEND``."""
+
+    name = (name or os.environ.get("PLAYWISE_CACHE_BACKEND", "spill")).strip().lower()
+    if name == "memory":
+        return None
+    if name == "spill":
+        # Per-process directory: spill files are private and removed on load.
+        return DirectoryBackend.temporary(DEFAULT_CACHE_DIR)
+    if name == "disk":
+        return DirectoryBackend(DEFAULT_CACHE_DIR, shared=True)
+    if name == "sqlite":
+        return SQLiteBackend(DEFAULT_SQLITE_PATH)
+    raise ValueError(f"Unknown cache backend: {name}")
+
+
+__all__ = [
+    "CacheBackend",
+    "DirectoryBackend",
+    "MISSING",
+    "SQLiteBackend",
+    "make_backend",
+]
@@ -0,0 +1,409 @@
+"""Community benchmarks built from mergeable summary sketches.
+
+Every imported history is folded into one observation per headline metric
+(average bet size, average odds, win rate, ROI and monthly volume). Each
+metric keeps a count, a sum, exact min/max and a fixed-bin histogram sketch,
+so adding an import is O(1), two stores merge by adding counts, and quantiles
+or a user's percentile can be read back without rescanning anyone's bets.
+
+A history is identified by the earliest ticket of each of its bookmakers, so
+appending to a history or merging it with another one does not count it
+again. Identities are remembered in a fixed-size Bloom filter; a rare false
+positive only skips one observation.
+
+The store is a JSON snapshot (``PLAYWISE_BENCHMARK_PATH``, defaulting to
+``~/.playwise/benchmarks.json``) plus an append-only journal of the imports
+folded since. Recording an import appends one line; the journal is compacted
+into the snapshot every ``JOURNAL_LIMIT`` entries. Loaded stores are cached by
+file stamp and only the new journal lines are replayed.
+"""
+
+from __future__ import annotations
+
+import base64
+import bisect
+import hashlib
+import json
+import math
+import os
+import threading
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping
+
+import numpy as np
+import pandas as pd
+
+from analytics.stores import store_lock, write_json
+
+DEFAULT_BENCHMARK_PATH = Path(
+    os.environ.get("PLAYWISE_BENCHMARK_PATH", "~/.playwise/benchmarks.json")
+).expanduser()
+
+# Below this many imports the sketches are too thin to replace the seed values.
+MIN_BENCHMARK_IMPORTS = 20
+
+# (scale, lower, upper, bins) per metric. Log bins keep relative precision for
+# heavy-tailed positive metrics; linear bins handle bounded or signed ones.
+METRIC_SPECS: Dict[str, tuple] = {
+    "Average Bet Size": ("log", 0.1, 10_000.0, 200),
+    "Average Odds": ("log", 1.01, 1_000.0, 200),
+    "Win Rate": ("linear", 0.0, 100.0, 200),
+    "ROI": ("linear", -100.0, 300.0, 400),
+    "Monthly Volume": ("log", 0.1, 10_000.0, 200),
+}
+
+# Bloom filter of folded history identities: 16 KiB, four probes per identity.
+SEEN_BITS = 1 << 17
+SEEN_PROBES = 4
+
+# Journal entries replayed on load before they are folded into the snapshot.
+JOURNAL_LIMIT = 256
+
+
+def _edges(scale: str, lower: float, upper: float, bins: int) -> List[float]:
+    if scale == "log":
+        return np.geomspace(lower, upper, bins + 1).tolist()
+    return np.linspace(lower, upper, bins + 1).tolist()
+
+
+@dataclass
+class MetricSketch:
+    """Count/sum/min/max plus a fixed-bin histogram for one metric."""
+
+    scale: str
+    lower: float
+    upper: float
+    bins: int
+    count: int = 0
+    total: float = 0.0
+    minimum: float | None = None
+    maximum: float | None = None
+    counts: List[int] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * self.bins
+        self._edges = _edges(self.scale, self.lower, self.upper, self.bins)
+
+    @classmethod
+    def for_metric(cls, label: str) -> "MetricSketch":
+        scale, lower, upper, bins = METRIC_SPECS[label]
+        return cls(scale=scale, lower=lower, upper=upper, bins=bins)
+
+    def _bin(self, value: float) -> int:
+        idx = bisect.bisect_right(self._edges, value) - 1
+        return min(max(idx, 0), self.bins - 1)
+
+    def add(self, value: float) -> None:
+        if value is None or not math.isfinite(value):
+            return
+        self.count += 1
+        self.total += value
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+        self.counts[self._bin(value)] += 1
+
+    def merge(self, other: "MetricSketch") -> None:
+        if (self.scale, self.lower, self.upper, self.bins) != (
+            other.scale,
+            other.lower,
+            other.upper,
+            other.bins,
+        ):
+            raise ValueError("Cannot merge sketches with different bin layouts")
+        self.count += other.count
+        self.total += other.total
+        for bound, pick in (("minimum", min), ("maximum", max)):
+            mine, theirs = getattr(self, bound), getattr(other, bound)
+            setattr(self, bound, theirs if mine is None else mine if theirs is None else pick(mine, theirs))
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+
+    @property
+    def mean(self) -> float | None:
+        return self.total / self.count if self.count else None
+
+    def _bin_bounds(self, idx: int) -> tuple:
+        # Edge bins also hold clipped outliers, so stretch them to the observed
+        # extremes, then clamp every bin to the observed range.
+        low, high = self._edges[idx], self._edges[idx + 1]
+        if self.minimum is not None:
+            if idx == 0:
+                low = min(low, self.minimum)
+            if idx == self.bins - 1:
+                high = max(high, self.maximum)
+            low = max(low, self.minimum)
+            high = min(high, self.maximum)
+        return low, max(low, high)
+
+    def quantile(self, q: float) -> float | None:
+        """Approximate the ``q`` quantile (0–1) by interpolating inside a bin."""
+
+        if not self.count:
+            return None
+        target = min(max(q, 0.0), 1.0) * self.count
+        running = 0
+        for idx, bin_count in enumerate(self.counts):
+            if bin_count and running + bin_count >= target:
+                low, high = self._bin_bounds(idx)
+                return low + (high - low) * ((target - running) / bin_count)
+            running += bin_count
+        return self.maximum
+
+    def percentile_rank(self, value: float | None) -> float | None:
+        """Share (0–100) of observations at or below ``value``."""
+
+        if value is None or not self.count or not math.isfinite(value):
+            return None
+        idx = self._bin(value)
+        below = sum(self.counts[:idx])
+        low, high = self._bin_bounds(idx)
+        within = 1.0 if high <= low else min(max((value - low) / (high - low), 0.0), 1.0)
+        return (below + self.counts[idx] * within) / self.count * 100
+
+    def to_dict(self) -> dict:
+        return {
+            "scale": self.scale,
+            "lower": self.lower,
+            "upper": self.upper,
+            "bins": self.bins,
+            "count": self.count,
+            "total": self.total,
+            "minimum": self.minimum,
+            "maximum": self.maximum,
+            "counts": self.counts,
+        }
+
+
+def _probes(identity: str) -> List[int]:
+    digest = hashlib.blake2b(identity.encode("utf-8"), digest_size=4 * SEEN_PROBES).digest()
+    return [
+        int.from_bytes(digest[i : i + 4], "big") % SEEN_BITS for i in range(0, len(digest), 4)
+    ]
+
+
+def history_identity(tickets: pd.DataFrame) -> List[str]:
+    """Identities of a ticket history: its earliest ticket per bookmaker.
+
+    New tickets are appended after the existing ones, so the identity of a
+    history survives updates and merges with other bookmakers' histories.
+    """
+
+    if tickets.empty:
+        return []
+    dates = tickets["date"]
+    if isinstance(dates.dtype, pd.DatetimeTZDtype):
+        dates = dates.dt.tz_convert(None)
+    if "bookmaker" in tickets.columns:
+        books = tickets["bookmaker"]
+    else:
+        books = pd.Series("", index=tickets.index)
+    first = dates.groupby(books.to_numpy()).idxmin().dropna()
+    return [
+        "|".join(
+            (
+                str(book),
+                dates[idx].isoformat(),
+                str(tickets.at[idx, "bets"]),
+                f"{tickets.at[idx, 'total_odds']:.2f}",
+            )
+        )
+        for book, idx in first.items()
+    ]
+
+
+@dataclass
+class BenchmarkStore:
+    """All metric sketches plus a filter of the histories already folded in."""
+
+    sketches: Dict[str, MetricSketch] = field(default_factory=dict)
+    imports: int = 0
+    seen: bytearray = field(default_factory=lambda: bytearray(SEEN_BITS // 8))
+
+    def __post_init__(self) -> None:
+        for label in METRIC_SPECS:
+            self.sketches.setdefault(label, MetricSketch.for_metric(label))
+
+    def has_seen(self, identities: Iterable[str]) -> bool:
+        """Whether any of ``identities`` was folded before (may rarely be a false positive)."""
+
+        return any(
+            all(self.seen[bit >> 3] & (1 << (bit & 7)) for bit in _probes(identity))
+            for identity in identities
+        )
+
+    def fold(self, identities: Iterable[str], stats: Mapping[str, float | None]) -> bool:
+        """Add one history's headline stats; returns ``False`` if already seen."""
+
+        identities = list(identities)
+        if not identities or self.has_seen(identities):
+            return False
+        for identity in identities:
+            for bit in _probes(identity):
+                self.seen[bit >> 3] |= 1 << (bit & 7)
+        self.imports += 1
+        for label, sketch in self.sketches.items():
+            sketch.add(stats.get(label))
+        return True
+
+    def merge(self, other: "BenchmarkStore") -> None:
+        for label, sketch in other.sketches.items():
+            self.sketches.setdefault(label, MetricSketch.for_metric(label)).merge(sketch)
+        self.imports += other.imports
+        self.seen = bytearray(a | b for a, b in zip(self.seen, other.seen))
+
+    def averages(self, fallback: Mapping[str, float]) -> Dict[str, float]:
+        """Community means, or ``fallback`` until enough imports are folded."""
+
+        if self.imports < MIN_BENCHMARK_IMPORTS:
+            return dict(fallback)
+        return {
+            label: (sketch.mean if sketch.mean is not None else fallback.get(label))
+            for label, sketch in self.sketches.items()
+        }
+
+    def percentiles(self, stats: Mapping[str, float | None]) -> Dict[str, float | None]:
+        if self.imports < MIN_BENCHMARK_IMPORTS:
+            return {}
+        return {
+            label: sketch.percentile_rank(stats.get(label))
+            for label, sketch in self.sketches.items()
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "imports": self.imports,
+            "seen": base64.b64encode(zlib.compress(bytes(self.seen))).decode("ascii"),
+            "sketches": {label: sketch.to_dict() for label, sketch in self.sketches.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> "BenchmarkStore":
+        sketches = {
+            label: MetricSketch(**data)
+            for label, data in payload.get("sketches", {}).items()
+            if label in METRIC_SPECS and tuple(
+                data.get(k) for k in ("scale", "lower", "upper", "bins")
+            ) == METRIC_SPECS[label]
+        }
+        store = cls(sketches=sketches, imports=int(payload.get("imports", 0)))
+        seen = payload.get("seen")
+        # Older stores kept a list of dataset keys; those cannot be carried over.
+        if isinstance(seen, str):
+            bits = zlib.decompress(base64.b64decode(seen))
+            if len(bits) == len(store.seen):
+                store.seen = bytearray(bits)
+        return store
+
+
+@dataclass
+class _LoadedStore:
+    snapshot: tuple | None
+    offset: int
+    entries: int
+    store: BenchmarkStore
+
+
+# Store path -> last loaded store and how much of the journal it has replayed.
+_LOADED: Dict[Path, _LoadedStore] = {}
+_LOADED_LOCK = threading.Lock()
+
+
+def _journal_path(path: Path) -> Path:
+    return path.with_suffix(path.suffix + ".log")
+
+
+def _stamp(path: Path) -> tuple | None:
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    return (info.st_ino, info.st_size, info.st_mtime_ns)
+
+
+def _read_snapshot(path: Path) -> BenchmarkStore:
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            return BenchmarkStore.from_dict(json.load(handle))
+    except (OSError, ValueError, zlib.error):
+        return BenchmarkStore()
+
+
+def _replay(loaded: _LoadedStore, journal: Path) -> None:
+    try:
+        with open(journal, "rb") as handle:
+            handle.seek(loaded.offset)
+            tail = handle.read()
+    except OSError:
+        return
+    # A line still being written by another process is picked up next time.
+    complete = tail[: tail.rfind(b"\n") + 1]
+    for line in complete.splitlines():
+        try:
+            entry = json.loads(line)
+            loaded.store.fold(entry["ids"], entry["stats"])
+        except (ValueError, KeyError, TypeError):
+            continue
+        loaded.entries += 1
+    loaded.offset += len(complete)
+
+
+def load_benchmarks(path: Path = DEFAULT_BENCHMARK_PATH) -> BenchmarkStore:
+    """The local benchmark store, starting empty if it does not exist.
+
+    Unchanged files are served from memory; a grown journal only replays its
+    new lines.
+    """
+
+    with _LOADED_LOCK:
+        snapshot = _stamp(path)
+        journal = _journal_path(path)
+        journal_size = (_stamp(journal) or (None, 0))[1]
+        loaded = _LOADED.get(path)
+        if loaded is None or loaded.snapshot != snapshot or loaded.offset > journal_size:
+            loaded = _LoadedStore(snapshot, 0, 0, _read_snapshot(path))
+            _LOADED[path] = loaded
+        if loaded.offset < journal_size:
+            _replay(loaded, journal)
+        return loaded.store
+
+
+def save_benchmarks(store: BenchmarkStore, path: Path = DEFAULT_BENCHMARK_PATH) -> None:
+    write_json(path, store.to_dict())
+
+
+def record_import(
+    identities: Iterable[str], stats: Mapping[str, float | None], path: Path = DEFAULT_BENCHMARK_PATH
+) -> BenchmarkStore:
+    """Fold one history (see :func:`history_identity`) into the store and return it."""
+
+    identities = list(identities)
+    with store_lock(path):
+        store = load_benchmarks(path)
+        if not identities or store.has_seen(identities):
+            return store
+        entry = json.dumps({"ids": identities, "stats": dict(stats)}) + "\n"
+        journal = _journal_path(path)
+        try:
+            with open(journal, "a", encoding="utf-8") as handle:
+                handle.write(entry)
+            store = load_benchmarks(path)
+            if _LOADED[path].entries >= JOURNAL_LIMIT:
+                # Replays are idempotent, so a crash between these two steps
+                # only leaves entries the snapshot already holds.
+                save_benchmarks(store, path)
+                journal.unlink()
+        except OSError:
+            pass
+        return store
+
+
+__all__ = [
+    "BenchmarkStore",
+    "MetricSketch",
+    "history_identity",
+    "load_benchmarks",
+    "record_import",
+    "save_benchmarks",
+]
@@ -0,0 +1,196 @@
+"""Process-wide cache for canonical frames and their aggregates.
+
+Streamlit runs every browser session in the same Python process. Keeping
+parsed frames in ``st.session_state`` (or in ``st.cache_data``, which hands out
+a copy per call) makes memory grow with the number of sessions, even when they
+all uploaded the same export. Instead, frames and aggregates are stored once in
+a :class:`FrameCache` keyed by a content hash, and sessions only remember the
+key.
+
+Cached values are shared between sessions and must be treated as read-only:
+derive new frames (``assign``, boolean indexing) rather than mutating them in
+place. The cache keeps a global memory budget (``PLAYWISE_CACHE_MB``) with LRU
+eviction. A second-level backend from :mod:`analytics.backends` either holds
+evicted entries until the next hit or, when shared, lets several worker
+processes reuse each other's parsed frames and aggregates.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+import pandas as pd
+
+from analytics.backends import MISSING, CacheBackend, make_backend
+
+DEFAULT_CACHE_BYTES = int(os.environ.get("PLAYWISE_CACHE_MB", "512")) * 1024 * 1024
+
+
+def content_key(source: str, payload: bytes) -> str:
+    """Dataset key for raw uploaded content (file bytes or pasted text)."""
+
+    return f"{source}:{hashlib.sha256(payload).hexdigest()}"
+
+
+def estimate_nbytes(value: Any) -> int:
+    """Best-effort in-memory size of a cached value."""
+
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(v) for v in value.values()) + sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_nbytes(v) for v in value) + sys.getsizeof(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return sum(
+            estimate_nbytes(getattr(value, f.name)) for f in dataclasses.fields(value)
+        ) + sys.getsizeof(value)
+    return sys.getsizeof(value)
+
+
+class FrameCache:
+    """LRU cache with a byte budget in front of an optional storage backend."""
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES, backend: CacheBackend | None = None):
+        self.max_bytes = max_bytes
+        self.backend = backend
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._build_locks: Dict[Hashable, threading.Lock] = {}
+
+    # -- bookkeeping -------------------------------------------------------
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether ``key`` is in memory or in the backend (the value is not loaded)."""
+
+        with self._lock:
+            if key in self._entries:
+                return True
+        return self.backend is not None and self.backend.contains(key)
+
+    def _evict(self) -> None:
+        evicted = []
+        with self._lock:
+            while self._bytes > self.max_bytes and self._entries:
+                key, (value, size) = self._entries.popitem(last=False)
+                self._bytes -= size
+                evicted.append((key, value))
+        # Shared backends already hold every value (written through on put).
+        if self.backend is not None and not self.backend.shared:
+            for key, value in evicted:
+                self.backend.store(key, value)
+
+    def _forget(self, key: Hashable) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    def _remember(self, key: Hashable, value: Any, size: int | None = None) -> Any:
+        size = estimate_nbytes(value) if size is None else size
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+        self._evict()
+        return value
+
+    # -- public API --------------------------------------------------------
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+
+        if self.backend is None:
+            return default
+        value = self.backend.load(key)
+        if value is MISSING:
+            return default
+        size = estimate_nbytes(value)
+        if size > self.max_bytes:
+            # Would be evicted straight away: serve it from the backend each time.
+            return value
+        if not self.backend.shared:
+            # Private spill files are moved back into memory, not kept twice.
+            self.backend.discard(key)
+        return self._remember(key, value, size)
+
+    def put(self, key: Hashable, value: Any) -> Any:
+        if self.backend is not None and self.backend.shared:
+            self.backend.store(key, value)
+        size = estimate_nbytes(value)
+        if size > self.max_bytes:
+            # Larger than the whole budget: only the backend keeps it.
+            self._forget(key)
+            if self.backend is not None and not self.backend.shared:
+                self.backend.store(key, value)
+            return value
+        return self._remember(key, value, size)
+
+    def get_or_build(self, key: Hashable, builder: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, building it once if missing.
+
+        Concurrent sessions asking for the same key wait for a single build
+        instead of each producing their own copy. With a shared backend, a
+        value built by another worker process is loaded instead of rebuilt.
+        """
+
+        value = self.get(key, MISSING)
+        if value is not MISSING:
+            return value
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        with build_lock:
+            value = self.get(key, MISSING)
+            if value is MISSING:
+                value = self.put(key, builder())
+        with self._lock:
+            self._build_locks.pop(key, None)
+        return value
+
+    def discard(self, key: Hashable) -> None:
+        self._forget(key)
+        if self.backend is not None:
+            self.backend.discard(key)
+
+
+_SHARED_CACHE: FrameCache | None = None
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_cache() -> FrameCache:
+    """Return the process-wide cache shared by every Streamlit session."""
+
+    global _SHARED_CACHE
+    with _SHARED_LOCK:
+        if _SHARED_CACHE is None:
+            _SHARED_CACHE = FrameCache(backend=make_backend())
+        return _SHARED_CACHE
+
+
+__all__ = [
+    "FrameCache",
+    "content_key",
+    "estimate_nbytes",
+    "shared_cache",
+]
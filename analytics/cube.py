@@ -0,0 +1,132 @@
+"""Pre-aggregated slice cube for ad-hoc breakdowns.
+
+The cube holds stake, return and ticket counts for every populated combination
+of month x bookmaker x product x ticket type x market group x odds band x leg
+count. It is
+built once per dataset (or filtered view) with one groupby. Any pivot the user
+asks for then rolls up the cube, which has at most a few thousand cells, rather
+than regrouping the raw rows.
+
+Market groups belong to legs, so a ticket with legs in two groups has a cell
+in each. ``stake`` and ``ret`` are split by leg and add up across groups.
+``tickets`` counts ticket/group pairs, and ``primary`` counts each ticket
+once, in its first group. :func:`rollup_cube` picks the right count depending
+on whether market group is part of the pivot.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from analytics.filters import ODDS_BANDS, leg_bucket, odds_band
+from analytics.rollups import period_start
+from analytics.tickets import ticket_positions
+
+CUBE_DIMENSIONS = ["month", "bookmaker", "product", "ticket type", "market_group", "odds band", "legs"]
+
+DIMENSION_LABELS = {
+    "month": "Month",
+    "bookmaker": "Bookmaker",
+    "product": "Product",
+    "ticket type": "Ticket type",
+    "market_group": "Market group",
+    "odds band": "Odds band",
+    "legs": "Legs",
+}
+
+ODDS_BAND_LABELS = [label for label, _, _ in ODDS_BANDS]
+
+# Cells for tickets from frames cached before the bookmaker column existed.
+UNKNOWN_BOOKMAKER = "Unknown"
+
+# Cells for tickets whose rows carry no market information.
+UNGROUPED_MARKETS = "All markets"
+
+
+def build_cube(tickets: pd.DataFrame, rows: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate ``tickets`` (``group_tickets`` output) and its rows into the cube.
+
+    Money stays in integer cents like the canonical schema.
+    """
+
+    attributes = pd.DataFrame(
+        {
+            "month": period_start(tickets["date"], "month"),
+            "bookmaker": (
+                tickets["bookmaker"].astype(str)
+                if "bookmaker" in tickets.columns
+                else UNKNOWN_BOOKMAKER
+            ),
+            "product": tickets["product"].astype(str),
+            "ticket type": tickets["ticket type"].astype(str),
+            "odds band": pd.Categorical(
+                odds_band(tickets["total_odds"]), categories=ODDS_BAND_LABELS, ordered=True
+            ),
+            "legs": leg_bucket(tickets["legs"]),
+        }
+    ).reset_index(drop=True)
+
+    if "market_group" in rows.columns and not rows.empty:
+        ticket_of_row = ticket_positions(rows)
+        valid = ticket_of_row >= 0
+        pairs = (
+            pd.DataFrame(
+                {
+                    "ticket": ticket_of_row[valid],
+                    "market_group": rows["market_group"].to_numpy()[valid],
+                    "stake": rows["bets"].to_numpy()[valid],
+                    "ret": rows["wins"].to_numpy()[valid],
+                }
+            )
+            .groupby(["ticket", "market_group"], as_index=False, sort=False)
+            .sum()
+        )
+        cells = attributes.take(pairs["ticket"].to_numpy()).reset_index(drop=True).assign(
+            market_group=pairs["market_group"].astype(str),
+            stake=pairs["stake"],
+            ret=pairs["ret"],
+            tickets=1,
+            primary=(~pairs["ticket"].duplicated()).astype(np.int64),
+        )
+    else:
+        cells = attributes.assign(
+            market_group=UNGROUPED_MARKETS,
+            stake=tickets["bets"].to_numpy(),
+            ret=tickets["wins"].to_numpy(),
+            tickets=1,
+            primary=1,
+        )
+
+    return cells.groupby(CUBE_DIMENSIONS, as_index=False, sort=True, observed=True)[
+        ["stake", "ret", "tickets", "primary"]
+    ].sum()
+
+
+def rollup_cube(cube: pd.DataFrame, dimensions: Sequence[str]) -> pd.DataFrame:
+    """Roll the cube up to ``dimensions`` with stake/return/profit and ROI %."""
+
+    dimensions = [dim for dim in dimensions if dim in CUBE_DIMENSIONS]
+    if not dimensions:
+        raise ValueError("Pick at least one cube dimension to break down by.")
+
+    count = "tickets" if "market_group" in dimensions else "primary"
+    table = (
+        cube.groupby(dimensions, sort=True, observed=True)[["stake", "ret", count]]
+        .sum()
+        .rename(columns={count: "tickets"})
+    )
+    return table.assign(
+        profit=table["ret"] - table["stake"],
+        roi=np.where(table["stake"] > 0, (table["ret"] - table["stake"]) / table["stake"] * 100, 0.0),
+    )
+
+
+__all__ = [
+    "CUBE_DIMENSIONS",
+    "DIMENSION_LABELS",
+    "build_cube",
+    "rollup_cube",
+]
@@ -0,0 +1,227 @@
+"""Team and event entity resolution for per-team breakdowns.
+
+Event strings such as ``"HJK - FC Inter"`` are split into participants, and
+each participant name is mapped to a canonical entity. Spelling variants
+("Hjk", "Inter", "BK Häcken" / "Hacken") are matched with a fuzzy index.
+Names are first reduced to a normalized key (case-folded, accents and
+punctuation stripped, a leading club prefix from ``CLUB_PREFIXES`` dropped).
+Unmatched keys are compared with ``difflib`` only against canonical names that
+share enough character trigrams, so matching never scans every known entity
+and a misspelled word ("Liverpol") still finds its entity. A fuzzy match needs
+the same number of tokens, each one close to its counterpart: "Inter Miami",
+"Paris FC" or "Arsenal W" never fold into "Inter", "Paris" or "Arsenal".
+
+Every distinct raw string is resolved once. Results are memoized in an alias
+map that persists in a local JSON file (``PLAYWISE_ENTITY_PATH``, defaulting to
+``~/.playwise/entities.json``), so later imports and reruns only look up names
+they have never seen.
+"""
+
+from __future__ import annotations
+
+import difflib
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Set
+
+import numpy as np
+import pandas as pd
+
+from analytics.stores import store_lock, write_json
+
+DEFAULT_ENTITY_PATH = Path(
+    os.environ.get("PLAYWISE_ENTITY_PATH", "~/.playwise/entities.json")
+).expanduser()
+
+# Minimum ``difflib`` ratio for two normalized names to be the same entity.
+MATCH_THRESHOLD = 0.85
+
+EVENT_SEPARATOR = re.compile(r"\s+(?:-|–|—|vs\.?|v\.?|@)\s+", re.IGNORECASE)
+
+# Leading club prefixes that do not distinguish clubs ("FC Inter" vs "Inter").
+# Trailing ones are kept: "Paris FC" is not "Paris Saint-Germain".
+CLUB_PREFIXES = {"fc", "cf", "ac", "sc", "fk", "afc", "bk"}
+
+# Share of a key's trigrams a canonical name must also have to be compared.
+# One typo touches at most three trigrams of a token, so spelling variants
+# that pass ``MATCH_THRESHOLD`` keep well over half of them.
+GRAM_OVERLAP = 0.5
+
+# Bumped whenever matching changes, so aliases learned by older rules are dropped.
+ALIAS_FORMAT = 3
+
+
+def split_participants(event: str | None) -> List[str]:
+    """Split ``"Team A - Team B"`` style event strings into participant names."""
+
+    if event is None or (isinstance(event, float) and np.isnan(event)):
+        return []
+    return [part.strip() for part in EVENT_SEPARATOR.split(str(event)) if part.strip()]
+
+
+def normalize_name(name: str) -> str:
+    """Matching key: lower case, no accents or punctuation, no leading club prefix."""
+
+    text = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode("ascii")
+    tokens = re.findall(r"[a-z0-9]+", text.lower())
+    if len(tokens) > 1 and tokens[0] in CLUB_PREFIXES:
+        tokens = tokens[1:]
+    return " ".join(tokens)
+
+
+def _grams(key: str) -> Set[str]:
+    # Trigrams of each token, padded so short tokens and word edges count too.
+    return {
+        padded[i : i + 3]
+        for token in key.split()
+        for padded in (f" {token} ",)
+        for i in range(len(padded) - 2)
+    }
+
+
+def _similar(a: str, b: str) -> float:
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+
+def _same_tokens(key: str, candidate: str) -> bool:
+    # Spelling variants only: no extra, missing or different words.
+    mine, theirs = key.split(), candidate.split()
+    return len(mine) == len(theirs) and all(
+        a == b or _similar(a, b) >= MATCH_THRESHOLD for a, b in zip(mine, theirs)
+    )
+
+
+@dataclass
+class EntityResolver:
+    """Alias map (raw name -> canonical name) plus the fuzzy-match index."""
+
+    aliases: Dict[str, str] = field(default_factory=dict)
+    canonical: Dict[str, str] = field(default_factory=dict)
+    grams: Dict[str, Set[str]] = field(default_factory=dict)
+    dirty: bool = False
+
+    def __post_init__(self) -> None:
+        for name in set(self.aliases.values()):
+            self._index(name)
+
+    def _index(self, name: str) -> None:
+        key = normalize_name(name)
+        self.canonical.setdefault(key, name)
+        for gram in _grams(key):
+            self.grams.setdefault(gram, set()).add(key)
+
+    def _match(self, key: str) -> str | None:
+        if key in self.canonical:
+            return self.canonical[key]
+        grams = _grams(key)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.grams.get(gram, ()))
+        best, best_ratio = None, MATCH_THRESHOLD
+        for candidate, count in shared.items():
+            if count < GRAM_OVERLAP * len(grams) or not _same_tokens(key, candidate):
+                continue
+            ratio = _similar(key, candidate)
+            if ratio >= best_ratio:
+                best, best_ratio = candidate, ratio
+        return None if best is None else self.canonical[best]
+
+    def resolve(self, raw: str) -> str:
+        """Canonical entity for one raw participant name."""
+
+        name = str(raw).strip()
+        known = self.aliases.get(name)
+        if known is not None:
+            return known
+        key = normalize_name(name)
+        canonical = self._match(key) if key else None
+        if canonical is None:
+            canonical = name
+            self._index(name)
+        self.aliases[name] = canonical
+        self.dirty = True
+        return canonical
+
+    def resolve_many(self, names: pd.Series) -> pd.Series:
+        """Resolve a column, matching each distinct unseen string only once."""
+
+        codes, uniques = pd.factorize(names.astype(str))
+        resolved = np.array([self.resolve(name) for name in uniques] + [None], dtype=object)
+        return pd.Series(resolved[codes], index=names.index)
+
+    def to_dict(self) -> dict:
+        return {"format": ALIAS_FORMAT, "aliases": self.aliases}
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> "EntityResolver":
+        if payload.get("format") != ALIAS_FORMAT:
+            return cls()
+        return cls(aliases={str(k): str(v) for k, v in payload.get("aliases", {}).items()})
+
+
+def load_resolver(path: Path = DEFAULT_ENTITY_PATH) -> EntityResolver:
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            return EntityResolver.from_dict(json.load(handle))
+    except (OSError, ValueError):
+        return EntityResolver()
+
+
+def save_resolver(resolver: EntityResolver, path: Path = DEFAULT_ENTITY_PATH) -> None:
+    """Merge new aliases into the on-disk map (other workers may have added some)."""
+
+    with store_lock(path):
+        on_disk = load_resolver(path)
+        on_disk.aliases.update(resolver.aliases)
+        write_json(path, on_disk.to_dict())
+    resolver.dirty = False
+
+
+_SHARED_RESOLVER: EntityResolver | None = None
+_RESOLVER_LOCK = threading.Lock()
+
+
+def resolve_participants(events: pd.Series, path: Path = DEFAULT_ENTITY_PATH) -> pd.DataFrame:
+    """Explode ``events`` into ``(row, participant)`` pairs with canonical names.
+
+    Uses the process-wide resolver and persists newly learned aliases.
+    """
+
+    global _SHARED_RESOLVER
+    codes, uniques = pd.factorize(events)
+    parts = [split_participants(event) for event in uniques]
+    pairs = pd.DataFrame(
+        {
+            "event": np.repeat(np.arange(len(uniques)), [len(p) for p in parts]),
+            "participant": [name for p in parts for name in p],
+        }
+    )
+
+    with _RESOLVER_LOCK:
+        if _SHARED_RESOLVER is None:
+            _SHARED_RESOLVER = load_resolver(path)
+        pairs["team"] = _SHARED_RESOLVER.resolve_many(pairs["participant"])
+        if _SHARED_RESOLVER.dirty:
+            try:
+                save_resolver(_SHARED_RESOLVER, path)
+            except OSError:
+                pass
+
+    rows = pd.DataFrame({"row": np.arange(len(codes)), "event": codes})
+    return rows.merge(pairs, on="event")[["row", "participant", "team"]]
+
+
+__all__ = [
+    "EntityResolver",
+    "load_resolver",
+    "normalize_name",
+    "resolve_participants",
+    "save_resolver",
+    "split_participants",
+]
@@ -0,0 +1,196 @@
+"""Composable dashboard filters backed by precomputed boolean indexes.
+
+A :class:`FilterIndex` is built once per dataset. For every filterable
+dimension it holds one boolean array per value (a bitmap over the ticket
+frame), so any combination of filters resolves to an OR of bitmaps within a
+dimension and an AND across dimensions, with no groupby or string comparison at
+query time. Dates are filtered through ``searchsorted`` on the sorted ticket
+dates.
+
+Market groups belong to legs rather than tickets. The index keeps leg-level
+bitmaps for them, a ticket-level "has a leg in this group" bitmap, and the
+ticket position of every canonical row so ticket masks can be mapped back to
+leg rows.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from analytics.tickets import ticket_positions
+
+# (label, lower bound inclusive, upper bound exclusive) on the ticket's total odds.
+ODDS_BANDS = [
+    ("< 1.50", 0.0, 1.5),
+    ("1.50 – 2.00", 1.5, 2.0),
+    ("2.00 – 3.00", 2.0, 3.0),
+    ("3.00 – 5.00", 3.0, 5.0),
+    ("5.00+", 5.0, np.inf),
+]
+
+LEG_BUCKETS = ["1", "2", "3", "4+"]
+
+# Filter dimensions answered from ticket-level bitmaps, keyed by FilterSpec field.
+TICKET_DIMENSIONS = {
+    "bookmakers": "bookmaker",
+    "products": "product",
+    "ticket_types": "ticket type",
+    "ranks": "rank",
+}
+
+
+@dataclass(frozen=True)
+class FilterSpec:
+    """Selected filter values; ``None`` (or empty) means "no filter"."""
+
+    start: Optional[pd.Timestamp] = None
+    end: Optional[pd.Timestamp] = None
+    bookmakers: Optional[Tuple[str, ...]] = None
+    products: Optional[Tuple[str, ...]] = None
+    ticket_types: Optional[Tuple[str, ...]] = None
+    market_groups: Optional[Tuple[str, ...]] = None
+    ranks: Optional[Tuple[str, ...]] = None
+    odds_bands: Optional[Tuple[str, ...]] = None
+    legs: Optional[Tuple[str, ...]] = None
+
+    @property
+    def active(self) -> bool:
+        return any(getattr(self, f.name) not in (None, ()) for f in fields(self))
+
+
+def odds_band(total_odds: pd.Series) -> pd.Series:
+    """Label every ticket with its :data:`ODDS_BANDS` entry."""
+
+    edges = [lower for _, lower, _ in ODDS_BANDS] + [np.inf]
+    return pd.cut(
+        total_odds.fillna(1.0),
+        bins=edges,
+        labels=[label for label, _, _ in ODDS_BANDS],
+        right=False,
+    ).astype(str)
+
+
+def leg_bucket(legs: pd.Series) -> pd.Series:
+    clipped = legs.fillna(1).astype(int).clip(lower=1, upper=len(LEG_BUCKETS))
+    return clipped.map(dict(enumerate(LEG_BUCKETS, start=1)))
+
+
+def _bitmaps(values: pd.Series) -> Dict[str, np.ndarray]:
+    codes, uniques = pd.factorize(values.astype(str))
+    return {str(value): codes == position for position, value in enumerate(uniques)}
+
+
+@dataclass
+class FilterIndex:
+    n_tickets: int
+    order: np.ndarray
+    sorted_dates: np.ndarray
+    ticket_bitmaps: Dict[str, Dict[str, np.ndarray]]
+    row_market_groups: Dict[str, np.ndarray]
+    ticket_of_row: np.ndarray
+
+    def options(self, field_name: str) -> list:
+        if field_name == "market_groups":
+            return sorted(self.row_market_groups)
+        if field_name == "odds_bands":
+            return [label for label, _, _ in ODDS_BANDS if label in self.ticket_bitmaps["odds_bands"]]
+        if field_name == "legs":
+            return [bucket for bucket in LEG_BUCKETS if bucket in self.ticket_bitmaps["legs"]]
+        return sorted(self.ticket_bitmaps.get(field_name, {}))
+
+    def _any_of(self, bitmaps: Dict[str, np.ndarray], values, size: int) -> np.ndarray:
+        mask = np.zeros(size, dtype=bool)
+        for value in values:
+            bitmap = bitmaps.get(str(value))
+            if bitmap is not None:
+                mask |= bitmap
+        return mask
+
+    def ticket_mask(self, spec: FilterSpec) -> np.ndarray:
+        """Boolean mask over the ticket frame for ``spec``."""
+
+        mask = np.ones(self.n_tickets, dtype=bool)
+        if spec.start is not None or spec.end is not None:
+            lo = 0 if spec.start is None else np.searchsorted(
+                self.sorted_dates, np.datetime64(pd.Timestamp(spec.start)), side="left"
+            )
+            hi = self.n_tickets if spec.end is None else np.searchsorted(
+                self.sorted_dates, np.datetime64(pd.Timestamp(spec.end)), side="left"
+            )
+            in_range = np.zeros(self.n_tickets, dtype=bool)
+            in_range[self.order[lo:hi]] = True
+            mask &= in_range
+
+        for field_name in ("bookmakers", "products", "ticket_types", "ranks", "odds_bands", "legs", "market_groups"):
+            values = getattr(spec, field_name)
+            if values:
+                mask &= self._any_of(self.ticket_bitmaps.get(field_name, {}), values, self.n_tickets)
+        return mask
+
+    def row_mask(self, spec: FilterSpec, ticket_mask: np.ndarray | None = None) -> np.ndarray:
+        """Boolean mask over the canonical rows: legs of matching tickets.
+
+        With a market-group filter only the legs in the selected groups are
+        kept, so leg-level breakdowns show just those markets.
+        """
+
+        if ticket_mask is None:
+            ticket_mask = self.ticket_mask(spec)
+        # Rows without a ticket (missing key values) never match.
+        padded = np.append(ticket_mask, False)
+        mask = padded[self.ticket_of_row]
+        if spec.market_groups:
+            mask &= self._any_of(self.row_market_groups, spec.market_groups, mask.size)
+        return mask
+
+
+def build_filter_index(tickets: pd.DataFrame, rows: pd.DataFrame) -> FilterIndex:
+    """Precompute the bitmaps for ``tickets`` (``group_tickets`` output) and its rows."""
+
+    n_tickets = len(tickets)
+    dates = tickets["date"].to_numpy(dtype="datetime64[ns]")
+    order = np.argsort(dates, kind="stable")
+
+    ticket_of_row = ticket_positions(rows)
+
+    ticket_bitmaps = {
+        field_name: _bitmaps(tickets[column])
+        for field_name, column in TICKET_DIMENSIONS.items()
+        if column in tickets.columns
+    }
+    ticket_bitmaps["odds_bands"] = _bitmaps(odds_band(tickets["total_odds"]))
+    ticket_bitmaps["legs"] = _bitmaps(leg_bucket(tickets["legs"]))
+
+    row_market_groups: Dict[str, np.ndarray] = {}
+    ticket_bitmaps["market_groups"] = {}
+    if "market_group" in rows.columns:
+        row_market_groups = _bitmaps(rows["market_group"])
+        valid = ticket_of_row >= 0
+        for group, bitmap in row_market_groups.items():
+            has_group = np.zeros(n_tickets, dtype=bool)
+            has_group[ticket_of_row[bitmap & valid]] = True
+            ticket_bitmaps["market_groups"][group] = has_group
+
+    return FilterIndex(
+        n_tickets=n_tickets,
+        order=order,
+        sorted_dates=dates[order],
+        ticket_bitmaps=ticket_bitmaps,
+        row_market_groups=row_market_groups,
+        ticket_of_row=ticket_of_row,
+    )
+
+
+__all__ = [
+    "FilterIndex",
+    "FilterSpec",
+    "LEG_BUCKETS",
+    "ODDS_BANDS",
+    "build_filter_index",
+    "leg_bucket",
+    "odds_band",
+]
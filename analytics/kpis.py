@@ -0,0 +1,111 @@
+"""Headline metrics for a ticket range, computed in one pass.
+
+The timeline header, the quick profile, the Profile page and the community
+benchmarks all need the same handful of numbers: stake, return, ticket and
+single/combo counts, average bet and odds, win rate and activity span.
+:func:`compute_kpis` pulls the ticket columns out as NumPy arrays once and
+reduces them together, and ``app.py`` caches the result per dataset, filter
+and range so every panel reads the same :class:`Kpis` instance.
+
+Ticket types are lower-cased on the factorized unique values only, never per
+row. Money stays in integer cents like the canonical schema.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from imports.money import to_euros
+
+# A month for the monthly-volume figure, as used by the community benchmarks.
+DAYS_PER_MONTH = 30.0
+
+
+@dataclass
+class Kpis:
+    stake: int
+    returns: int
+    tickets: int
+    singles: int
+    combos: int
+    winning_tickets: int
+    avg_odds: float | None
+    first_date: pd.Timestamp | None
+    last_date: pd.Timestamp | None
+
+    @property
+    def profit(self) -> int:
+        return self.returns - self.stake
+
+    @property
+    def roi(self) -> float:
+        return (self.profit / self.stake * 100) if self.stake > 0 else 0.0
+
+    @property
+    def avg_bet(self) -> float:
+        """Average stake per ticket, in cents."""
+
+        return (self.stake / self.tickets) if self.tickets else 0.0
+
+    @property
+    def win_rate(self) -> float | None:
+        return (self.winning_tickets / self.tickets * 100) if self.tickets else None
+
+    @property
+    def months_active(self) -> float | None:
+        if self.first_date is None or self.last_date is None:
+            return None
+        return max((self.last_date - self.first_date).days / DAYS_PER_MONTH, 1)
+
+    @property
+    def monthly_volume(self) -> float:
+        months = self.months_active
+        return (self.tickets / months) if months else float(self.tickets)
+
+    def headline(self) -> Dict[str, float | None]:
+        """The metrics compared against community benchmarks (bet size in euros)."""
+
+        return {
+            "Average Bet Size": float(to_euros(self.avg_bet)) if self.tickets else None,
+            "Average Odds": self.avg_odds,
+            "Win Rate": self.win_rate,
+            "ROI": self.roi,
+            "Monthly Volume": self.monthly_volume,
+        }
+
+
+def compute_kpis(tickets: pd.DataFrame) -> Kpis:
+    """Reduce a ticket frame (one row per ticket) to its headline metrics."""
+
+    if tickets.empty:
+        return Kpis(0, 0, 0, 0, 0, 0, None, None, None)
+
+    bets = tickets["bets"].to_numpy(dtype=np.int64)
+    wins = tickets["wins"].to_numpy(dtype=np.int64)
+    dates = tickets["date"]
+
+    type_codes, type_values = pd.factorize(tickets["ticket type"])
+    type_values = pd.Index(type_values).astype(str).str.lower()
+    type_counts = np.bincount(type_codes[type_codes >= 0], minlength=len(type_values))
+
+    odds_column = "total_odds" if "total_odds" in tickets.columns else "odds"
+    avg_odds = float(tickets[odds_column].mean()) if odds_column in tickets.columns else None
+
+    return Kpis(
+        stake=int(bets.sum()),
+        returns=int(wins.sum()),
+        tickets=len(tickets),
+        singles=int(type_counts[type_values == "single"].sum()),
+        combos=int(type_counts[type_values == "combo"].sum()),
+        winning_tickets=int(np.count_nonzero(wins > 0)),
+        avg_odds=avg_odds,
+        first_date=dates.min(),
+        last_date=dates.max(),
+    )
+
+
+__all__ = ["Kpis", "compute_kpis"]
@@ -0,0 +1,200 @@
+"""Leg-level analytics store with per-event, per-market and per-selection indexes.
+
+Unibet pastes carry a separate ``legs`` frame (event, market, selection and
+odds per leg). Coolbet exports are already one row per leg. :func:`build_leg_store`
+turns either into a :class:`LegStore` that sits next to the ticket frame.
+
+Every leg points at its ticket by position in the ``group_tickets`` frame, so
+timeline and filter views select legs with a ticket mask. Each indexed column
+is dictionary-encoded once. Per-value totals are then ``bincount`` passes over
+the integer codes. Looking up the legs of one event or market uses a CSR-style
+index (legs sorted by code plus offsets) and never scans the whole store.
+This keeps queries cheap with hundreds of thousands of legs.
+
+Leg outcomes are inferred from the ticket: every leg of a won ticket hit, the
+only leg of a lost single missed, and the legs of lost combos, voids and open
+tickets are unknown. The hit rate is therefore hits over legs with a known
+outcome. Ticket stake and profit are split evenly across legs for the ROI
+contribution.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from analytics.tickets import ticket_positions
+
+LEG_DIMENSIONS = ["market", "event", "selection"]
+
+# Placeholder for legs without a value in an indexed column.
+UNKNOWN_VALUE = "(unknown)"
+
+
+@dataclass
+class LegIndex:
+    codes: np.ndarray
+    values: pd.Index
+    order: np.ndarray
+    offsets: np.ndarray
+
+    def positions(self, value: str) -> np.ndarray:
+        code = self.values.get_indexer([value])[0]
+        if code < 0:
+            return np.empty(0, dtype=np.int64)
+        return self.order[self.offsets[code] : self.offsets[code + 1]]
+
+
+def _build_index(values: pd.Series) -> LegIndex:
+    codes, uniques = pd.factorize(values.fillna(UNKNOWN_VALUE).astype(str))
+    order = np.argsort(codes, kind="stable")
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(uniques)))))
+    return LegIndex(codes=codes, values=pd.Index(uniques), order=order, offsets=offsets)
+
+
+@dataclass
+class LegStore:
+    legs: pd.DataFrame
+    indexes: Dict[str, LegIndex]
+
+    def __len__(self) -> int:
+        return len(self.legs)
+
+    def leg_mask(self, ticket_mask: np.ndarray | None) -> np.ndarray:
+        """Legs whose ticket is selected by ``ticket_mask`` (over the ticket frame)."""
+
+        if ticket_mask is None:
+            return np.ones(len(self.legs), dtype=bool)
+        return ticket_mask[self.legs["ticket"].to_numpy()]
+
+    def summary(self, dimension: str, ticket_mask: np.ndarray | None = None) -> pd.DataFrame:
+        """Per-value legs, hit rate and stake/profit contribution (cents)."""
+
+        index = self.indexes[dimension]
+        return self.grouped_summary(index.codes, index.values.rename(dimension), ticket_mask)
+
+    def grouped_summary(
+        self,
+        codes: np.ndarray,
+        values: pd.Index,
+        ticket_mask: np.ndarray | None = None,
+        legs: np.ndarray | None = None,
+    ) -> pd.DataFrame:
+        """Totals per code over legs, or over ``(legs[i], codes[i])`` pairs.
+
+        Pairs let one leg count towards several values, e.g. both teams of
+        its event.
+        """
+
+        weight = self.leg_mask(ticket_mask).astype(np.float64)
+        if legs is not None:
+            weight = weight[legs]
+        size = len(values)
+
+        def total(column: str | None = None) -> np.ndarray:
+            weights = weight
+            if column is not None:
+                column_values = self.legs[column].to_numpy(dtype=np.float64)
+                weights = weight * (column_values if legs is None else column_values[legs])
+            return np.bincount(codes, weights=weights, minlength=size)
+
+        count = total()
+        known = total("known")
+        stake = total("stake_share")
+        profit = total("profit_share")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            table = pd.DataFrame(
+                {
+                    "legs": count.astype(np.int64),
+                    "hit rate": np.where(known > 0, total("hit") / known * 100, np.nan),
+                    "stake": np.rint(stake).astype(np.int64),
+                    "profit": np.rint(profit).astype(np.int64),
+                    "roi": np.where(stake > 0, profit / stake * 100, 0.0),
+                },
+                index=values,
+            )
+        return table[table["legs"] > 0].sort_values("legs", ascending=False)
+
+    def lookup(self, dimension: str, value: str, ticket_mask: np.ndarray | None = None) -> pd.DataFrame:
+        """Legs with ``value`` in ``dimension``, via the CSR index."""
+
+        positions = self.indexes[dimension].positions(value)
+        if ticket_mask is not None and positions.size:
+            positions = positions[ticket_mask[self.legs["ticket"].to_numpy()[positions]]]
+        return self.legs.iloc[positions]
+
+
+def unibet_legs(legs_df: pd.DataFrame, rows: pd.DataFrame) -> pd.DataFrame:
+    """Attach ticket positions to parsed Unibet legs through ``bet_id``."""
+
+    bet_ticket = pd.Series(ticket_positions(rows), index=rows["bet_id"].astype(str))
+    bet_ticket = bet_ticket[~bet_ticket.index.duplicated()]
+    ticket = legs_df["bet_id"].astype(str).map(bet_ticket)
+    return pd.DataFrame(
+        {
+            "ticket": ticket,
+            "event": legs_df["event"],
+            "market": legs_df["market"].fillna(legs_df["selection"]),
+            "selection": legs_df["selection"],
+            "odds": legs_df["odds"],
+        }
+    )
+
+
+def canonical_legs(rows: pd.DataFrame) -> pd.DataFrame:
+    """Use canonical rows as legs (Coolbet exports are one row per leg)."""
+
+    def column(name: str) -> pd.Series:
+        if name in rows.columns:
+            return rows[name]
+        return pd.Series(None, index=rows.index, dtype=object)
+
+    return pd.DataFrame(
+        {
+            "ticket": ticket_positions(rows),
+            "event": column("event"),
+            "market": column("market name"),
+            "selection": column("selection"),
+            "odds": rows["odds"],
+        }
+    )
+
+
+def build_leg_store(legs: pd.DataFrame, tickets: pd.DataFrame) -> LegStore:
+    """Index ``legs`` (with a ``ticket`` position column) against ``tickets``."""
+
+    legs = legs[legs["ticket"].notna() & (legs["ticket"] >= 0)]
+    ticket = legs["ticket"].to_numpy(dtype=np.int64)
+
+    rank = tickets["rank"].astype(str).str.lower().to_numpy()[ticket]
+    legs_per_ticket = np.bincount(ticket, minlength=len(tickets))[ticket]
+    won = rank == "won"
+    missed = (rank == "lost") & (legs_per_ticket == 1)
+
+    stake = tickets["bets"].to_numpy(dtype=np.int64)[ticket]
+    profit = tickets["Profit"].to_numpy(dtype=np.int64)[ticket]
+    legs = legs.assign(
+        ticket=ticket,
+        hit=won.astype(np.int8),
+        known=(won | missed).astype(np.int8),
+        stake_share=stake / legs_per_ticket,
+        profit_share=profit / legs_per_ticket,
+    ).reset_index(drop=True)
+
+    return LegStore(
+        legs=legs,
+        indexes={dimension: _build_index(legs[dimension]) for dimension in LEG_DIMENSIONS},
+    )
+
+
+__all__ = [
+    "LEG_DIMENSIONS",
+    "LegIndex",
+    "LegStore",
+    "build_leg_store",
+    "canonical_legs",
+    "unibet_legs",
+]
@@ -0,0 +1,92 @@
+"""Merge imported histories from several sources into one canonical frame.
+
+A user can upload several Coolbet exports and paste their Unibet history at
+the same time. Each source is normalized on its own (and cached under its own
+dataset key), then :func:`merge_histories` concatenates them into one history
+with a ``bookmaker`` column.
+
+Overlapping sources, such as two exports that cover the same months, must not
+count a ticket twice. Every ticket gets a 64-bit fingerprint hashed from
+(bookmaker, timestamp, stake, total odds). A source's tickets are then checked
+against the fingerprints of the sources merged before it with a hash-table
+membership test, so merging costs one pass over each source rather than a
+pairwise comparison. Tickets repeated within a single source are kept: one
+export never lists the same bet twice, so those are separate bets.
+
+Parsed Unibet legs follow the same rule through :func:`merge_legs`: a coupon's
+legs come from the first source that lists its ``bet_id``.
+"""
+
+from __future__ import annotations
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from analytics.tickets import ticket_positions
+
+FINGERPRINT_COLUMNS = ["bookmaker", "date", "bets", "total_odds"]
+
+# Total odds are compared at the precision bookmakers display them.
+ODDS_DECIMALS = 2
+
+
+def ticket_fingerprints(tickets: pd.DataFrame) -> np.ndarray:
+    """64-bit fingerprint of every ticket in a ``group_tickets`` frame."""
+
+    keys = tickets[FINGERPRINT_COLUMNS].assign(
+        # Hashes use the raw integers, so timestamps must share one unit.
+        date=tickets["date"].dt.as_unit("ns"),
+        total_odds=tickets["total_odds"].round(ODDS_DECIMALS),
+    )
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+def _naive_dates(rows: pd.DataFrame) -> pd.DataFrame:
+    # Unibet timestamps are UTC-aware and Coolbet ones are naive; mixing them
+    # would turn ``date`` into an object column.
+    if isinstance(rows["date"].dtype, pd.DatetimeTZDtype):
+        return rows.assign(date=rows["date"].dt.tz_convert(None))
+    return rows
+
+
+def merge_histories(sources: Sequence[Tuple[pd.DataFrame, pd.DataFrame]]) -> pd.DataFrame:
+    """Concatenate ``(rows, tickets)`` sources, dropping tickets already merged.
+
+    ``rows`` are canonical frames with a ``bookmaker`` column and ``tickets``
+    their :func:`analytics.tickets.group_tickets` output. Earlier sources win
+    when a ticket appears in several.
+    """
+
+    seen = pd.Index([], dtype=np.uint64)
+    parts = []
+    for rows, tickets in sources:
+        fingerprints = ticket_fingerprints(tickets)
+        fresh = ~pd.Index(fingerprints).isin(seen)
+        # Rows without a ticket (missing key values) are kept as they are.
+        keep = np.append(fresh, True)[ticket_positions(rows)]
+        parts.append(_naive_dates(rows[keep]))
+        seen = seen.append(pd.Index(fingerprints[fresh]))
+    return pd.concat(parts, ignore_index=True)
+
+
+def merge_legs(parsed_legs: List[pd.DataFrame], rows: pd.DataFrame) -> pd.DataFrame:
+    """Concatenate per-source parsed legs without repeating a coupon.
+
+    ``parsed_legs`` are in source order and ``rows`` is the
+    :func:`merge_histories` output. Legs are kept only for coupons that
+    survived the merge, and only from the first source that lists them.
+    """
+
+    merged_ids = pd.Index(rows["bet_id"].dropna().astype(str).unique())
+    seen = pd.Index([], dtype=object)
+    parts = []
+    for legs in parsed_legs:
+        bet_ids = legs["bet_id"].astype(str)
+        parts.append(legs[bet_ids.isin(merged_ids) & ~bet_ids.isin(seen)])
+        seen = seen.append(pd.Index(bet_ids.unique()))
+    return pd.concat(parts, ignore_index=True)
+
+
+__all__ = ["FINGERPRINT_COLUMNS", "merge_histories", "merge_legs", "ticket_fingerprints"]
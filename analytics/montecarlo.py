@@ -0,0 +1,130 @@
+"""Monte Carlo check of how likely an ROI is under a zero-edge model.
+
+Each settled ticket with a stake and odds above 1 is replayed as a coin flip
+that wins with its implied probability ``1 / total_odds`` and pays
+``stake * total_odds``. Under that model the expected ROI is zero, so the share
+of simulated histories that do at least as well as the user tells how much of
+the result luck can explain. The user's ROI is measured on the same tickets, so
+tickets without usable odds (e.g. Coolbet's default of 1.0) are left out of
+both and reported as ``excluded``.
+
+Simulations run as a batched ``simulations x tickets`` matrix computation,
+processed in chunks so memory stays bounded, with a seeded generator and a
+wall-clock budget so the panel always answers within an interactive request.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+
+DEFAULT_SIMULATIONS = 10_000
+DEFAULT_SEED = 20240101
+# Cap for the uniform draws and win flags of one chunk.
+DEFAULT_MAX_CHUNK_BYTES = 64 * 1024 * 1024
+DEFAULT_TIME_BUDGET_S = 3.0
+
+PERCENTILES = (5, 50, 95)
+
+
+@dataclass
+class LuckEstimate:
+    observed_roi: float
+    p_value: float | None
+    simulations: int
+    requested: int
+    tickets: int
+    roi_percentiles: Dict[int, float]
+    timed_out: bool
+    excluded: int = 0
+
+
+def _chunk_rows(tickets: int, max_bytes: int) -> int:
+    # float32 uniforms plus float64 win flags per simulated ticket
+    per_row = max(tickets, 1) * 12
+    return max(1, max_bytes // per_row)
+
+
+def simulate_zero_edge_roi(
+    stakes: np.ndarray,
+    odds: np.ndarray,
+    returns: np.ndarray,
+    simulations: int = DEFAULT_SIMULATIONS,
+    seed: int = DEFAULT_SEED,
+    max_chunk_bytes: int = DEFAULT_MAX_CHUNK_BYTES,
+    time_budget_s: float = DEFAULT_TIME_BUDGET_S,
+) -> LuckEstimate:
+    """Estimate the probability of reaching the user's ROI with zero edge.
+
+    Args:
+        stakes: Stake per settled ticket.
+        odds: Decimal total odds per ticket, aligned with ``stakes``.
+        returns: Actual return per ticket; the observed ROI is computed from
+            the tickets that are simulated.
+        simulations: Number of simulated histories to aim for.
+        seed: Seed for the NumPy generator so results are reproducible.
+        max_chunk_bytes: Upper bound on the working set of one chunk.
+        time_budget_s: Stop after the chunk that crosses this many seconds.
+    """
+
+    stakes = np.asarray(stakes, dtype=np.float64)
+    odds = np.asarray(odds, dtype=np.float64)
+    returns = np.asarray(returns, dtype=np.float64)
+    valid = (stakes > 0) & (odds > 1.0) & np.isfinite(odds)
+    excluded = int(valid.size - valid.sum())
+    stakes = stakes[valid]
+    odds = odds[valid]
+    total_stake = float(stakes.sum())
+    observed_roi = 0.0
+    if total_stake > 0:
+        observed_roi = (float(returns[valid].sum()) - total_stake) / total_stake * 100
+
+    if stakes.size == 0 or total_stake <= 0 or simulations <= 0:
+        return LuckEstimate(observed_roi, None, 0, simulations, int(stakes.size), {}, False, excluded)
+
+    win_prob = (1.0 / odds).astype(np.float32)
+    # Returns are summed in float64 so large histories do not lose cents.
+    payout = stakes * odds
+    rows = _chunk_rows(stakes.size, max_chunk_bytes)
+
+    rng = np.random.default_rng(seed)
+    rois = np.empty(simulations, dtype=np.float64)
+    uniforms = np.empty((min(rows, simulations), stakes.size), dtype=np.float32)
+    flags = np.empty(uniforms.shape, dtype=np.float64)
+
+    started = time.perf_counter()
+    done = 0
+    timed_out = False
+    while done < simulations:
+        batch = min(rows, simulations - done)
+        draw = uniforms[:batch]
+        hit = flags[:batch]
+        rng.random(out=draw, dtype=np.float32)
+        np.less(draw, win_prob, out=hit, casting="unsafe")
+        chunk_returns = hit @ payout
+        rois[done : done + batch] = (chunk_returns - total_stake) / total_stake * 100
+        done += batch
+        if time.perf_counter() - started > time_budget_s and done < simulations:
+            timed_out = True
+            break
+
+    rois = rois[:done]
+    p_value = float(np.mean(rois >= observed_roi))
+    percentiles = dict(zip(PERCENTILES, np.percentile(rois, PERCENTILES).tolist()))
+
+    return LuckEstimate(
+        observed_roi=observed_roi,
+        p_value=p_value,
+        simulations=done,
+        requested=simulations,
+        tickets=int(stakes.size),
+        roi_percentiles=percentiles,
+        timed_out=timed_out,
+        excluded=excluded,
+    )
+
+
+__all__ = ["LuckEstimate", "simulate_zero_edge_roi"]
@@ -0,0 +1,158 @@
+"""Drawdown, losing-streak and rolling-ROI analytics.
+
+Everything here works on ticket-ordered NumPy arrays taken from the grouped
+ticket frame, so each metric is a single vectorized pass (cumulative sums,
+running maxima and ``searchsorted`` window bounds) with no Python loop over
+tickets. Money amounts stay in integer cents, like the canonical schema.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from analytics.rollups import period_start
+
+ROLLING_WINDOWS_DAYS = (30, 90)
+
+# Ticket ranks that are not settled yet and therefore cannot be a loss.
+UNSETTLED_RANKS = {"pending", "open", "unknown"}
+
+
+@dataclass
+class RiskProfile:
+    max_drawdown: float
+    drawdown_start: pd.Timestamp | None
+    drawdown_end: pd.Timestamp | None
+    longest_losing_streak: int
+    rolling_roi: dict
+    curve: pd.DataFrame
+
+
+def max_drawdown(profit: np.ndarray) -> Tuple[float, int, int]:
+    """Return the deepest peak-to-trough fall of the cumulative profit curve.
+
+    The curve starts at zero, so an opening loss counts as a drawdown. Returns
+    ``(depth, peak_index, trough_index)`` with ``peak_index == -1`` when the
+    peak is the starting point.
+    """
+
+    if profit.size == 0:
+        return 0.0, -1, -1
+
+    cumulative = np.cumsum(profit)
+    peaks = np.maximum.accumulate(np.maximum(cumulative, 0))
+    drawdown = cumulative - peaks
+    trough = int(np.argmin(drawdown))
+    depth = float(-drawdown[trough])
+    if depth <= 0:
+        return 0.0, -1, -1
+
+    at_peak = np.flatnonzero(cumulative[: trough + 1] == peaks[trough])
+    peak = int(at_peak[-1]) if at_peak.size else -1
+    return depth, peak, trough
+
+
+def longest_run(flags: np.ndarray) -> int:
+    """Length of the longest run of ``True`` values in a boolean array."""
+
+    if flags.size == 0:
+        return 0
+
+    padded = np.concatenate(([0], flags.astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(padded))
+    if edges.size == 0:
+        return 0
+    return int((edges[1::2] - edges[::2]).max())
+
+
+def rolling_roi(
+    dates: np.ndarray, bets: np.ndarray, wins: np.ndarray, window_days: int
+) -> np.ndarray:
+    """Trailing ``window_days`` ROI % at every ticket.
+
+    Window bounds come from ``searchsorted`` over the sorted timestamps and the
+    sums from prefix-sum differences, so the cost is one pass plus a binary
+    search per ticket.
+    """
+
+    if dates.size == 0:
+        return np.empty(0)
+
+    window = np.timedelta64(window_days, "D")
+    left = np.searchsorted(dates, dates - window, side="right")
+    stake_cs = np.concatenate(([0], np.cumsum(bets, dtype=np.int64)))
+    return_cs = np.concatenate(([0], np.cumsum(wins, dtype=np.int64)))
+    right = np.arange(1, dates.size + 1)
+
+    stake = stake_cs[right] - stake_cs[left]
+    profit = (return_cs[right] - return_cs[left]) - stake
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(stake > 0, profit / stake * 100, 0.0)
+
+
+def risk_profile(tickets: pd.DataFrame, granularity: str = "day") -> RiskProfile:
+    """Compute drawdown, streak and rolling ROI for a ticket frame.
+
+    Args:
+        tickets: One row per ticket with ``date``, ``rank`` and ``bets`` /
+            ``wins`` in cents.
+        granularity: Rollup period used to downsample the chart curve.
+    """
+
+    ordered = tickets.sort_values("date", kind="stable")
+    dates = ordered["date"].to_numpy(dtype="datetime64[ns]")
+    bets = ordered["bets"].to_numpy(dtype=np.int64)
+    wins = ordered["wins"].to_numpy(dtype=np.int64)
+    profit = wins - bets
+
+    depth, peak, trough = max_drawdown(profit)
+    date_index = ordered["date"]
+    drawdown_start = date_index.iloc[peak] if peak >= 0 else (date_index.iloc[0] if depth else None)
+    drawdown_end = date_index.iloc[trough] if trough >= 0 else None
+
+    settled = ~ordered["rank"].astype(str).str.lower().isin(UNSETTLED_RANKS).to_numpy()
+    streak = longest_run(profit[settled] < 0)
+
+    cumulative = np.cumsum(profit)
+    curve = pd.DataFrame(
+        {
+            "date": date_index.to_numpy(),
+            "CumProfit": cumulative,
+            "Drawdown": cumulative - np.maximum.accumulate(np.maximum(cumulative, 0)),
+        }
+    )
+    latest_roi = {}
+    for window_days in ROLLING_WINDOWS_DAYS:
+        values = rolling_roi(dates, bets, wins, window_days)
+        curve[f"ROI {window_days}d"] = values
+        latest_roi[window_days] = float(values[-1]) if values.size else None
+
+    if not curve.empty:
+        curve["date"] = period_start(curve["date"], granularity)
+        curve = curve.groupby("date", as_index=False).agg(
+            CumProfit=("CumProfit", "last"),
+            Drawdown=("Drawdown", "min"),
+            **{f"ROI {w}d": (f"ROI {w}d", "last") for w in ROLLING_WINDOWS_DAYS},
+        )
+
+    return RiskProfile(
+        max_drawdown=depth,
+        drawdown_start=drawdown_start,
+        drawdown_end=drawdown_end,
+        longest_losing_streak=streak,
+        rolling_roi=latest_roi,
+        curve=curve,
+    )
+
+
+__all__ = [
+    "RiskProfile",
+    "longest_run",
+    "max_drawdown",
+    "risk_profile",
+    "rolling_roi",
+]
@@ -0,0 +1,145 @@
+"""Precomputed profit rollups for the timeline.
+
+The ticket frame built in ``app.py`` carries full timestamps, so grouping it on
+``date`` is effectively per ticket. This module buckets tickets once per
+dataset into day, week and month tables. The timeline chart reads from those
+tables, so widening the range only touches a few hundred periods instead of
+every ticket. The header KPIs still need per-ticket odds and outcomes, so
+``app.py`` computes them from the ticket frame once per range and caches them.
+"""
+
+from __future__ import annotations
+
+from typing import Dict
+
+import pandas as pd
+
+GRANULARITIES = ("day", "week", "month")
+
+ROLLUP_COLUMNS = ["period", "bets", "wins", "Profit", "tickets", "singles", "combos"]
+
+# Span thresholds (in days) used to pick the coarsest rollup that still gives
+# a readable profit curve.
+DAY_SPAN_LIMIT = 120
+WEEK_SPAN_LIMIT = 730
+
+
+def period_start(dates: pd.Series, granularity: str) -> pd.Series:
+    """Map timestamps to the start of their day, week (Monday) or month."""
+
+    day = dates.dt.normalize()
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - pd.to_timedelta(day.dt.weekday, unit="D")
+    if granularity == "month":
+        return day - pd.to_timedelta(day.dt.day - 1, unit="D")
+    raise ValueError(f"Unknown rollup granularity: {granularity}")
+
+
+def _bucket(tickets: pd.DataFrame, granularity: str) -> pd.DataFrame:
+    ticket_type = tickets["ticket type"].astype(str).str.lower()
+    frame = pd.DataFrame(
+        {
+            "period": period_start(tickets["date"], granularity),
+            "bets": tickets["bets"],
+            "wins": tickets["wins"],
+            "Profit": tickets["wins"] - tickets["bets"],
+            "tickets": 1,
+            "singles": (ticket_type == "single").astype(int),
+            "combos": (ticket_type == "combo").astype(int),
+        }
+    )
+    return frame.groupby("period", as_index=False).sum()
+
+
+def build_rollups(tickets: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Bucket a ticket-level frame into day, week and month rollups.
+
+    Args:
+        tickets: One row per ticket with ``date``, ``ticket type``, ``bets``
+            and ``wins`` columns (``df_grouped`` in ``app.py``).
+    """
+
+    if tickets.empty:
+        empty = pd.DataFrame(columns=ROLLUP_COLUMNS)
+        return {granularity: empty for granularity in GRANULARITIES}
+
+    return {granularity: _bucket(tickets, granularity) for granularity in GRANULARITIES}
+
+
+def extend_rollups(
+    rollups: Dict[str, pd.DataFrame], new_tickets: pd.DataFrame
+) -> Dict[str, pd.DataFrame]:
+    """Fold newly appended tickets into existing rollups.
+
+    Only the new tickets are bucketed; the existing tables are combined at the
+    period level, so the cost depends on the appended rows and the number of
+    periods rather than on the full history.
+    """
+
+    if new_tickets.empty:
+        return rollups
+
+    extended: Dict[str, pd.DataFrame] = {}
+    for granularity in GRANULARITIES:
+        fresh = _bucket(new_tickets, granularity)
+        current = rollups.get(granularity)
+        if current is None or current.empty:
+            extended[granularity] = fresh
+            continue
+        extended[granularity] = (
+            pd.concat([current, fresh], ignore_index=True)
+            .groupby("period", as_index=False)
+            .sum()
+        )
+    return extended
+
+
+def pick_granularity(start: pd.Timestamp, end: pd.Timestamp) -> str:
+    """Return the rollup granularity that suits a ``start``–``end`` span."""
+
+    span_days = (end - start).days
+    if span_days <= DAY_SPAN_LIMIT:
+        return "day"
+    if span_days <= WEEK_SPAN_LIMIT:
+        return "week"
+    return "month"
+
+
+def slice_rollup(
+    rollups: Dict[str, pd.DataFrame], granularity: str, start: pd.Timestamp | None = None
+) -> pd.DataFrame:
+    """Return the rows of one rollup covering ``start`` onwards.
+
+    When ``start`` falls inside a week or month bucket, that bucket is rebuilt
+    from the day rollup for the days from ``start`` on (and labelled
+    ``start``), so tickets before the range never reach the totals.
+    """
+
+    table = rollups[granularity]
+    if start is None or table.empty:
+        return table
+    first_period = period_start(pd.Series([start]), granularity).iloc[0]
+    if granularity == "day" or first_period == start:
+        return table[table["period"] >= first_period]
+
+    days = rollups["day"]
+    days = days[days["period"] >= start]
+    edge_days = days[period_start(days["period"], granularity) == first_period]
+    rest = table[table["period"] > first_period]
+    if edge_days.empty:
+        return rest
+    edge = edge_days.drop(columns="period").sum().to_frame().T.astype(edge_days.dtypes.drop("period"))
+    edge.insert(0, "period", start)
+    return pd.concat([edge, rest], ignore_index=True)
+
+
+__all__ = [
+    "GRANULARITIES",
+    "build_rollups",
+    "extend_rollups",
+    "period_start",
+    "pick_granularity",
+    "slice_rollup",
+]
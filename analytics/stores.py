@@ -0,0 +1,58 @@
+"""File locking and atomic writes for the small local JSON stores.
+
+The community benchmarks and the entity alias map each live in a JSON file
+under ``~/.playwise`` that several Streamlit sessions, and possibly several
+worker processes, update. :func:`store_lock` serializes their
+read-modify-write cycles per file, and :func:`write_json` replaces a file in
+one step so readers never see a half-written store.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict
+
+try:  # POSIX only; other platforms fall back to the in-process lock
+    import fcntl
+except ImportError:  # pragma: no cover - platform dependent
+    fcntl = None
+
+# One in-process lock per store file.
+_LOCKS: Dict[Path, threading.Lock] = {}
+_LOCKS_GUARD = threading.Lock()
+
+
+@contextmanager
+def store_lock(path: Path):
+    """Serialize read-modify-write cycles on ``path`` across threads and processes."""
+
+    with _LOCKS_GUARD:
+        lock = _LOCKS.setdefault(Path(path), threading.Lock())
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path.with_suffix(path.suffix + ".lock"), "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def write_json(path: Path, payload: Any) -> None:
+    """Write ``payload`` to ``path`` through a temporary file and an atomic rename."""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(payload, handle)
+    os.replace(tmp_path, path)
+
+
+__all__ = ["store_lock", "write_json"]
@@ -0,0 +1,121 @@
+"""Derive the ticket-level frame the dashboard aggregates over.
+
+Canonical rows coming out of the import backends can be legs (Coolbet exports
+one row per selection) or whole bets (Unibet pastes). The dashboard groups them
+into one row per ticket and tags every row with a coarse market group.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+TICKET_KEYS = ["date", "rank", "ticket type", "product"]
+
+MARKET_GROUP_KEYWORDS = [
+    (
+        "Over/Under Goals",
+        ["over/under goals", "over under goals", "total goals", "goal line", "goals line", "goals over", "goals under"],
+    ),
+    (
+        "Player Points",
+        ["player", "points", "pts", "rebounds", "assists", "steals", "blocks", "shots"],
+    ),
+    (
+        "Match Results",
+        ["1x2", "match result", "full time result", "moneyline", "winner", "to win"],
+    ),
+]
+
+
+def classify_market(market_name) -> str:
+    m = str(market_name).lower()
+    for group, keywords in MARKET_GROUP_KEYWORDS:
+        if any(k in m for k in keywords):
+            return group
+    return "Other Markets"
+
+
+def prepare_canonical(df: pd.DataFrame) -> pd.DataFrame:
+    """Add derived columns (``market_group``) to a freshly normalized frame."""
+
+    if "market name" in df.columns:
+        df = df.assign(market_group=df["market name"].map(classify_market))
+    return df
+
+
+def group_tickets(df: pd.DataFrame) -> pd.DataFrame:
+    """Collapse canonical rows into one row per ticket."""
+
+    legs_agg = ("legs", "max") if "legs" in df.columns else ("odds", "size")
+    extra = {"bookmaker": ("bookmaker", "first")} if "bookmaker" in df.columns else {}
+    grouped = (
+        df.groupby(TICKET_KEYS, as_index=False)
+          .agg(
+              bets=("bets", "sum"),
+              wins=("wins", "sum"),
+              total_odds=("odds", "prod"),
+              legs=legs_agg,
+              **extra
+          )
+    )
+
+    grouped["Profit"] = grouped["wins"] - grouped["bets"]
+    grouped["ROI %"] = np.where(
+        grouped["bets"] > 0,
+        (grouped["Profit"] / grouped["bets"]) * 100,
+        0.0,
+    )
+    return grouped
+
+
+def merge_tickets(tickets: pd.DataFrame, fresh: pd.DataFrame) -> pd.DataFrame:
+    """Combine two :func:`group_tickets` frames as if grouped together.
+
+    Used when appending a paste. Only tickets that share their keys with an
+    existing one are re-aggregated; the result keeps ``group_tickets`` order so
+    :func:`ticket_positions` stays valid for the combined rows.
+    """
+
+    if fresh.empty:
+        return tickets
+    combined = pd.concat([tickets, fresh], ignore_index=True)
+    shared = combined.duplicated(TICKET_KEYS, keep=False)
+    if shared.any():
+        extra = {"bookmaker": ("bookmaker", "first")} if "bookmaker" in combined.columns else {}
+        regrouped = combined[shared].groupby(TICKET_KEYS, as_index=False).agg(
+            bets=("bets", "sum"),
+            wins=("wins", "sum"),
+            total_odds=("total_odds", "prod"),
+            legs=("legs", "max"),
+            **extra,
+        )
+        regrouped["Profit"] = regrouped["wins"] - regrouped["bets"]
+        regrouped["ROI %"] = np.where(
+            regrouped["bets"] > 0,
+            (regrouped["Profit"] / regrouped["bets"]) * 100,
+            0.0,
+        )
+        combined = pd.concat([combined[~shared], regrouped], ignore_index=True)
+    return combined.sort_values(TICKET_KEYS, kind="stable").reset_index(drop=True)
+
+
+def ticket_positions(rows: pd.DataFrame) -> np.ndarray:
+    """Position in the :func:`group_tickets` frame of every canonical row.
+
+    ``group_tickets`` sorts by the ticket keys, so ``ngroup`` numbers rows in
+    the same order. Rows with a missing key value belong to no ticket and get
+    ``-1``.
+    """
+
+    return rows.groupby(TICKET_KEYS, sort=True).ngroup().fillna(-1).to_numpy(dtype=np.int64)
+
+
+__all__ = [
+    "TICKET_KEYS",
+    "classify_market",
+    "group_tickets",
+    "merge_tickets",
+    "prepare_canonical",
+    "ticket_positions",
+]
@@ -3,12 +3,28 @@ import pandas as pd
 import numpy as np
 import altair as alt
 
-from imports.coolbet import NormalizationError, normalize_coolbet_data
-from imports.unibet_paste import normalize_unibet_paste, parse_unibet_paste
+from analytics.approx import APPROX_MIN_ROWS, approximate_dashboard
+from analytics.benchmarks import history_identity, load_benchmarks, record_import
+from analytics.cache import content_key, shared_cache
+from analytics.cube import CUBE_DIMENSIONS, DIMENSION_LABELS, build_cube, rollup_cube
+from analytics.entities import resolve_participants
+from analytics.filters import FilterSpec, build_filter_index
+from analytics.kpis import compute_kpis
+from analytics.legs import LEG_DIMENSIONS, build_leg_store, canonical_legs, unibet_legs
+from analytics.merge import merge_histories, merge_legs
+from analytics.montecarlo import simulate_zero_edge_roi
+from analytics.risk import UNSETTLED_RANKS, risk_profile
+from analytics.rollups import build_rollups, extend_rollups, pick_granularity, slice_rollup
+from analytics.tickets import group_tickets, merge_tickets, prepare_canonical
+from imports.compression import open_stream
+from imports.jobs import ImportJob, get_job, job_for, submit_import
+from imports.money import format_euros, to_euros
+from imports.registry import get_backend, sniff_backend
 from imports.ui import (
     close_page_wrap,
     inject_global_css,
     open_page_wrap,
+    render_filter_panel,
     render_hero,
     render_sidebar_loader,
     render_stats_overview,
@@ -17,26 +33,244 @@ from imports.ui import (
 
 st.set_page_config(page_title="PlayWise Pilot", layout="wide")
 
+# Run the pipeline under copy-on-write (the default from pandas 3.0) so slices,
+# renames and column selections stay views until something writes to them.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# Frames and aggregates are shared across sessions; sessions only keep keys.
+frame_cache = shared_cache()
+
+# Rows shown in the leg-level tables.
+LEG_TABLE_ROWS = 50
+
+# Rows of the parsed Unibet frames kept for the preview expander.
+PREVIEW_ROWS = 200
+
 # Shared helpers -------------------------------------------------------------
 def parse_unibet_into_session(raw_text: str, button_key: str) -> None:
-    """Parse Unibet freeform paste content and store it into session state."""
-
+    """Queue a background import of a Unibet paste and store its dataset key in session state."""
+
+    loaded_key = st.session_state.get("parsed_unibet_key")
+    append = loaded_key is not None and ("frame", loaded_key) in frame_cache and st.checkbox(
+        "Add to the loaded history",
+        value=True,
+        key=f"{button_key}_append",
+        help="Only coupons that are not loaded yet are parsed.",
+    )
     if st.button("Parse Unibet paste", key=button_key):
-        bets_df, legs_df = parse_unibet_paste(raw_text)
-        st.markdown("**Parsed bets (Unibet)**")
-        st.dataframe(bets_df)
-        st.markdown("**Parsed legs (Unibet)**")
-        st.dataframe(legs_df)
-        normalized_unibet = normalize_unibet_paste(raw_text)
-        st.session_state["parsed_unibet_df"] = normalized_unibet
+        if append:
+            dataset_key = content_key("unibet", f"{loaded_key}\n{raw_text}".encode("utf-8"))
+            submit_import(dataset_key, "Unibet update", unibet_append(loaded_key, raw_text))
+        else:
+            dataset_key = content_key("unibet", raw_text.encode("utf-8"))
+            submit_import(dataset_key, "Unibet paste", backend_import("unibet", raw_text.encode("utf-8")))
+        st.session_state["parsed_unibet_key"] = dataset_key
+
+    job = job_for(st.session_state.get("parsed_unibet_key"))
+    if job is not None and job.previews:
+        with st.expander("Parsed Unibet preview"):
+            bets = job.previews["bets"]
+            experimental = []
+            if "experimental" in bets.columns:
+                experimental = list(bets.loc[bets["experimental"], "locale"].unique())
+            if experimental:
+                st.caption(
+                    f"The {', '.join(experimental)} Unibet labels are experimental; "
+                    "check the parsed statuses and bet types below."
+                )
+            st.markdown("**Parsed bets (Unibet)**")
+            st.dataframe(job.previews["bets"])
+            st.markdown("**Parsed legs (Unibet)**")
+            st.dataframe(job.previews["legs"])
+
+
+def backend_import(backend_name: str, payload: bytes):
+    """Background job body: run a registry backend and hand the canonical frame to the cache."""
+
+    def work(job: ImportJob) -> None:
+        def build() -> pd.DataFrame:
+            with open_stream(payload) as stream:
+                result = get_backend(backend_name).load()(stream, progress=job.report)
+            job.previews = {name: frame.head(PREVIEW_ROWS) for name, frame in result.previews.items()}
+            if result.legs is not None:
+                # Parsed legs are kept next to the tickets for the leg-level views.
+                frame_cache.put(("legs", job.dataset_key), result.legs)
+            return prepare_canonical(result.rows)
+
+        frame_cache.get_or_build(("frame", job.dataset_key), build)
+
+    return work
+
+
+def unibet_append(base_key: str, raw_text: str):
+    """Background job body: merge the new coupons of a paste into a loaded history.
+
+    Coupons already in the base frame are skipped before parsing, and the base
+    tickets and rollups are extended with the new tickets instead of being
+    rebuilt, so an update costs about as much as the new bets.
+    """
+
+    def work(job: ImportJob) -> None:
+        def build() -> pd.DataFrame:
+            base = frame_cache.get(("frame", base_key))
+            if base is None:
+                raise ValueError("The loaded history is no longer available; paste the full history again.")
+            known_ids = set(base["bet_id"].dropna().astype(str))
+            with open_stream(raw_text.encode("utf-8")) as stream:
+                result = get_backend("unibet").load()(stream, progress=job.report, known_ids=known_ids)
+            job.previews = {name: frame.head(PREVIEW_ROWS) for name, frame in result.previews.items()}
+            fresh_rows = prepare_canonical(result.rows)
+            legs_df = result.legs
+
+            base_legs = frame_cache.get(("legs", base_key))
+            if base_legs is not None:
+                frame_cache.put(("legs", job.dataset_key), pd.concat([base_legs, legs_df], ignore_index=True))
+            base_tickets = frame_cache.get(("tickets", base_key))
+            if base_tickets is not None:
+                fresh_tickets = base_tickets.iloc[:0] if fresh_rows.empty else group_tickets(fresh_rows)
+                tickets = merge_tickets(base_tickets, fresh_tickets)
+                frame_cache.put(("tickets", job.dataset_key), tickets)
+                base_rollups = frame_cache.get(("rollups", base_key))
+                # Rollups count tickets, so fold them only if no ticket merged into an old one.
+                if base_rollups is not None and len(tickets) == len(base_tickets) + len(fresh_tickets):
+                    frame_cache.put(("rollups", job.dataset_key), extend_rollups(base_rollups, fresh_tickets))
+            if fresh_rows.empty:
+                return base
+            return pd.concat([base, fresh_rows], ignore_index=True)
+
+        frame_cache.get_or_build(("frame", job.dataset_key), build)
+
+    return work
+
+
+@st.fragment(run_every=0.5)
+def render_import_progress(job_id: str) -> None:
+    """Poll a running import and rerun the app once its frame is ready."""
+
+    job = get_job(job_id)
+    if job is None or job.finished:
+        st.rerun()
+    st.progress(job.fraction, text=job.describe())
+
+
+def load_rollups(dataset_key: str, tickets: pd.DataFrame) -> dict:
+    """Build the day/week/month rollups once per dataset."""
+
+    return frame_cache.get_or_build(("rollups", dataset_key), lambda: build_rollups(tickets))
+
+
+def load_kpis(view_key, range_label: str, tickets: pd.DataFrame):
+    """Headline metrics for a view and timeline range, shared by every panel."""
+
+    return frame_cache.get_or_build(("kpis", view_key, range_label), lambda: compute_kpis(tickets))
+
+
+def load_leg_store(dataset_key: str, tickets: pd.DataFrame, rows: pd.DataFrame):
+    """Index the legs of a dataset once; views select legs with a ticket mask."""
+
+    def build():
+        legs = canonical_legs(rows)
+        parsed_legs = frame_cache.get(("legs", dataset_key))
+        if parsed_legs is not None and "bet_id" in rows.columns:
+            # Pasted tickets use their parsed legs; uploaded rows already are legs.
+            pasted = rows["bet_id"].notna().to_numpy()
+            legs = pd.concat([unibet_legs(parsed_legs, rows), legs[~pasted]], ignore_index=True)
+        return build_leg_store(legs, tickets)
+
+    return frame_cache.get_or_build(("legstore", dataset_key), build)
+
+
+def load_team_legs(dataset_key: str, leg_store):
+    """(leg, team code) pairs plus team names, resolved once per dataset."""
+
+    def build():
+        pairs = resolve_participants(leg_store.legs["event"])
+        codes, teams = pd.factorize(pairs["team"])
+        return pairs["row"].to_numpy(), codes, pd.Index(teams, name="team")
+
+    return frame_cache.get_or_build(("teams", dataset_key), build)
+
+
+def money_table(table: pd.DataFrame) -> pd.DataFrame:
+    """Euro view of a stake/return/profit breakdown (stored in cents)."""
+
+    return table.assign(**{col: to_euros(table[col]) for col in ("stake", "ret", "profit")})
+
+
+def load_risk_profile(dataset_key: str, range_label: str, granularity: str, tickets: pd.DataFrame):
+    """Compute drawdown, streak and rolling ROI once per dataset and range."""
+
+    return frame_cache.get_or_build(
+        ("risk", dataset_key, range_label, granularity),
+        lambda: risk_profile(tickets, granularity),
+    )
+
+
+def _luck_estimate(tickets: pd.DataFrame):
+    settled = tickets[~tickets["rank"].astype(str).str.lower().isin(UNSETTLED_RANKS)]
+    return simulate_zero_edge_roi(
+        settled["bets"].to_numpy(),
+        settled["total_odds"].to_numpy(),
+        settled["wins"].to_numpy(),
+    )
+
+
+def load_luck_estimate(dataset_key: str, range_label: str, tickets: pd.DataFrame):
+    """Run the zero-edge Monte Carlo once per dataset and range."""
+
+    return frame_cache.get_or_build(("luck", dataset_key, range_label), lambda: _luck_estimate(tickets))
+
+
+def exact_analytics(dataset_key: str, df: pd.DataFrame):
+    """Background job body: build the exact ticket frame and rollups for a large import."""
+
+    def work(job: ImportJob) -> None:
+        job.report("grouping tickets")
+        tickets = frame_cache.get_or_build(("tickets", dataset_key), lambda: group_tickets(df))
+        job.report("building rollups")
+        load_rollups(dataset_key, tickets)
+
+    return work
+
+
+def render_approximate_dashboard(approx) -> None:
+    """First view of a large import, estimated from a stratified ticket sample."""
+
+    summary = approx.summary
+    st.markdown('<div class="section-pill">TIMELINE (ESTIMATE)</div>', unsafe_allow_html=True)
+    st.caption(
+        f"Estimated from {summary.sampled_tickets:,} sampled tickets "
+        f"({summary.sampled_rows:,} of {summary.total_rows:,} rows). "
+        "Exact figures replace these as soon as the full history is processed."
+    )
+    mc1, mc2, mc3, mc4 = st.columns(4)
+    mc1.metric("ROI %", f"{summary.roi:.2f}% ± {summary.roi_ci:.2f}")
+    mc2.metric("Win rate", f"{summary.win_rate:.1f}% ± {summary.win_rate_ci:.1f}")
+    mc3.metric("Total Profit (est.)", format_euros(summary.profit))
+    mc4.metric("Tickets (est.)", f"{summary.tickets:,}")
+
+    if not approx.curve.empty:
+        st.markdown("##### Profit over time (estimate)")
+        curve = approx.curve.assign(CumProfit=to_euros(approx.curve["CumProfit"]))
+        st.altair_chart(
+            alt.Chart(curve).mark_line().encode(x="date:T", y="CumProfit:Q"),
+            use_container_width=True,
+        )
+
+    col_product, col_ticket = st.columns(2)
+    col_product.markdown("**By product (estimate)**")
+    col_product.dataframe(money_table(approx.by_product))
+    col_ticket.markdown("**By ticket type (estimate)**")
+    col_ticket.dataframe(money_table(approx.by_ticket))
 
 
 # Initialize session state slot for Unibet pastes to avoid NameError in downstream checks
 if "unibet_df" not in st.session_state:
     st.session_state["unibet_df"] = None
 
-if "parsed_unibet_df" not in st.session_state:
-    st.session_state["parsed_unibet_df"] = None
+if "parsed_unibet_key" not in st.session_state:
+    st.session_state["parsed_unibet_key"] = None
 
 # Always-available data entry in sidebar so uploads are reachable after first load
 with st.sidebar:
@@ -53,90 +287,163 @@ COMMUNITY_AVG_STATS = {
 }
 
 
-def safe_read_excel(uploaded_file: bytes) -> pd.DataFrame:
-    """Read the uploaded Excel file defensively so the app always boots."""
-
-    try:
-        df = pd.read_excel(uploaded_file)
-    except Exception as exc:  # pragma: no cover - streamlit surface
-        st.error(f"Could not read Excel file: {exc}")
-        st.stop()
-
-    return df
+def load_upload(uploaded_file) -> str | None:
+    """Return the dataset key of an upload, detecting its format and importing it on first use."""
+
+    # Hash and sniff each upload once per session instead of on every rerun.
+    upload_keys = st.session_state.setdefault("upload_keys", {})
+    if uploaded_file.file_id not in upload_keys:
+        payload = uploaded_file.getvalue()
+        try:
+            backend = sniff_backend(payload, uploaded_file.name)
+        except ValueError as exc:
+            # Unreadable archives (several members, missing zstandard) are skipped.
+            st.warning(f"{uploaded_file.name}: {exc}")
+            return None
+        upload_keys[uploaded_file.file_id] = (
+            (backend.name, content_key(backend.name, payload)) if backend is not None else None
+        )
+    detected = upload_keys[uploaded_file.file_id]
+    if detected is None:
+        st.warning(f"Could not recognise the format of {uploaded_file.name}; it was skipped.")
+        return None
+    backend_name, dataset_key = detected
+
+    # Running and finished imports of the same content are reused by
+    # ``submit_import``. A failed import is retried only when the file is
+    # uploaded again, not on every rerun.
+    upload_jobs = st.session_state.setdefault("upload_jobs", {})
+    job = get_job(upload_jobs.get(uploaded_file.file_id))
+    if ("frame", dataset_key) not in frame_cache and (job is None or job.status != "failed"):
+        upload_jobs[uploaded_file.file_id] = submit_import(
+            dataset_key, uploaded_file.name, backend_import(backend_name, uploaded_file.getvalue())
+        ).job_id
+    return dataset_key
+
+
+def load_history(source_keys: list):
+    """Dataset key and canonical frame of the loaded sources, merged if there are several."""
+
+    if len(source_keys) == 1:
+        return source_keys[0], frame_cache.get(("frame", source_keys[0]))
+
+    dataset_key = content_key("merged", "\n".join(source_keys).encode("utf-8"))
+
+    def build() -> pd.DataFrame:
+        sources = []
+        for key in source_keys:
+            rows = frame_cache.get(("frame", key))
+            tickets = frame_cache.get_or_build(("tickets", key), lambda: group_tickets(rows))
+            sources.append((rows, tickets))
+        merged = merge_histories(sources)
+        parsed_legs = [frame_cache.get(("legs", key)) for key in source_keys]
+        parsed_legs = [legs for legs in parsed_legs if legs is not None]
+        if parsed_legs:
+            frame_cache.put(("legs", dataset_key), merge_legs(parsed_legs, merged))
+        return merged
+
+    return dataset_key, frame_cache.get_or_build(("frame", dataset_key), build)
 
 # ---------- GLOBAL STYLE ----------
 inject_global_css()
 
 open_page_wrap()
 
-parsed_unibet_df = st.session_state.get("parsed_unibet_df")
-show_hero = (sidebar_upload is None) and (parsed_unibet_df is None)
+parsed_unibet_key = st.session_state.get("parsed_unibet_key")
+show_hero = (not sidebar_upload) and (parsed_unibet_key is None)
 
 if show_hero:
     render_hero(parse_unibet_into_session)
 close_page_wrap()
 spacer()
 
-uploaded_file = sidebar_upload
+uploaded_files = sidebar_upload or []
 
-parsed_unibet_df = st.session_state.get("parsed_unibet_df")
+parsed_unibet_key = st.session_state.get("parsed_unibet_key")
 
-if uploaded_file is None and parsed_unibet_df is None:
+if not uploaded_files and parsed_unibet_key is None:
     st.stop()
 
 # ---------- DATA PROCESSING ----------
-if parsed_unibet_df is not None:
-    df = parsed_unibet_df
-else:
-    df_raw = safe_read_excel(uploaded_file)
-    try:
-        df = normalize_coolbet_data(df_raw)
-    except NormalizationError as exc:  # pragma: no cover - streamlit surface
-        st.error(str(exc))
+# Every upload and the Unibet paste is imported on its own, then merged.
+source_keys = [load_upload(uploaded_file) for uploaded_file in uploaded_files]
+source_keys = [key for key in source_keys if key is not None]
+if parsed_unibet_key is not None:
+    source_keys.append(parsed_unibet_key)
+if not source_keys:
+    st.stop()
+
+for source_key in source_keys:
+    if ("frame", source_key) in frame_cache:
+        continue
+    job = job_for(source_key)
+    if job is not None and not job.finished:
+        # The import runs in the background; keep the page responsive meanwhile.
+        render_import_progress(job.job_id)
+        st.stop()
+    if source_key == parsed_unibet_key:
+        st.session_state["parsed_unibet_key"] = None
+    if job is not None and job.status == "failed":
+        st.error(job.error)
         st.stop()
+    st.warning("This import is no longer cached. Load it again from the sidebar.")
+    st.stop()
 
-if "market name" in df.columns:
-    def classify_market(m):
-        m = str(m).lower()
-        if any(k in m for k in ["over/under goals", "over under goals", "total goals", "goal line", "goals line", "goals over", "goals under"]):
-            return "Over/Under Goals"
-        if any(k in m for k in ["player", "points", "pts", "rebounds", "assists", "steals", "blocks", "shots"]):
-            return "Player Points"
-        if any(k in m for k in ["1x2", "match result", "full time result", "moneyline", "winner", "to win"]):
-            return "Match Results"
-        return "Other Markets"
-
-    df["market_group"] = df["market name"].apply(classify_market)
-
-legs_agg = ("legs", "max") if "legs" in df.columns else ("odds", "size")
-df_grouped = (
-    df.groupby(["date", "rank", "ticket type", "product"], as_index=False)
-      .agg(
-          bets=("bets", "sum"),
-          wins=("wins", "sum"),
-          total_odds=("odds", np.prod),
-          legs=legs_agg
-      )
-)
+# Shared, read-only frames: derive new frames instead of mutating these.
+dataset_key, df = load_history(source_keys)
 
-df_grouped["Profit"] = df_grouped["wins"] - df_grouped["bets"]
-df_grouped["ROI %"] = np.where(
-    df_grouped["bets"] > 0,
-    (df_grouped["Profit"] / df_grouped["bets"]) * 100,
-    0.0,
-)
+# Large histories: render sampled estimates while the exact pipeline runs.
+if len(df) >= APPROX_MIN_ROWS and ("tickets", dataset_key) not in frame_cache:
+    exact_job = submit_import(
+        f"exact:{dataset_key}", "Exact figures", exact_analytics(dataset_key, df)
+    )
+    if not exact_job.finished:
+        approx = frame_cache.get_or_build(("approx", dataset_key), lambda: approximate_dashboard(df))
+        render_approximate_dashboard(approx)
+        render_import_progress(exact_job.job_id)
+        st.stop()
+
+df_grouped = frame_cache.get_or_build(("tickets", dataset_key), lambda: group_tickets(df))
 
 # short circuit if there's nothing to show, preventing downstream styler errors
 if df_grouped.empty:
     st.warning("No rows found in the uploaded file. Add bets to see analytics.")
     st.stop()
 
-# --- ROUND NUMERIC COLUMNS TO 2 DECIMALS ---
-numeric_cols_grouped = df_grouped.select_dtypes(include="number").columns
-df_grouped[numeric_cols_grouped] = df_grouped[numeric_cols_grouped].round(2)
+# Filters resolve against bitmaps built once per dataset.
+filter_index = frame_cache.get_or_build(
+    ("filters", dataset_key), lambda: build_filter_index(df_grouped, df)
+)
+with st.sidebar:
+    filter_spec = FilterSpec(
+        **render_filter_panel(filter_index, df_grouped["date"].min(), df_grouped["date"].max())
+    )
+
+# Every panel reads this view; its key extends the dataset key with the filters
+# so cached aggregates are shared per filter combination.
+view_key = dataset_key
+df_view = df_grouped
+df_view_raw = df
+if filter_spec.active:
+    view_key = (dataset_key, filter_spec)
+    ticket_mask = filter_index.ticket_mask(filter_spec)
+    df_view = df_grouped[ticket_mask]
+    df_view_raw = df[filter_index.row_mask(filter_spec, ticket_mask)]
+    if df_view.empty:
+        st.warning("No bets match the selected filters.")
+        st.stop()
+
+df_filtered = df_view
+df_filtered_raw = df_view_raw
 
-df_filtered = df_grouped.copy()
-df_filtered_raw = df.copy()
+rollups = load_rollups(view_key, df_view)
+
+# Fold each imported history into the community benchmarks once per session.
+if st.session_state.get("benchmarked_dataset") != dataset_key:
+    record_import(
+        history_identity(df_grouped), load_kpis(dataset_key, "All Time", df_grouped).headline()
+    )
+    st.session_state["benchmarked_dataset"] = dataset_key
 
 # ---------- NAVIGATION ----------
 nav_choice = st.sidebar.radio(
@@ -173,57 +480,51 @@ with top_cols[0]:
     )
 
     cutoff = range_options[selected_range]
+    max_date = df_view["date"].max()
+    min_date = None
     if cutoff is not None:
-        min_date = df_grouped["date"].max() - cutoff
-        df_filtered = df_grouped[df_grouped["date"] >= min_date].copy()
-        df_filtered_raw = df[df["date"] >= min_date].copy()
+        # Align the cutoff to a day boundary so it matches the day rollup.
+        min_date = (max_date - cutoff).normalize()
+        df_filtered = df_view[df_view["date"] >= min_date]
+        df_filtered_raw = df_view_raw[df_view_raw["date"] >= min_date]
     else:
-        df_filtered = df_grouped.copy()
-        df_filtered_raw = df.copy()
+        df_filtered = df_view
+        df_filtered_raw = df_view_raw
 
     if df_filtered.empty:
         st.warning("No bets found for this timeline.")
         st.stop()
 
-    total_stake = float(df_filtered["bets"].sum())
-    total_return = float(df_filtered["wins"].sum())
-    total_profit = total_return - total_stake
-    roi_total = (total_profit / total_stake * 100) if total_stake > 0 else 0.0
-    avg_bet = float(df_filtered["bets"].mean())
-    num_singles = int((df_filtered["ticket type"].str.lower() == "single").sum())
-    num_combos = int((df_filtered["ticket type"].str.lower() == "combo").sum())
-    num_bets = num_singles + num_combos
-
-    total_stake = round(total_stake, 2)
-    total_return = round(total_return, 2)
-    total_profit = round(total_profit, 2)
-    roi_total = round(roi_total, 2)
-    avg_bet = round(avg_bet, 2)
+    # Money stays in integer cents until it is formatted for display.
+    kpis = load_kpis(view_key, selected_range, df_filtered)
 
     mc1, mc2, mc3, mc4 = st.columns(4)
-    mc1.metric("ROI %", f"{roi_total:.2f}%")
-    mc2.metric("Total Profit", f"{total_profit:.2f} €")
-    mc3.metric("Avg Bet", f"{avg_bet:.2f} €")
-    mc4.metric("Tickets", f"{num_bets} ({num_singles}/{num_combos})")
+    mc1.metric("ROI %", f"{kpis.roi:.2f}%")
+    mc2.metric("Total Profit", format_euros(kpis.profit))
+    mc3.metric("Avg Bet", format_euros(kpis.avg_bet))
+    mc4.metric("Tickets", f"{kpis.singles + kpis.combos} ({kpis.singles}/{kpis.combos})")
 
     st.markdown("##### Profit over time")
-    df_daily = df_filtered.groupby("date", as_index=False)["Profit"].sum().sort_values("date")
-    df_daily["Profit"] = df_daily["Profit"].round(2)
-
-    if not df_daily.empty:
-        df_range = df_daily.copy()
-        if cutoff is not None:
-            min_date = df_daily["date"].max() - cutoff
-            df_range = df_daily[df_daily["date"] >= min_date].copy()
+    range_start = min_date if min_date is not None else kpis.first_date.normalize()
+    granularity = pick_granularity(range_start, max_date)
+    df_range = slice_rollup(rollups, granularity, min_date)[["period", "Profit"]]
+    risk = load_risk_profile(view_key, selected_range, granularity, df_filtered)
 
-        df_range["CumProfit"] = df_range["Profit"].cumsum().round(2)
-        df_range["Profit"] = df_range["Profit"].round(2)
+    if not df_range.empty:
+        df_range = df_range.rename(columns={"period": "date"})
+        df_range["CumProfit"] = to_euros(df_range["Profit"].cumsum())
+        df_range["Profit"] = to_euros(df_range["Profit"])
 
         chart = alt.Chart(df_range).mark_line().encode(
             x="date:T",
             y="CumProfit:Q"
         )
-        st.altair_chart(chart, use_container_width=True)
+        drawdown_curve = risk.curve.assign(Drawdown=to_euros(risk.curve["Drawdown"]))
+        drawdown_layer = alt.Chart(drawdown_curve).mark_area(opacity=0.25, color="#ff9c9c").encode(
+            x="date:T",
+            y=alt.Y("Drawdown:Q", title="CumProfit / Drawdown"),
+        )
+        st.altair_chart(drawdown_layer + chart, use_container_width=True)
 
 by_product = (
     df_filtered.groupby("product")
@@ -234,6 +535,17 @@ by_product = (
     )
 )
 
+by_bookmaker = None
+if "bookmaker" in df_filtered.columns and df_filtered["bookmaker"].nunique() > 1:
+    by_bookmaker = (
+        df_filtered.groupby("bookmaker")
+        .agg(stake=("bets","sum"), ret=("wins","sum"))
+        .assign(
+            profit=lambda x: x["ret"] - x["stake"],
+            roi=lambda x: np.where(x["stake"] > 0, (x["ret"]-x["stake"]) / x["stake"] * 100, 0.0)
+        )
+    )
+
 by_ticket = (
     df_filtered.groupby("ticket type")
     .agg(stake=("bets","sum"), ret=("wins","sum"))
@@ -255,16 +567,6 @@ if "market_group" in df_filtered_raw.columns:
         .sort_values("roi", ascending=False)
     )
 
-# ROUND GROUPED TABLES
-by_product_num_cols = by_product.select_dtypes(include="number").columns
-by_ticket_num_cols = by_ticket.select_dtypes(include="number").columns
-by_product[by_product_num_cols] = by_product[by_product_num_cols].round(2)
-by_ticket[by_ticket_num_cols] = by_ticket[by_ticket_num_cols].round(2)
-
-if by_market_group is not None:
-    by_market_num_cols = by_market_group.select_dtypes(include="number").columns
-    by_market_group[by_market_num_cols] = by_market_group[by_market_num_cols].round(2)
-
 with top_cols[1]:
     avg_legs = df_filtered["legs"].mean()
 
@@ -308,7 +610,7 @@ with top_cols[1]:
         </div>
         <div class="pw-qp-card">
             <div class="pw-qp-kicker">Total volume</div>
-            <div class="pw-qp-value">{total_stake:.2f} €</div>
+            <div class="pw-qp-value">{format_euros(kpis.stake)}</div>
             <div class="pw-qp-sub">Tracked in selected timeline</div>
         </div>
     </div>
@@ -323,53 +625,89 @@ st.markdown('</div>', unsafe_allow_html=True)  # end hero-card
 if nav_choice == "Profile":
     st.markdown("### Profile")
 
-    date_start = df_filtered["date"].min()
-    date_end = df_filtered["date"].max()
-    # Each grouped row represents a single ticket (combo or single), so count rows instead
-    # of raw legs to avoid over-counting combo components.
-    total_bets_count = len(df_filtered)
+    date_start = kpis.first_date
+    date_end = kpis.last_date
     time_span = "–"
     if pd.notna(date_start) and pd.notna(date_end):
         time_span = f"{date_start.strftime('%b %Y')} – {date_end.strftime('%b %Y')}"
 
-    avg_odds = None
-    if "total_odds" in df_filtered.columns:
-        avg_odds = float(df_filtered["total_odds"].mean())
-    elif "odds" in df_filtered.columns:
-        avg_odds = float(df_filtered["odds"].mean())
-
-    win_rate = None
-    if "wins" in df_filtered.columns:
-        win_rate = float((df_filtered["wins"] > 0).mean() * 100)
+    user_stats = kpis.headline()
 
-    months_active = None
-    if pd.notna(date_start) and pd.notna(date_end):
-        months_active = max(((date_end - date_start).days / 30.0), 1)
-    monthly_volume = (total_bets_count / months_active) if months_active else total_bets_count
-
-    user_stats = {
-        "Average Bet Size": avg_bet,
-        "Average Odds": avg_odds,
-        "Win Rate": win_rate,
-        "ROI": roi_total,
-        "Monthly Volume": monthly_volume,
-    }
+    benchmark_store = load_benchmarks()
+    community_stats = benchmark_store.averages(COMMUNITY_AVG_STATS)
+    stat_percentiles = benchmark_store.percentiles(user_stats)
+    benchmark_note = (
+        f"Benchmarks from {benchmark_store.imports} imported histories"
+        if stat_percentiles
+        else "Benchmarks from community-wide averages"
+    )
 
     stat_deltas = {
         label: (
             None
-            if value is None or label not in COMMUNITY_AVG_STATS
-            else value - COMMUNITY_AVG_STATS[label]
+            if value is None or community_stats.get(label) is None
+            else value - community_stats[label]
         )
         for label, value in user_stats.items()
     }
 
-    render_stats_overview(user_stats, COMMUNITY_AVG_STATS, stat_deltas)
+    render_stats_overview(
+        user_stats, community_stats, stat_deltas, stat_percentiles, benchmark_note
+    )
 
     mini_cols = st.columns(3)
     mini_cols[0].metric("Time span", time_span)
-    mini_cols[1].metric("Total tickets", f"{total_bets_count}")
-    mini_cols[2].metric("Current ROI", f"{roi_total:.2f}%")
+    mini_cols[1].metric("Total tickets", f"{kpis.tickets}")
+    mini_cols[2].metric("Current ROI", f"{kpis.roi:.2f}%")
+
+    st.markdown("#### Risk")
+    roi_30 = risk.rolling_roi.get(30)
+    roi_90 = risk.rolling_roi.get(90)
+    risk_cols = st.columns(4)
+    risk_cols[0].metric("Max drawdown", format_euros(risk.max_drawdown))
+    risk_cols[1].metric("Longest losing streak", f"{risk.longest_losing_streak}")
+    risk_cols[2].metric("ROI (30d)", "–" if roi_30 is None else f"{roi_30:.2f}%")
+    risk_cols[3].metric("ROI (90d)", "–" if roi_90 is None else f"{roi_90:.2f}%")
+
+    if not risk.curve.empty:
+        rolling_long = risk.curve.melt(
+            id_vars="date",
+            value_vars=["ROI 30d", "ROI 90d"],
+            var_name="Window",
+            value_name="ROI %",
+        )
+        rolling_chart = alt.Chart(rolling_long).mark_line().encode(
+            x="date:T",
+            y="ROI %:Q",
+            color="Window:N",
+        )
+        st.markdown("##### Rolling ROI")
+        st.altair_chart(rolling_chart, use_container_width=True)
+
+    st.markdown("#### Is my ROI luck?")
+    luck = load_luck_estimate(view_key, selected_range, df_filtered)
+    excluded_note = (
+        f" {luck.excluded} settled tickets without odds above 1.0 are left out of both ROI figures."
+        if luck.excluded
+        else ""
+    )
+    if luck.p_value is None:
+        st.info("Not enough settled tickets with odds to run the simulation." + excluded_note)
+    else:
+        luck_cols = st.columns(3)
+        luck_cols[0].metric("Chance with zero edge", f"{luck.p_value * 100:.1f}%")
+        luck_cols[1].metric(
+            "Zero-edge ROI range",
+            f"{luck.roi_percentiles[5]:.1f}% – {luck.roi_percentiles[95]:.1f}%",
+        )
+        luck_cols[2].metric("Simulations", f"{luck.simulations:,}")
+        st.caption(
+            f"Share of {luck.simulations:,} simulated histories of your {luck.tickets} settled tickets "
+            f"that reached {luck.observed_roi:.2f}% ROI when every ticket wins with its implied "
+            "probability (1 / odds). The range covers the middle 90% of simulated ROI."
+            + (" Stopped early to stay within the time budget." if luck.timed_out else "")
+            + excluded_note
+        )
 
 
 # ---------- INTERACTIVE SECTIONS ----------
@@ -388,13 +726,13 @@ if nav_choice == "Deep Dives":
             f"⚠️ Watchlist: **{str(worst_product).title()}** "
             f"({by_product.loc[worst_product, 'roi']:.2f}% ROI)"
         )
-    st.write(f"🧮 Mean stake per ticket: **{avg_bet:.2f} €**")
+    st.write(f"🧮 Mean stake per ticket: **{format_euros(kpis.avg_bet)}**")
     st.markdown("<div class='section-stack'>", unsafe_allow_html=True)
     st.markdown("<div class='section-card'>", unsafe_allow_html=True)
     with st.expander("📊 Markets — click to open full view", expanded=False):
         st.markdown("#### Profitability By Market Group")
         if by_market_group is not None and not by_market_group.empty:
-            display_by_market = by_market_group.copy()
+            display_by_market = money_table(by_market_group)
             display_by_market.index = display_by_market.index.map(lambda x: str(x).title())
             display_by_market = display_by_market.rename(
                 columns={
@@ -418,7 +756,7 @@ if nav_choice == "Deep Dives":
     st.markdown("<div class='section-card'>", unsafe_allow_html=True)
     with st.expander("🎟 Tickets — click to open full view", expanded=False):
         st.markdown("#### Live Vs Prematch")
-        display_by_product = by_product.copy()
+        display_by_product = money_table(by_product)
         display_by_product.index = display_by_product.index.map(lambda x: str(x).title())
         display_by_product = display_by_product.rename(
             columns={
@@ -437,7 +775,7 @@ if nav_choice == "Deep Dives":
         )
 
         st.markdown("#### Combo Vs Single")
-        display_by_ticket = by_ticket.copy()
+        display_by_ticket = money_table(by_ticket)
         display_by_ticket.index = display_by_ticket.index.map(lambda x: str(x).title())
         display_by_ticket = display_by_ticket.rename(
             columns={
@@ -476,7 +814,7 @@ if nav_choice == "Markets":
 
     st.markdown("<div class='section-card'>", unsafe_allow_html=True)
     if by_market_group is not None and not by_market_group.empty:
-        display_by_market = by_market_group.copy()
+        display_by_market = money_table(by_market_group)
         display_by_market.index = display_by_market.index.map(lambda x: str(x).title())
         display_by_market = display_by_market.rename(
             columns={
@@ -513,7 +851,7 @@ if nav_choice == "Markets":
 
     with t_cols[0]:
         st.markdown("<div class='section-card'>", unsafe_allow_html=True)
-        display_by_product = by_product.copy()
+        display_by_product = money_table(by_product)
         display_by_product.index = display_by_product.index.map(lambda x: str(x).title())
         display_by_product = display_by_product.rename(
             columns={
@@ -535,7 +873,7 @@ if nav_choice == "Markets":
 
     with t_cols[1]:
         st.markdown("<div class='section-card'>", unsafe_allow_html=True)
-        display_by_ticket = by_ticket.copy()
+        display_by_ticket = money_table(by_ticket)
         display_by_ticket.index = display_by_ticket.index.map(lambda x: str(x).title())
         display_by_ticket = display_by_ticket.rename(
             columns={
@@ -555,5 +893,184 @@ if nav_choice == "Markets":
         )
         st.markdown("</div>", unsafe_allow_html=True)
 
+    if by_bookmaker is not None:
+        st.markdown("<div class='section-card'>", unsafe_allow_html=True)
+        display_by_bookmaker = money_table(by_bookmaker).rename(
+            columns={
+                "stake": "Stake",
+                "ret": "Return",
+                "profit": "Profit",
+                "roi": "ROI %",
+            }
+        )[ ["Stake", "Return", "Profit", "ROI %"] ]
+        formatter_bookmaker = {col: "{:.2f}" for col in display_by_bookmaker.select_dtypes(include="number").columns}
+        st.markdown("#### By bookmaker")
+        st.dataframe(
+            display_by_bookmaker.style
+                .applymap(color_roi, subset=["ROI %"])
+                .format(formatter_bookmaker),
+            use_container_width=True
+        )
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    st.markdown(
+        """
+        <div class="pw-compare-card">
+            <div class="pw-compare-head">
+                <div class="pw-compare-title">Custom breakdown</div>
+                <div class="pw-compare-meta">Any split of the filtered history</div>
+            </div>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+
+    st.markdown("<div class='section-card'>", unsafe_allow_html=True)
+    # Pivots roll up a cube built once per filtered view instead of regrouping rows.
+    cube = frame_cache.get_or_build(("cube", view_key), lambda: build_cube(df_view, df_view_raw))
+    pivot_dimensions = st.multiselect(
+        "Break down by",
+        CUBE_DIMENSIONS,
+        default=["product"],
+        format_func=DIMENSION_LABELS.get,
+        max_selections=3,
+        key="cube_dimensions",
+    )
+    if pivot_dimensions:
+        display_pivot = money_table(rollup_cube(cube, pivot_dimensions)).reset_index()
+        if "month" in display_pivot.columns:
+            display_pivot["month"] = display_pivot["month"].dt.strftime("%b %Y")
+        display_pivot = display_pivot.rename(
+            columns={
+                **DIMENSION_LABELS,
+                "stake": "Stake",
+                "ret": "Return",
+                "tickets": "Tickets",
+                "profit": "Profit",
+                "roi": "ROI %",
+            }
+        )
+        formatter_pivot = {col: "{:.2f}" for col in ["Stake", "Return", "Profit", "ROI %"]}
+        st.dataframe(
+            display_pivot.style
+                .applymap(color_roi, subset=["ROI %"])
+                .format(formatter_pivot),
+            use_container_width=True,
+            hide_index=True,
+        )
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    st.markdown(
+        """
+        <div class="pw-compare-card">
+            <div class="pw-compare-head">
+                <div class="pw-compare-title">Legs</div>
+                <div class="pw-compare-meta">Hit rate and ROI contribution per market, event and selection</div>
+            </div>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+
+    st.markdown("<div class='section-card'>", unsafe_allow_html=True)
+    leg_store = load_leg_store(dataset_key, df_grouped, df)
+    # ``df_grouped`` has a RangeIndex, so the view's index labels are ticket positions.
+    leg_ticket_mask = np.zeros(len(df_grouped), dtype=bool)
+    leg_ticket_mask[df_filtered.index.to_numpy()] = True
+    leg_dimension = st.radio(
+        "Group legs by",
+        LEG_DIMENSIONS,
+        format_func=str.title,
+        horizontal=True,
+        key="leg_dimension",
+    )
+    leg_summary = leg_store.summary(leg_dimension, leg_ticket_mask).head(LEG_TABLE_ROWS)
+    if leg_summary.empty:
+        st.info("No legs found for this selection.")
+    else:
+        display_legs = leg_summary.assign(
+            stake=to_euros(leg_summary["stake"]),
+            profit=to_euros(leg_summary["profit"]),
+        ).rename(
+            columns={
+                "legs": "Legs",
+                "hit rate": "Hit rate %",
+                "stake": "Stake share",
+                "profit": "Profit contribution",
+                "roi": "ROI %",
+            }
+        )
+        display_legs.index = display_legs.index.map(str)
+        formatter_legs = {
+            col: "{:.2f}" for col in ["Hit rate %", "Stake share", "Profit contribution", "ROI %"]
+        }
+        st.dataframe(
+            display_legs.style
+                .applymap(color_roi, subset=["ROI %"])
+                .format(formatter_legs, na_rep="–"),
+            use_container_width=True,
+        )
+        st.caption(
+            "Stake and profit of each ticket are split evenly across its legs. Hit rate counts "
+            "legs of won tickets and lost singles; legs of lost combos have no known outcome."
+        )
+
+        leg_value = st.selectbox(
+            f"Show legs for {leg_dimension}",
+            list(leg_summary.index),
+            key=f"leg_drill_{leg_dimension}",
+        )
+        drill_legs = leg_store.lookup(leg_dimension, leg_value, leg_ticket_mask)
+        st.dataframe(
+            drill_legs[["event", "market", "selection", "odds", "hit", "known"]],
+            use_container_width=True,
+            hide_index=True,
+        )
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    st.markdown(
+        """
+        <div class="pw-compare-card">
+            <div class="pw-compare-head">
+                <div class="pw-compare-title">Teams</div>
+                <div class="pw-compare-meta">ROI per team, with name variants merged</div>
+            </div>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+
+    st.markdown("<div class='section-card'>", unsafe_allow_html=True)
+    team_legs, team_codes, teams = load_team_legs(dataset_key, leg_store)
+    team_summary = leg_store.grouped_summary(
+        team_codes, teams, leg_ticket_mask, legs=team_legs
+    ).head(LEG_TABLE_ROWS)
+    if team_summary.empty:
+        st.info("No team names found in the events of this selection.")
+    else:
+        display_teams = team_summary.assign(
+            stake=to_euros(team_summary["stake"]),
+            profit=to_euros(team_summary["profit"]),
+        ).rename(
+            columns={
+                "legs": "Legs",
+                "hit rate": "Hit rate %",
+                "stake": "Stake share",
+                "profit": "Profit contribution",
+                "roi": "ROI %",
+            }
+        )
+        formatter_teams = {
+            col: "{:.2f}" for col in ["Hit rate %", "Stake share", "Profit contribution", "ROI %"]
+        }
+        st.dataframe(
+            display_teams.style
+                .applymap(color_roi, subset=["ROI %"])
+                .format(formatter_teams, na_rep="–"),
+            use_container_width=True,
+        )
+        st.caption("A leg counts towards both teams of its event.")
+    st.markdown("</div>", unsafe_allow_html=True)
+
     st.markdown("</div>", unsafe_allow_html=True)
 
@@ -1,3 +1,3 @@
 """Import backends and UI helpers for Playwisee."""
 
-__all__ = ["coolbet", "ui"]
+__all__ = ["compression", "coolbet", "jobs", "money", "parsing", "registry", "tabular", "ui", "unibet_locales", "unibet_sections"]
@@ -0,0 +1,166 @@
+"""Transparent decompression of ``.gz``, ``.zst`` and ``.zip`` uploads.
+
+Remote users upload over slow links, so exports and text dumps are worth
+compressing. :func:`open_stream` recognises the container from its magic
+bytes and returns a file object that decompresses as it is read. Loaders
+consume it chunk by chunk (the Unibet tokenizer line by line, pyarrow's CSV
+reader block by block), so the decompressed file is never held in memory as
+one buffer.
+
+Formats that need random access (the ``.xlsx`` zip container, Parquet and
+Arrow footers) go through :func:`spool`. It streams into a
+``SpooledTemporaryFile`` that stays in memory up to ``PLAYWISE_SPOOL_MB`` and
+moves to disk beyond that.
+
+Zstandard support needs the optional ``zstandard`` package.
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+from typing import BinaryIO, Tuple
+
+try:  # Optional: only needed for ``.zst`` uploads
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the installation
+    zstandard = None
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+ZIP_MAGIC = b"PK\x03\x04"
+
+COMPRESSED_EXTENSIONS = ("gz", "zst", "zip")
+
+SPOOL_MAX_BYTES = int(os.environ.get("PLAYWISE_SPOOL_MB", "64")) * 1024 * 1024
+
+# Chunk size used when copying a stream into a spool.
+COPY_CHUNK_BYTES = 1024 * 1024
+
+
+def _is_archive(payload: bytes) -> bool:
+    # ``.xlsx`` files are zip containers too; only other zips are archives.
+    if not payload.startswith(ZIP_MAGIC):
+        return False
+    try:
+        with zipfile.ZipFile(io.BytesIO(payload)) as archive:
+            return "[Content_Types].xml" not in archive.namelist()
+    except zipfile.BadZipFile:
+        return False
+
+
+def compression_of(payload: bytes) -> str | None:
+    """``"gzip"``, ``"zstd"``, ``"zip"`` or ``None`` for an uncompressed payload."""
+
+    if payload.startswith(GZIP_MAGIC):
+        return "gzip"
+    if payload.startswith(ZSTD_MAGIC):
+        return "zstd"
+    if _is_archive(payload):
+        return "zip"
+    return None
+
+
+def _archive_member(archive: zipfile.ZipFile) -> zipfile.ZipInfo:
+    members = [info for info in archive.infolist() if not info.is_dir()]
+    if len(members) != 1:
+        raise ValueError("Zip uploads must contain exactly one file.")
+    return members[0]
+
+
+class _ArchiveMember(io.BufferedReader):
+    """Stream over the single member of a zip upload; closing it closes the archive too."""
+
+    def __init__(self, archive: zipfile.ZipFile):
+        self._archive = archive
+        try:
+            member = archive.open(_archive_member(archive))
+        except BaseException:
+            archive.close()
+            raise
+        super().__init__(member)
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self._archive.close()
+
+
+def open_stream(payload: bytes) -> BinaryIO:
+    """Readable binary stream over ``payload``, decompressing on the fly."""
+
+    kind = compression_of(payload)
+    source = io.BytesIO(payload)
+    if kind == "gzip":
+        return gzip.GzipFile(fileobj=source, mode="rb")
+    if kind == "zstd":
+        if zstandard is None:
+            raise ValueError("Reading .zst uploads needs the optional zstandard package.")
+        return zstandard.ZstdDecompressor().stream_reader(source)
+    if kind == "zip":
+        return _ArchiveMember(zipfile.ZipFile(source))
+    return source
+
+
+def inner_filename(payload: bytes, filename: str | None) -> str | None:
+    """Name of the decompressed file, used to fall back on its extension."""
+
+    kind = compression_of(payload)
+    if kind == "zip":
+        with zipfile.ZipFile(io.BytesIO(payload)) as archive:
+            return _archive_member(archive).filename
+    if kind is not None and filename and "." in filename:
+        return filename.rsplit(".", 1)[0]
+    return filename
+
+
+class _Prefixed(io.RawIOBase):
+    """Raw stream that replays ``head`` before reading on from ``stream``."""
+
+    def __init__(self, head: bytes, stream: BinaryIO):
+        self._head = memoryview(head)
+        self._stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if len(self._head):
+            size = min(len(buffer), len(self._head))
+            buffer[:size] = self._head[:size]
+            self._head = self._head[size:]
+            return size
+        return self._stream.readinto(buffer)
+
+
+def peek(stream: BinaryIO, size: int) -> Tuple[bytes, BinaryIO]:
+    """First ``size`` bytes of a (possibly unseekable) stream, plus a stream that still starts at 0."""
+
+    head = stream.read(size)
+    return head, io.BufferedReader(_Prefixed(head, stream))
+
+
+def spool(stream: BinaryIO) -> BinaryIO:
+    """Seekable copy of ``stream`` for readers that need random access."""
+
+    if isinstance(stream, io.BytesIO):
+        return stream
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    shutil.copyfileobj(stream, spooled, COPY_CHUNK_BYTES)
+    spooled.seek(0)
+    return spooled
+
+
+__all__ = [
+    "COMPRESSED_EXTENSIONS",
+    "compression_of",
+    "inner_filename",
+    "open_stream",
+    "peek",
+    "spool",
+]
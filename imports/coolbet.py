@@ -4,14 +4,25 @@ The app expects a standard schema regardless of where data originates.
 This module converts common Coolbet column names to the expected ones and
 performs light type cleaning so other backends can follow the same
 contract.
+
+Header resolution is done once per layout: :func:`column_plan` fingerprints
+the header row and caches a :class:`ColumnPlan` (renames, duplicate columns to
+coalesce, defaults to add), which :func:`apply_plan` applies to the frame.
 """
 
 from __future__ import annotations
 
-from typing import Dict, Iterable
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
+from imports.compression import spool
+from imports.money import to_cents
+from imports.parsing import parse_dates, parse_numbers
+from imports.registry import ImportResult
+
 
 # Expected canonical columns used by the analytics UI
 REQUIRED_COLUMNS = {"date", "rank", "ticket type", "product", "bets", "wins", "odds"}
@@ -33,18 +44,97 @@ class NormalizationError(ValueError):
     """Raised when a Coolbet file cannot be normalized."""
 
 
-def _apply_aliases(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    lower_to_original = {str(col).strip().lower(): col for col in df.columns}
-    rename_map: Dict[str, str] = {}
+# Placeholders for canonical columns an export may omit.
+COLUMN_DEFAULTS = {"rank": "unknown", "odds": 1.0}
+
+
+@dataclass(frozen=True)
+class ColumnPlan:
+    """How one header layout maps onto the canonical schema.
+
+    ``positions``/``names`` select and rename the columns that are kept.
+    ``coalesce`` lists, per canonical name with several source columns, the
+    positions whose first non-null value wins. ``defaults`` are added for
+    canonical columns the layout lacks, and ``missing`` holds required
+    columns that cannot be filled.
+    """
+
+    positions: Tuple[int, ...]
+    names: Tuple[str, ...]
+    coalesce: Tuple[Tuple[str, Tuple[int, ...]], ...]
+    defaults: Tuple[Tuple[str, object], ...]
+    missing: Tuple[str, ...]
+
+
+# Header row -> resolved plan. Exports of one bookmaker share a handful of
+# layouts, so repeat uploads skip header resolution entirely.
+_PLANS: Dict[Tuple[str, ...], ColumnPlan] = {}
+
 
+def _resolve_plan(header: Tuple[str, ...]) -> ColumnPlan:
+    names = [col.strip().lower() for col in header]
+    present = set(names)
+    rename_map: Dict[str, str] = {}
     for canonical, aliases in COLUMN_ALIASES.items():
-        for alias in aliases:
-            if alias in lower_to_original:
-                rename_map[lower_to_original[alias]] = canonical
-                break
+        # Sorted, so the same layout always resolves the same way.
+        alias = next((alias for alias in sorted(aliases) if alias in present), None)
+        if alias is not None:
+            rename_map[alias] = canonical
+    names = [rename_map.get(name, name) for name in names]
+
+    groups: Dict[str, List[int]] = {}
+    for position, name in enumerate(names):
+        groups.setdefault(name, []).append(position)
+    positions = tuple(group[0] for group in groups.values())
+
+    defaults = tuple((col, value) for col, value in COLUMN_DEFAULTS.items() if col not in groups)
+    return ColumnPlan(
+        positions=positions,
+        names=tuple(groups),
+        coalesce=tuple((name, tuple(group)) for name, group in groups.items() if len(group) > 1),
+        defaults=defaults,
+        missing=tuple(sorted(REQUIRED_COLUMNS - set(groups) - dict(defaults).keys())),
+    )
+
+
+def column_plan(columns: Iterable) -> ColumnPlan:
+    """Cached :class:`ColumnPlan` for a header row."""
+
+    header = tuple(str(col) for col in columns)
+    plan = _PLANS.get(header)
+    if plan is None:
+        plan = _PLANS[header] = _resolve_plan(header)
+    return plan
 
-    return df.rename(columns=rename_map)
+
+def _coalesce(df: pd.DataFrame, positions: Tuple[int, ...]) -> pd.Series:
+    # First non-null value per row across the duplicate columns, in one pass.
+    block = df.iloc[:, list(positions)]
+    first = block.notna().to_numpy().argmax(axis=1)
+    values = block.to_numpy()[np.arange(len(block)), first]
+    return pd.Series(values, index=df.index)
+
+
+def apply_plan(df: pd.DataFrame, plan: ColumnPlan) -> pd.DataFrame:
+    """Select, rename, coalesce and default ``df``'s columns as ``plan`` says."""
+
+    if plan.missing:
+        raise NormalizationError(
+            "Missing required columns after normalization: " + ", ".join(plan.missing)
+        )
+    # ``iloc`` + ``set_axis`` are lazy views under copy-on-write; the caller's
+    # frame is never modified.
+    normalized = df.iloc[:, list(plan.positions)].set_axis(list(plan.names), axis=1)
+    if plan.coalesce:
+        # Build every column at once instead of inserting the coalesced ones
+        # one by one, which fragments wide frames.
+        merged = {name: _coalesce(df, positions) for name, positions in plan.coalesce}
+        normalized = pd.DataFrame(
+            {name: merged[name] if name in merged else normalized[name] for name in plan.names}
+        )
+    for name, value in plan.defaults:
+        normalized[name] = value
+    return normalized
 
 
 def normalize_coolbet_data(df: pd.DataFrame) -> pd.DataFrame:
@@ -57,53 +147,68 @@ def normalize_coolbet_data(df: pd.DataFrame) -> pd.DataFrame:
         NormalizationError: if required columns are missing after normalization.
     """
 
-    normalized = df.copy()
-    normalized.columns = [str(col).strip().lower() for col in normalized.columns]
-    normalized = _apply_aliases(normalized)
-
-    # collapse any duplicated canonical columns by picking the first non-null value
-    # across duplicate headers (e.g. when both "result" and "status" map to "rank")
-    for col in set(normalized.columns):
-        duplicates = [c for c in normalized.columns if c == col]
-        if len(duplicates) > 1:
-            normalized[col] = normalized[duplicates].bfill(axis=1).iloc[:, 0]
-            normalized = normalized.drop(columns=duplicates[1:])
-
-    # If no alias resolves to ``rank`` (e.g. completely missing from the export),
-    # add a placeholder column so downstream grouping does not fail.
-    if "rank" not in normalized.columns:
-        normalized["rank"] = "unknown"
-
-    missing = REQUIRED_COLUMNS - set(normalized.columns)
-
-    # Some exports may omit total odds; treat it as neutral (1.0) instead of failing.
-    if "odds" in missing:
-        normalized["odds"] = 1.0
-        missing.remove("odds")
-
-    if missing:
-        raise NormalizationError(
-            "Missing required columns after normalization: " + ", ".join(sorted(missing))
-        )
+    normalized = apply_plan(df, column_plan(df.columns))
 
     normalized["ticket type"] = normalized["ticket type"].astype(str).str.strip().str.lower()
     normalized["product"] = normalized["product"].astype(str).str.strip().str.lower()
-    normalized["date"] = pd.to_datetime(normalized["date"].ffill())
+    normalized["date"] = parse_dates(normalized["date"].ffill())
     normalized["rank"] = (
         normalized["rank"].ffill().fillna("unknown").astype(str).str.strip().str.lower()
     )
 
-    for col in ["bets", "wins", "odds"]:
-        normalized[col] = pd.to_numeric(normalized[col], errors="coerce")
-
-    normalized["bets"] = normalized["bets"].fillna(0)
-    normalized["wins"] = normalized["wins"].fillna(0)
-    normalized["odds"] = normalized["odds"].fillna(1.0)
+    # Money is carried as int64 cents; missing amounts become 0.
+    normalized["bets"] = to_cents(normalized["bets"])
+    normalized["wins"] = to_cents(normalized["wins"])
+    normalized["odds"] = parse_numbers(normalized["odds"]).fillna(1.0)
 
     if "market name" in normalized.columns:
         normalized["market name"] = normalized["market name"].astype(str).str.strip()
 
+    # Columnar exports from upstream systems may already name the bookmaker.
+    if "bookmaker" not in normalized.columns:
+        normalized["bookmaker"] = "Coolbet"
+
     return normalized
 
 
-__all__ = ["NormalizationError", "normalize_coolbet_data"]
+def import_rows(
+    df_raw: pd.DataFrame, progress: Optional[Callable[[str, int, Optional[int]], None]] = None
+) -> ImportResult:
+    """Normalize raw export rows into an :class:`ImportResult`, reporting progress.
+
+    Shared by every backend whose files follow the Coolbet column contract.
+    """
+
+    if progress is not None:
+        progress("rows normalized", 0, len(df_raw))
+    normalized = normalize_coolbet_data(df_raw)
+    if progress is not None:
+        progress("rows normalized", len(df_raw), len(df_raw))
+    return ImportResult(rows=normalized)
+
+
+def import_coolbet_excel(stream: BinaryIO, progress=None) -> ImportResult:
+    """Registry loader for Coolbet ``.xlsx`` exports.
+
+    Workbooks are zip containers that need random access, so compressed
+    uploads are spooled (to disk past ``PLAYWISE_SPOOL_MB``) first.
+    """
+
+    if progress is not None:
+        progress("reading workbook", 0, None)
+    try:
+        df_raw = pd.read_excel(spool(stream))
+    except Exception as exc:
+        raise ValueError(f"Could not read Excel file: {exc}") from exc
+    return import_rows(df_raw, progress)
+
+
+__all__ = [
+    "ColumnPlan",
+    "NormalizationError",
+    "apply_plan",
+    "column_plan",
+    "import_coolbet_excel",
+    "import_rows",
+    "normalize_coolbet_data",
+]
@@ -0,0 +1,148 @@
+"""Background import jobs with pollable progress.
+
+Parsing a large Unibet paste or Excel export can take long enough to freeze
+the Streamlit script thread. Imports are therefore submitted to a small
+process-wide thread pool. Each job gets an id, reports ``(stage, done,
+total)`` progress that the UI polls, and hands its finished frame to the
+shared frame cache.
+
+Jobs are keyed by dataset key, so several sessions importing the same content
+share one job instead of parsing it twice. The same pool also runs the exact
+pass behind the sampled first view of very large histories.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+IMPORT_WORKERS = int(os.environ.get("PLAYWISE_IMPORT_WORKERS", "2"))
+
+# Finished jobs are kept this long so sessions can pick up their result.
+FINISHED_JOB_TTL_S = 15 * 60
+
+
+@dataclass
+class ImportJob:
+    job_id: str
+    dataset_key: str
+    label: str
+    status: str = "queued"
+    stage: str = "queued"
+    done: int = 0
+    total: Optional[int] = None
+    error: Optional[str] = None
+    previews: Dict[str, Any] = field(default_factory=dict)
+    finished_at: Optional[float] = None
+    future: Optional[Future] = field(default=None, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in {"done", "failed"}
+
+    @property
+    def fraction(self) -> float:
+        if self.status == "done":
+            return 1.0
+        if not self.total:
+            return 0.0
+        return min(max(self.done / self.total, 0.0), 1.0)
+
+    def describe(self) -> str:
+        if self.total:
+            return f"{self.label}: {self.stage} ({self.done:,}/{self.total:,})"
+        return f"{self.label}: {self.stage}"
+
+    def report(self, stage: str, done: int = 0, total: Optional[int] = None) -> None:
+        """Progress hook handed to the parsers."""
+
+        self.stage = stage
+        self.done = done
+        self.total = total
+
+
+_EXECUTOR: ThreadPoolExecutor | None = None
+_JOBS: Dict[str, ImportJob] = {}
+_JOBS_BY_KEY: Dict[str, str] = {}
+_LOCK = threading.Lock()
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = ThreadPoolExecutor(
+            max_workers=IMPORT_WORKERS, thread_name_prefix="playwise-import"
+        )
+    return _EXECUTOR
+
+
+def _prune(now: float) -> None:
+    stale = [
+        job_id
+        for job_id, job in _JOBS.items()
+        if job.finished_at is not None and now - job.finished_at > FINISHED_JOB_TTL_S
+    ]
+    for job_id in stale:
+        job = _JOBS.pop(job_id)
+        if _JOBS_BY_KEY.get(job.dataset_key) == job_id:
+            del _JOBS_BY_KEY[job.dataset_key]
+
+
+def _run(job: ImportJob, work: Callable[[ImportJob], Any]) -> None:
+    job.status = "running"
+    try:
+        work(job)
+    except Exception as exc:  # surfaced to the UI through ``job.error``
+        job.error = str(exc) or exc.__class__.__name__
+        job.status = "failed"
+    else:
+        job.status = "done"
+        job.stage = "finished"
+        if job.total:
+            job.done = job.total
+    finally:
+        job.finished_at = time.time()
+
+
+def submit_import(dataset_key: str, label: str, work: Callable[[ImportJob], Any]) -> ImportJob:
+    """Run ``work(job)`` in the background unless a job for the key is live.
+
+    ``work`` should store its result in the frame cache under ``dataset_key``
+    and report progress through ``job.report``. Raised exceptions mark the job
+    as failed with the exception message. Queued, running and finished jobs
+    are reused; a failed one is replaced by a fresh attempt.
+    """
+
+    with _LOCK:
+        _prune(time.time())
+        existing = job_for(dataset_key)
+        if existing is not None and existing.status != "failed":
+            return existing
+
+        job = ImportJob(job_id=uuid.uuid4().hex, dataset_key=dataset_key, label=label)
+        _JOBS[job.job_id] = job
+        _JOBS_BY_KEY[dataset_key] = job.job_id
+        job.future = _executor().submit(_run, job, work)
+        return job
+
+
+def get_job(job_id: str | None) -> ImportJob | None:
+    if job_id is None:
+        return None
+    return _JOBS.get(job_id)
+
+
+def job_for(dataset_key: str | None) -> ImportJob | None:
+    """Most recent job for ``dataset_key``, if any."""
+
+    if dataset_key is None:
+        return None
+    return _JOBS.get(_JOBS_BY_KEY.get(dataset_key, ""))
+
+
+__all__ = ["ImportJob", "get_job", "job_for", "submit_import"]
@@ -0,0 +1,46 @@
+"""Money helpers for the canonical PlayWise schema.
+
+Stakes and returns (``bets``/``wins``) travel through the pipeline as int64
+cents so sums stay exact and no rounding passes are needed. Values are turned
+back into euros only when they are displayed.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from imports.parsing import parse_numbers
+
+CENTS_PER_EURO = 100
+
+# Canonical columns that carry money amounts in cents
+MONEY_COLUMNS = ("bets", "wins")
+
+
+def to_cents(values: pd.Series) -> pd.Series:
+    """Convert euro amounts (numbers or strings such as ``€1,50``) to int64 cents.
+
+    Non-numeric values become 0, matching how the normalizers treat missing
+    stakes and payouts.
+    """
+
+    euros = parse_numbers(values).fillna(0.0)
+    return pd.Series(
+        np.rint(euros.to_numpy() * CENTS_PER_EURO).astype(np.int64),
+        index=values.index,
+        name=values.name,
+    )
+
+
+def to_euros(cents):
+    """Convert cents (scalar, array or series) to euros for display."""
+
+    return cents / CENTS_PER_EURO
+
+
+def format_euros(cents) -> str:
+    return f"{to_euros(cents):.2f} €"
+
+
+__all__ = ["CENTS_PER_EURO", "MONEY_COLUMNS", "format_euros", "to_cents", "to_euros"]
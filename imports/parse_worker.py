@@ -0,0 +1,24 @@
+"""Entry module preloaded into the forkserver that starts the parse workers.
+
+Worker processes are forked from that server and normally re-run the parent's
+main module before they take work. Under Streamlit the main module is the app
+script, which must never run in a worker. This module is imported only by the
+forkserver, never by the app, and turns that step off for the processes forked
+from it. The workers then only hold :mod:`imports.unibet_sections` and the
+language packs.
+"""
+
+from __future__ import annotations
+
+from multiprocessing import spawn
+
+import imports.unibet_sections  # noqa: F401  (preloaded for the workers)
+
+
+def _keep_main(_main: str) -> None:
+    # The workers unpickle nothing from the parent's main module.
+    return None
+
+
+spawn._fixup_main_from_name = _keep_main
+spawn._fixup_main_from_path = _keep_main
@@ -0,0 +1,169 @@
+"""Vectorized number and date parsing shared by the import backends.
+
+Exports write amounts and timestamps the way their locale does: ``€10,50``,
+``1.234,56``, ``1 234.56`` or ``01.02.2023 klo 10.00.00``. Parsing such values
+one at a time with ``float``/``strptime`` is slow, and ``pd.to_numeric`` on its
+own turns ``"1,50"`` into NaN without a warning.
+
+:func:`parse_numbers` converts plain numbers directly and cleans the remaining
+strings as one column: it strips currency signs and spaces, decides once per
+column whether the comma is the decimal or the thousands separator, and
+converts the result in one ``pd.to_numeric`` call.
+
+:func:`parse_dates` works the same way for dates. It normalizes localized
+separators (``klo``, ``•``), then picks an explicit format from
+``DATE_FORMATS`` that parses a sample of the column. Detected formats are
+cached by the shape of the first value (its digits masked), so later uploads
+of the same layout skip the detection; a cached format is only reused while it
+still parses most of the sample. Values the chosen format misses are tried
+against the other ``DATE_FORMATS`` and finally left to pandas' inference,
+which is told to read day first like the explicit formats.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+# Currency signs and (non-breaking, narrow or apostrophe) group separators.
+NUMBER_NOISE = r"[€$£\s\u00a0\u202f']"
+
+# A comma-only value that is really thousands grouping, e.g. ``12,345``.
+THOUSANDS_GROUPS = r"[-+]?\d{1,3}(?:,\d{3})+"
+
+# Explicit formats tried in order; European day-first layouts only.
+DATE_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+    "%d.%m.%Y %H.%M.%S",
+    "%d.%m.%Y %H:%M:%S",
+    "%d.%m.%Y %H.%M",
+    "%d.%m.%Y %H:%M",
+    "%d.%m.%Y",
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%Y",
+)
+
+# How many values a candidate format must parse before it is chosen.
+FORMAT_SAMPLE = 100
+
+# Share of the sample a cached format must parse to be reused.
+FORMAT_MIN_SHARE = 0.9
+
+# Value shape (digits masked) -> detected format.
+_FORMAT_CACHE: Dict[str, str] = {}
+
+
+def _comma_is_decimal(text: pd.Series) -> bool:
+    has_comma = text.str.contains(",", regex=False, na=False)
+    if not has_comma.any():
+        return False
+    both = has_comma & text.str.contains(".", regex=False, na=False)
+    if both.any():
+        # ``1.234,56`` vs ``1,234.56``: the last separator is the decimal one.
+        return bool((text[both].str.rfind(",") > text[both].str.rfind(".")).mean() >= 0.5)
+    return not text[has_comma].str.fullmatch(THOUSANDS_GROUPS).all()
+
+
+def parse_numbers(values: pd.Series) -> pd.Series:
+    """Parse a column of amounts or odds to float64; unparseable values become NaN."""
+
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        return values.astype("float64")
+
+    # Plain numbers (and numeric cells of a mixed Excel column) convert as is;
+    # only the leftover strings need cleaning.
+    parsed = pd.to_numeric(values, errors="coerce").astype("float64")
+    pending = parsed.isna() & values.notna()
+    if not pending.any():
+        return parsed
+
+    text = values[pending].astype("string").str.replace(NUMBER_NOISE, "", regex=True)
+    if _comma_is_decimal(text):
+        text = text.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    else:
+        text = text.str.replace(",", "", regex=False)
+    parsed[pending] = pd.to_numeric(text, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    return parsed
+
+
+def _shape(value: str) -> str:
+    return re.sub(r"\d", "9", value)
+
+
+def _detect_format(text: pd.Series) -> str | None:
+    sample = text.dropna().head(FORMAT_SAMPLE)
+    key = _shape(sample.iloc[0])
+    cached = _FORMAT_CACHE.get(key)
+    # Columns can share the first value's shape and still differ further down.
+    if cached is not None and (
+        pd.to_datetime(sample, format=cached, errors="coerce").notna().mean() >= FORMAT_MIN_SHARE
+    ):
+        return cached
+    fmt = next(
+        (
+            fmt
+            for fmt in DATE_FORMATS
+            if pd.to_datetime(sample, format=fmt, errors="coerce").notna().all()
+        ),
+        None,
+    )
+    if fmt is not None:
+        _FORMAT_CACHE[key] = fmt
+    return fmt
+
+
+def _parse_remaining(text: pd.Series, errors: str) -> pd.Series:
+    # Values outside the detected layout: the other known formats first, then
+    # pandas' inference, day first so ``06/02/2024`` stays 6 February.
+    parsed = pd.Series(pd.NaT, index=text.index, dtype="datetime64[ns]")
+    for fmt in DATE_FORMATS:
+        pending = parsed.isna() & text.notna()
+        if not pending.any():
+            return parsed
+        parsed[pending] = pd.to_datetime(text[pending], format=fmt, errors="coerce")
+    pending = parsed.isna() & text.notna()
+    if pending.all():
+        return pd.to_datetime(text, errors=errors, format="mixed", dayfirst=True)
+    if pending.any():
+        parsed[pending] = pd.to_datetime(text[pending], errors=errors, format="mixed", dayfirst=True)
+    return parsed
+
+
+def parse_dates(values: pd.Series, errors: str = "raise", time_words: Iterable[str] = ()) -> pd.Series:
+    """Parse a column of timestamps to datetime64[ns] (naive unless offsets are given).
+
+    ``time_words`` are the localized words written between date and time
+    (``klo`` in Finnish exports). ``errors`` is passed to ``pd.to_datetime``
+    for values that no explicit format parses.
+    """
+
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        return values
+    if pd.api.types.infer_dtype(values, skipna=True) not in {"string", "mixed"}:
+        return pd.to_datetime(values, errors=errors)
+
+    text = values.astype("string").str.strip()
+    words = "|".join(re.escape(word) for word in time_words)
+    word = rf"(?:(?:{words})\s*)?" if words else ""
+    text = text.str.replace(rf"(?<=\d),?\s+{word}(?:•\s*)?(?=\d)", " ", regex=True)
+    if text.isna().all():
+        return pd.to_datetime(values, errors=errors)
+
+    fmt = _detect_format(text)
+    if fmt is None:
+        return _parse_remaining(text, errors)
+    parsed = pd.to_datetime(text, format=fmt, errors="coerce")
+    unparsed = parsed.isna() & text.notna()
+    if unparsed.any():
+        parsed[unparsed] = _parse_remaining(text[unparsed], errors)
+    return parsed
+
+
+__all__ = ["DATE_FORMATS", "parse_dates", "parse_numbers"]
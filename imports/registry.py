@@ -0,0 +1,205 @@
+"""Registry of import backends with format sniffing and lazy loading.
+
+Each :class:`ImportBackend` names the module and function that turn a raw
+payload into canonical rows, plus a ``sniff`` check that recognises its
+format from the first few KB of the payload. Sniffers only look at bytes
+(zip magic for ``.xlsx``, Parquet and Arrow magic, Unibet labels in any
+supported language, known CSV headers), so
+detecting a format never imports a backend. The backend module is imported
+only by :meth:`ImportBackend.load` when an upload of that format arrives, so
+registering more bookmakers does not slow down app startup.
+
+Compressed uploads (``.gz``, ``.zst``, ``.zip``) are sniffed on their
+decompressed head. Loaders are called as ``loader(stream, progress=None,
+**options)`` with a binary stream from :func:`imports.compression.open_stream`
+and return an :class:`ImportResult`.
+"""
+
+from __future__ import annotations
+
+import importlib
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from imports.compression import COMPRESSED_EXTENSIONS, inner_filename, open_stream
+from imports.unibet_locales import locale_votes
+
+# How much of an upload the sniffers look at.
+SNIFF_BYTES = 4096
+
+ZIP_MAGIC = b"PK\x03\x04"
+PARQUET_MAGIC = b"PAR1"
+ARROW_MAGIC = b"ARROW1"
+
+# Header names that mark a delimited export of bet history.
+CSV_HEADER_HINTS = {"stake", "odds", "placed", "result", "bet type", "return", "payout", "date"}
+
+
+@dataclass
+class ImportResult:
+    """Canonical rows of an import, plus parsed legs and preview frames if any."""
+
+    rows: pd.DataFrame
+    legs: Optional[pd.DataFrame] = None
+    previews: Dict[str, pd.DataFrame] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class ImportBackend:
+    name: str
+    label: str
+    module: str
+    loader: str
+    extensions: Tuple[str, ...]
+    sniff: Callable[[bytes], bool]
+
+    def load(self) -> Callable[..., ImportResult]:
+        """Import the backend module on first use and return its loader."""
+
+        return getattr(importlib.import_module(self.module), self.loader)
+
+
+def _text(head: bytes) -> str:
+    if head.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return head.decode("utf-16", errors="ignore")
+    return head.decode("utf-8", errors="ignore")
+
+
+def sniff_xlsx(head: bytes) -> bool:
+    return head.startswith(ZIP_MAGIC) and (b"xl/" in head or b"[Content_Types].xml" in head)
+
+
+def sniff_parquet(head: bytes) -> bool:
+    return head.startswith(PARQUET_MAGIC)
+
+
+def sniff_arrow(head: bytes) -> bool:
+    return head.startswith(ARROW_MAGIC)
+
+
+def sniff_unibet(head: bytes) -> bool:
+    # Two labels of one language (e.g. coupon id and stake) mark a history.
+    votes = locale_votes(_text(head))
+    return bool(votes) and max(votes.values()) >= 2
+
+
+def sniff_csv(head: bytes) -> bool:
+    first_line = _text(head).lstrip("\ufeff").splitlines()[0] if head.strip() else ""
+    fields = {part.strip().strip('"').lower() for part in re.split(r"[,;\t]", first_line)}
+    return len(fields) > 1 and len(fields & CSV_HEADER_HINTS) >= 2
+
+
+_BACKENDS: List[ImportBackend] = []
+
+
+def register_backend(backend: ImportBackend) -> ImportBackend:
+    """Add ``backend`` (replacing one with the same name); returns it."""
+
+    _BACKENDS[:] = [existing for existing in _BACKENDS if existing.name != backend.name]
+    _BACKENDS.append(backend)
+    return backend
+
+
+def get_backend(name: str) -> ImportBackend:
+    for backend in _BACKENDS:
+        if backend.name == name:
+            return backend
+    raise KeyError(f"Unknown import backend: {name}")
+
+
+def available_backends() -> Sequence[ImportBackend]:
+    return tuple(_BACKENDS)
+
+
+def upload_extensions() -> List[str]:
+    """File extensions accepted by the upload widget."""
+
+    return sorted({ext for backend in _BACKENDS for ext in backend.extensions} | set(COMPRESSED_EXTENSIONS))
+
+
+def sniff_backend(payload: bytes, filename: str | None = None) -> ImportBackend | None:
+    """Pick the backend for an upload from its first bytes, else its extension.
+
+    Compressed payloads are judged by their decompressed head and inner name.
+    Raises ``ValueError`` for archives that cannot be opened.
+    """
+
+    filename = inner_filename(payload, filename)
+    with open_stream(payload) as stream:
+        head = stream.read(SNIFF_BYTES)
+    for backend in _BACKENDS:
+        if backend.sniff(head):
+            return backend
+    if filename:
+        extension = filename.rsplit(".", 1)[-1].lower()
+        for backend in _BACKENDS:
+            if extension in backend.extensions:
+                return backend
+    return None
+
+
+# Sniffers run in registration order: the most specific formats come first.
+register_backend(
+    ImportBackend(
+        name="unibet",
+        label="Unibet bet history",
+        module="imports.unibet_paste",
+        loader="import_unibet_text",
+        extensions=("txt",),
+        sniff=sniff_unibet,
+    )
+)
+register_backend(
+    ImportBackend(
+        name="coolbet",
+        label="Coolbet Excel export",
+        module="imports.coolbet",
+        loader="import_coolbet_excel",
+        extensions=("xlsx",),
+        sniff=sniff_xlsx,
+    )
+)
+register_backend(
+    ImportBackend(
+        name="parquet",
+        label="Parquet bet history",
+        module="imports.tabular",
+        loader="import_parquet",
+        extensions=("parquet", "pq"),
+        sniff=sniff_parquet,
+    )
+)
+register_backend(
+    ImportBackend(
+        name="arrow",
+        label="Arrow / Feather bet history",
+        module="imports.tabular",
+        loader="import_arrow",
+        extensions=("arrow", "feather"),
+        sniff=sniff_arrow,
+    )
+)
+register_backend(
+    ImportBackend(
+        name="csv",
+        label="CSV bet history",
+        module="imports.tabular",
+        loader="import_csv",
+        extensions=("csv",),
+        sniff=sniff_csv,
+    )
+)
+
+
+__all__ = [
+    "ImportBackend",
+    "ImportResult",
+    "available_backends",
+    "get_backend",
+    "register_backend",
+    "sniff_backend",
+    "upload_extensions",
+]
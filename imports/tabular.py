@@ -0,0 +1,138 @@
+"""Parquet, Arrow IPC and CSV import backends for the canonical schema.
+
+Bet history exported from upstream systems is usually already columnar. These
+loaders follow the Coolbet contract: headers are mapped onto
+``REQUIRED_COLUMNS`` through ``COLUMN_ALIASES`` and the result goes through
+:func:`imports.coolbet.normalize_coolbet_data`. Before any data is read, each
+loader inspects the file schema (or the CSV header line) and reads only the
+columns that map onto the canonical schema, plus the optional leg columns.
+
+Files are read with pyarrow when it is installed. Numeric columns are
+converted to pandas without copying where Arrow's layout allows
+(``split_blocks`` + ``self_destruct``), timestamps come out in nanoseconds like
+the other backends, and string columns become
+Arrow-backed ``string[pyarrow]`` columns instead of Python objects. Without
+pyarrow, CSV falls back to pandas' C parser and Parquet/Arrow files are
+rejected with a clear error.
+"""
+
+from __future__ import annotations
+
+import csv
+from typing import BinaryIO, List, Tuple
+
+import pandas as pd
+
+from imports.compression import peek, spool
+from imports.coolbet import COLUMN_ALIASES, import_rows
+from imports.registry import ImportResult
+
+try:  # Optional: fast columnar readers and Arrow-backed frames
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.feather as pa_feather
+    import pyarrow.ipc  # noqa: F401 - registers ``pa.ipc``
+    import pyarrow.parquet as pa_parquet
+except ImportError:  # pragma: no cover - depends on the installation
+    pa = None
+
+# Non-canonical columns still worth reading: the leg views use them.
+EXTRA_COLUMNS = {"event", "selection", "bookmaker"}
+
+WANTED_COLUMNS = (
+    {alias for aliases in COLUMN_ALIASES.values() for alias in aliases}
+    | set(COLUMN_ALIASES)
+    | EXTRA_COLUMNS
+)
+
+
+def wanted_columns(names: List[str]) -> List[str]:
+    """Columns of ``names`` that map onto the canonical schema (original spelling)."""
+
+    return [name for name in names if str(name).strip().lower() in WANTED_COLUMNS]
+
+
+def _arrow_to_pandas(table) -> pd.DataFrame:
+    strings = {pa.string(): pd.StringDtype("pyarrow"), pa.large_string(): pd.StringDtype("pyarrow")}
+    return table.to_pandas(
+        types_mapper=strings.get,
+        split_blocks=True,
+        self_destruct=True,
+        coerce_temporal_nanoseconds=True,
+    )
+
+
+def _require_pyarrow(kind: str) -> None:
+    if pa is None:
+        raise ValueError(f"Reading {kind} files needs the optional pyarrow package.")
+
+
+def import_parquet(stream: BinaryIO, progress=None) -> ImportResult:
+    """Registry loader for Parquet files (spooled: the footer needs random access)."""
+
+    _require_pyarrow("Parquet")
+    if progress is not None:
+        progress("reading file", 0, None)
+    try:
+        source = pa_parquet.ParquetFile(spool(stream))
+        table = source.read(columns=wanted_columns(source.schema_arrow.names))
+    except (pa.ArrowException, OSError) as exc:
+        raise ValueError(f"Could not read Parquet file: {exc}") from exc
+    return import_rows(_arrow_to_pandas(table), progress)
+
+
+def import_arrow(stream: BinaryIO, progress=None) -> ImportResult:
+    """Registry loader for Arrow IPC / Feather v2 files (spooled like Parquet)."""
+
+    _require_pyarrow("Arrow")
+    if progress is not None:
+        progress("reading file", 0, None)
+    try:
+        # Read the schema from the footer, then only the wanted columns.
+        source = spool(stream)
+        start = source.tell()
+        names = pa.ipc.open_file(source).schema.names
+        source.seek(start)
+        table = pa_feather.read_table(source, columns=wanted_columns(names), memory_map=False)
+    except (pa.ArrowException, OSError) as exc:
+        raise ValueError(f"Could not read Arrow file: {exc}") from exc
+    return import_rows(_arrow_to_pandas(table), progress)
+
+
+# Enough bytes to hold the header line of any export.
+HEADER_BYTES = 64 * 1024
+
+
+def _csv_header(head: bytes) -> Tuple[List[str], str]:
+    first_line = head.decode("utf-8-sig", errors="replace").splitlines()[0]
+    delimiter = max([",", ";", "\t"], key=first_line.count)
+    return next(csv.reader([first_line], delimiter=delimiter)), delimiter
+
+
+def import_csv(stream: BinaryIO, progress=None) -> ImportResult:
+    """Registry loader for delimited text (comma, semicolon or tab separated).
+
+    The header is peeked from the stream, which is then parsed block by block.
+    """
+
+    if progress is not None:
+        progress("reading file", 0, None)
+    try:
+        head, stream = peek(stream, HEADER_BYTES)
+        header, delimiter = _csv_header(head)
+        columns = wanted_columns(header)
+        if pa is not None:
+            table = pa_csv.read_csv(
+                stream,
+                parse_options=pa_csv.ParseOptions(delimiter=delimiter),
+                convert_options=pa_csv.ConvertOptions(include_columns=columns),
+            )
+            df_raw = _arrow_to_pandas(table)
+        else:
+            df_raw = pd.read_csv(stream, sep=delimiter, usecols=columns)
+    except Exception as exc:
+        raise ValueError(f"Could not read CSV file: {exc}") from exc
+    return import_rows(df_raw, progress)
+
+
+__all__ = ["import_arrow", "import_csv", "import_parquet", "wanted_columns"]
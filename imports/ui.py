@@ -1,7 +1,10 @@
 """UI helpers and style utilities for PlayWisee."""
 
+import pandas as pd
 import streamlit as st
 
+from imports.registry import upload_extensions
+
 GLOBAL_CSS = """
 <style>
 @import url('https://fonts.googleapis.com/css2?family=Sora:wght@300;400;500;600;700;800&family=Barlow:wght@400;600;700&display=swap');
@@ -846,11 +849,59 @@ def spacer(height: int = 32) -> None:
 
 
 def render_sidebar_loader(parse_unibet_callback):
-    uploaded_file = st.file_uploader("", type=["xlsx"], key="sidebar_excel", label_visibility="collapsed")
+    uploaded_files = st.file_uploader(
+        "", type=upload_extensions(), key="sidebar_excel", label_visibility="collapsed", accept_multiple_files=True
+    )
     with st.expander("Or paste Unibet bet history", expanded=False):
         raw_text_sidebar = st.text_area("Paste your Unibet bet history here", height=180, key="sidebar_unibet")
         parse_unibet_callback(raw_text_sidebar, "parse_unibet_paste_sidebar")
-    return uploaded_file
+    return uploaded_files
+
+
+FILTER_FIELDS = [
+    ("bookmakers", "Bookmaker"),
+    ("products", "Product"),
+    ("ticket_types", "Ticket type"),
+    ("market_groups", "Market group"),
+    ("ranks", "Result"),
+    ("odds_bands", "Odds band"),
+    ("legs", "Legs"),
+]
+
+
+def render_filter_panel(filter_index, first_date, last_date) -> dict:
+    """Sidebar filter controls; returns the selections keyed like ``FilterSpec``."""
+
+    selections = {}
+    with st.expander("Filters", expanded=False):
+        first_day, last_day = first_date.date(), last_date.date()
+        # A new or extended dataset resets the range to its full span.
+        if st.session_state.get("filter_date_bounds") != (first_day, last_day):
+            st.session_state["filter_date_bounds"] = (first_day, last_day)
+            st.session_state.pop("filter_dates", None)
+        picked = st.date_input(
+            "Date range",
+            value=(first_day, last_day),
+            min_value=first_day,
+            max_value=last_day,
+            key="filter_dates",
+        )
+        if isinstance(picked, (tuple, list)) and len(picked) == 2:
+            start, end = picked
+            if start != first_day:
+                selections["start"] = pd.Timestamp(start)
+            if end != last_day:
+                # The end date is inclusive in the UI and exclusive in the spec.
+                selections["end"] = pd.Timestamp(end) + pd.Timedelta(days=1)
+
+        for field_name, label in FILTER_FIELDS:
+            options = filter_index.options(field_name)
+            if len(options) < 2:
+                continue
+            chosen = st.multiselect(label, options, key=f"filter_{field_name}")
+            if chosen:
+                selections[field_name] = tuple(chosen)
+    return selections
 
 
 def render_hero(parse_unibet_callback):
@@ -888,8 +939,20 @@ def render_hero(parse_unibet_callback):
     return None
 
 
-def render_stats_overview(user_stats: dict, benchmark_stats: dict, deltas: dict):
-    """Render a compact benchmark comparison with deltas and bars."""
+def render_stats_overview(
+    user_stats: dict,
+    benchmark_stats: dict,
+    deltas: dict,
+    percentiles: dict | None = None,
+    benchmark_note: str = "Benchmarks from community-wide averages",
+):
+    """Render a compact benchmark comparison with deltas and bars.
+
+    ``percentiles`` optionally maps each metric to the user's percentile rank
+    (0–100) among community imports and is shown next to the baseline.
+    """
+
+    percentiles = percentiles or {}
 
     def format_value(label: str, value: float) -> str:
         if value is None:
@@ -930,6 +993,8 @@ def render_stats_overview(user_stats: dict, benchmark_stats: dict, deltas: dict)
         delta_display = "—" if delta_val is None else (f"{sign}{delta_val:.1f} {arrow}" if delta_val != 0 else "0.0")
         fill = calc_fill(user_val, avg_val) * 100
         delta_class = "is-muted" if delta_val is None else ("is-pos" if is_positive else "is-neg")
+        rank = percentiles.get(label)
+        rank_html = "" if rank is None else f"<span class=\"pw-compare-baseline\">P{rank:.0f}</span>"
         rows_html.append(
             f"""
             <div class=\"pw-compare-row\">
@@ -940,6 +1005,7 @@ def render_stats_overview(user_stats: dict, benchmark_stats: dict, deltas: dict)
                 <div class=\"pw-compare-sub\">
                     <span class=\"pw-compare-delta {delta_class}\">{delta_display}</span>
                     <span class=\"pw-compare-baseline\">Avg: {format_value(label, avg_val)}</span>
+                    {rank_html}
                 </div>
                 <div class=\"pw-compare-bar\">
                     <div class=\"pw-compare-bar__fill\" style=\"width:{fill:.1f}%;\"></div>
@@ -949,11 +1015,11 @@ def render_stats_overview(user_stats: dict, benchmark_stats: dict, deltas: dict)
         )
 
     st.markdown(
-        """
+        f"""
         <div class="pw-compare-card">
             <div class="pw-compare-head">
                 <div class="pw-compare-title">Stats vs Average Bettor</div>
-                <div class="pw-compare-meta">Benchmarks from community-wide averages</div>
+                <div class="pw-compare-meta">{benchmark_note}</div>
             </div>
             <div class="pw-compare-grid">
         """,
@@ -976,6 +1042,7 @@ __all__ = [
     "open_page_wrap",
     "close_page_wrap",
     "render_sidebar_loader",
+    "render_filter_panel",
     "render_hero",
     "render_stats_overview",
     "spacer",
@@ -0,0 +1,248 @@
+"""Language packs for the Unibet history parser.
+
+Unibet localizes every label of its bet history: the coupon id line, stake,
+payout and odds labels, the word between date and time, bet-type headers and
+the ticket status. Each :class:`UnibetLocale` holds those words for one site
+language and compiles them into a single scanner, an alternation with one
+named group per field, so a section is scanned once instead of once per
+field.
+
+The language is detected once per history from its first lines
+(:func:`detect_locale`) with one combined pattern of every pack's labels.
+Adding a locale therefore does not add work per section. Status and bet-type
+words are mapped, per pack, to the canonical ``won``/``lost``/``pending``/
+``void`` ranks and ``single``/``double``/``triple``/``parlay`` ticket types. A
+status only counts when it fills its own line (optionally glued to the bet
+type, as in ``TuplaVoitettu``), so team names such as "US Open" never set one.
+
+Only the Finnish pack has been checked against real exports. The others are
+flagged ``experimental``: their labels follow the site's wording but may miss
+variants, and the UI says so when one of them is detected.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Pattern, Tuple
+
+# How many non-empty lines :func:`detect_locale` looks at.
+DETECT_LINES = 200
+
+
+def _alternation(words: Iterable[str]) -> str:
+    # Longest first, so a word never loses to a shorter word it starts with.
+    return "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+
+@dataclass(frozen=True)
+class UnibetLocale:
+    code: str
+    coupon: str
+    stake: str
+    payout: str
+    odds: str
+    time_word: str
+    history_toggle: str
+    statuses: Dict[str, str]
+    bet_types: Dict[str, str]
+    experimental: bool = False
+    coupon_pattern: Pattern[str] = field(init=False, repr=False, compare=False)
+    header_pattern: Pattern[str] = field(init=False, repr=False, compare=False)
+    scanner: Pattern[str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        number = r"€?\s*(?P<{}>[0-9.,]+)"
+        date = (
+            r"(?P<date>(?P<day>\d{2})[./](?P<month>\d{2})[./](?P<year>\d{4}),?\s*"
+            + rf"(?:{re.escape(self.time_word)})?\s*[•.]?\s*"
+            + r"(?P<hour>\d{2})[.:](?P<minute>\d{2})[.:](?P<second>\d{2}))"
+        )
+        fields = [
+            rf"(?P<coupon>{re.escape(self.coupon)}:\s*(?P<coupon_value>\d+))",
+            rf"(?P<stake>{re.escape(self.stake)}:\s*{number.format('stake_value')})",
+            rf"(?P<payout>{re.escape(self.payout)}:\s*{number.format('payout_value')})",
+            rf"(?P<odds>{re.escape(self.odds)}:\s*{number.format('odds_value')})",
+            date,
+            # The whole line, optionally after the bet type (``Tuplavoitettu``).
+            rf"^(?:{_alternation(self.bet_types)})?\s*(?P<status>{_alternation(self.statuses)})\s*$",
+        ]
+        # Frozen dataclass: compiled patterns are set through ``object``.
+        object.__setattr__(
+            self, "coupon_pattern", re.compile(rf"{re.escape(self.coupon)}:\s*(\d+)", re.IGNORECASE)
+        )
+        object.__setattr__(
+            self, "header_pattern", re.compile(rf"^({_alternation(self.bet_types)})", re.IGNORECASE)
+        )
+        object.__setattr__(
+            self, "scanner", re.compile("|".join(fields), re.IGNORECASE | re.MULTILINE)
+        )
+
+    def scan(self, text: str) -> Dict[str, re.Match]:
+        """First match of each field (``coupon``, ``date``, ``status``, ...) in ``text``."""
+
+        found: Dict[str, re.Match] = {}
+        for match in self.scanner.finditer(text):
+            found.setdefault(match.lastgroup, match)
+            if len(found) == 6:
+                break
+        return found
+
+    @property
+    def markers(self) -> Tuple[str, ...]:
+        """Labels that identify this language in a history."""
+
+        return tuple(f"{label.lower()}:" for label in (self.coupon, self.stake, self.odds))
+
+
+FINNISH = UnibetLocale(
+    code="fi",
+    coupon="Kuponkitunnus",
+    stake="Panos",
+    payout="Voitto",
+    odds="Kertoimet",
+    time_word="klo",
+    history_toggle="Näytä tapahtumahistoria",
+    statuses={
+        "Voitettu": "won",
+        "Vireillä": "pending",
+        "Vireilla": "pending",
+        "Hävitty": "lost",
+        "Havitty": "lost",
+        "Peruttu": "void",
+    },
+    bet_types={"Single": "single", "Tupla": "double", "Tripla": "triple", "Parlay": "parlay"},
+)
+
+SWEDISH = UnibetLocale(
+    code="sv",
+    coupon="Kupong-ID",
+    stake="Insats",
+    payout="Vinst",
+    odds="Odds",
+    time_word="kl.",
+    history_toggle="Visa händelsehistorik",
+    statuses={
+        "Vunnen": "won",
+        "Vunnet": "won",
+        "Förlorad": "lost",
+        "Pågående": "pending",
+        "Annullerad": "void",
+    },
+    bet_types={"Singel": "single", "Dubbel": "double", "Trippel": "triple", "Kombination": "parlay"},
+    experimental=True,
+)
+
+NORWEGIAN = UnibetLocale(
+    code="no",
+    coupon="Kupong-ID",
+    stake="Innsats",
+    payout="Gevinst",
+    odds="Odds",
+    time_word="kl.",
+    history_toggle="Vis hendelseshistorikk",
+    statuses={"Vunnet": "won", "Tapt": "lost", "Åpen": "pending", "Annullert": "void"},
+    bet_types={"Singel": "single", "Dobbel": "double", "Trippel": "triple", "Kombinasjon": "parlay"},
+    experimental=True,
+)
+
+DANISH = UnibetLocale(
+    code="da",
+    coupon="Kupon-ID",
+    stake="Indsats",
+    payout="Gevinst",
+    odds="Odds",
+    time_word="kl.",
+    history_toggle="Vis hændelseshistorik",
+    statuses={"Vundet": "won", "Tabt": "lost", "Afventer": "pending", "Annulleret": "void"},
+    bet_types={"Single": "single", "Double": "double", "Tripel": "triple", "Kombination": "parlay"},
+    experimental=True,
+)
+
+ENGLISH = UnibetLocale(
+    code="en",
+    coupon="Coupon ID",
+    stake="Stake",
+    payout="Winnings",
+    odds="Odds",
+    time_word="at",
+    history_toggle="Show event history",
+    statuses={
+        "Won": "won",
+        "Lost": "lost",
+        "Pending": "pending",
+        "Open": "pending",
+        "Void": "void",
+        "Cancelled": "void",
+    },
+    bet_types={
+        "Single": "single",
+        "Double": "double",
+        "Treble": "triple",
+        "Accumulator": "parlay",
+        "Parlay": "parlay",
+    },
+    experimental=True,
+)
+
+# Detection ties go to the earlier pack; Finnish is the default.
+LOCALES: Dict[str, UnibetLocale] = {
+    locale.code: locale for locale in (FINNISH, SWEDISH, NORWEGIAN, DANISH, ENGLISH)
+}
+
+# Localized word -> canonical value, per pack: ``STATUS_RANKS["fi"]["voitettu"]``.
+# Kept apart so one language's word never reinterprets another's.
+STATUS_RANKS: Dict[str, Dict[str, str]] = {
+    code: {word.lower(): rank for word, rank in locale.statuses.items()}
+    for code, locale in LOCALES.items()
+}
+TICKET_TYPES: Dict[str, Dict[str, str]] = {
+    code: {word.lower(): kind for word, kind in locale.bet_types.items()}
+    for code, locale in LOCALES.items()
+}
+
+# Which packs use each marker label (``Kupong-ID:`` is shared, for example).
+_MARKER_LOCALES: Dict[str, Tuple[str, ...]] = {}
+for _locale in LOCALES.values():
+    for _marker in _locale.markers:
+        _MARKER_LOCALES[_marker] = _MARKER_LOCALES.get(_marker, ()) + (_locale.code,)
+MARKER_PATTERN = re.compile(_alternation(_MARKER_LOCALES), re.IGNORECASE)
+
+# Coupon ids in any language, for dedup against already loaded histories.
+ANY_COUPON_PATTERN = re.compile(
+    rf"(?:{_alternation({locale.coupon for locale in LOCALES.values()})}):\s*(\d+)", re.IGNORECASE
+)
+
+
+def locale_votes(text: str) -> Counter:
+    """How many marker labels of each language occur in ``text``."""
+
+    votes: Counter = Counter()
+    for match in MARKER_PATTERN.finditer(text):
+        votes.update(_MARKER_LOCALES[match.group(0).lower()])
+    return votes
+
+
+def detect_locale(lines: Iterable[str]) -> UnibetLocale:
+    """Language pack of a history, judged from its first ``DETECT_LINES`` lines."""
+
+    votes = locale_votes("\n".join(lines))
+    if not votes:
+        return FINNISH
+    order = list(LOCALES)
+    code = max(votes, key=lambda code: (votes[code], -order.index(code)))
+    return LOCALES[code]
+
+
+__all__ = [
+    "ANY_COUPON_PATTERN",
+    "DETECT_LINES",
+    "FINNISH",
+    "LOCALES",
+    "STATUS_RANKS",
+    "TICKET_TYPES",
+    "UnibetLocale",
+    "detect_locale",
+    "locale_votes",
+]
@@ -2,105 +2,139 @@
 
 This module mirrors the output schema of :mod:`imports.coolbet` so the
 Streamlit dashboard can render graphs from Unibet pastes the same way it does
-for Coolbet Excel uploads.
+for Coolbet Excel uploads. Labels and status words come from the language
+packs in :mod:`imports.unibet_locales`.
+
+Saved ``.txt`` dumps can be much larger than a paste. When the history is a
+file on disk it is memory-mapped, and in-memory uploads are read from their
+existing buffer. The section parser then walks that buffer line by line (see
+:func:`mapped_lines`), so only the current line is ever decoded into a Python
+string.
+
+Sections are split off the line stream one at a time and never collected
+into a list. Sections are independent, so large histories are parsed on a
+process pool: sections are sent in batches of ``PARSE_BATCH_SECTIONS`` to
+amortize the inter-process traffic, at most ``PARSE_BATCHES_IN_FLIGHT``
+batches are outstanding, and the results are collected in their original
+order. Parallel parsing switches on from ``PLAYWISE_PARALLEL_SECTIONS``
+sections when more than one worker is available (``PLAYWISE_PARSE_WORKERS``,
+defaulting to the CPU count capped at ``DEFAULT_MAX_WORKERS``). The pool is
+created by the first history that large, and its ``forkserver`` workers are
+forked from a server that preloads :mod:`imports.parse_worker`, so they never
+import the app.
 """
 
 from __future__ import annotations
 
+import io
+import mmap
+import multiprocessing
+import os
 import re
-from dataclasses import dataclass
-from datetime import datetime
-from typing import List, Tuple
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import chain, islice
+from typing import BinaryIO, Callable, Collection, Deque, Iterable, Iterator, List, Optional, Tuple
 
 import pandas as pd
 
+from imports.money import to_cents
+from imports.parsing import parse_dates, parse_numbers
+from imports.registry import ImportResult
+from imports.unibet_locales import (
+    ANY_COUPON_PATTERN,
+    DETECT_LINES,
+    FINNISH,
+    LOCALES,
+    STATUS_RANKS,
+    TICKET_TYPES,
+    UnibetLocale,
+    detect_locale,
+)
+from imports.unibet_sections import ParsedBet, parse_batch, parse_section
+
 # ---------------------------------------------------------------------------
 # Data helpers
 # ---------------------------------------------------------------------------
 
-DATE_PATTERN = re.compile(r"(\d{2}\.\d{2}\.\d{4})\s*klo\s*[•.]?\s*(\d{2}\.\d{2}\.\d{2})")
-COUPON_PATTERN = re.compile(r"Kuponkitunnus:\s*(\d+)", re.IGNORECASE)
-HEADER_PATTERN = re.compile(r"^(Single|Tupla|Tripla|Parlay|Tuplavoitettu)", re.IGNORECASE)
-STATUS_PATTERN = re.compile(r"(Voitettu|Vireill[aä]|H[aä]vitty|Peruttu)", re.IGNORECASE)
-
-
-@dataclass
-class ParsedBet:
-    bet_id: str | None
-    placed_at: pd.Timestamp | None
-    bet_type: str | None
-    status: str | None
-    stake: float | None
-    odds: float | None
-    payout: float | None
-    legs: List[dict]
-
+DECIMAL_COMMA = re.compile(r"(\d),(?=\d{1,2}\b)")
 
-def _normalize_number(value: str | None) -> float | None:
-    if not value:
-        return None
+# ``progress(stage, done, total)`` hook used by background import jobs.
+ProgressCallback = Callable[[str, int, Optional[int]], None]
 
-    cleaned = value.replace("€", "").replace(" ", "")
-    cleaned = cleaned.replace(",", ".")
-    try:
-        return float(cleaned)
-    except ValueError:
-        return None
+# How many sections to parse between two progress reports.
+PROGRESS_EVERY = 500
 
+# Parsing is a one-off per import; a few workers already hide most of it.
+DEFAULT_MAX_WORKERS = 4
 
-def _parse_datetime(text: str) -> pd.Timestamp | None:
-    match = DATE_PATTERN.search(text)
-    if not match:
-        return None
+PARSE_WORKERS = int(os.environ.get("PLAYWISE_PARSE_WORKERS", "0")) or min(
+    DEFAULT_MAX_WORKERS, os.cpu_count() or 1
+)
+PARALLEL_MIN_SECTIONS = int(os.environ.get("PLAYWISE_PARALLEL_SECTIONS", "20000"))
 
-    date_part, time_part = match.groups()
-    time_part = time_part.replace(".", ":")
-    try:
-        dt = datetime.strptime(f"{date_part} {time_part}", "%d.%m.%Y %H:%M:%S")
-    except ValueError:
-        return None
+# Sections shipped to a worker per task (a multiple of ``PROGRESS_EVERY``).
+PARSE_BATCH_SECTIONS = 2000
 
-    return pd.Timestamp(dt, tz="UTC")
+# Batches submitted ahead of the one being collected, bounding parser memory.
+PARSE_BATCHES_IN_FLIGHT = 2 * PARSE_WORKERS
 
 
-def _split_sections(raw_text: str) -> List[str]:
-    """Split the pasted blob into bet sections.
+def _split_sections(lines: Iterable[str], locale: UnibetLocale = FINNISH) -> Iterator[str]:
+    """Yield the bet sections of the pasted lines, one at a time.
 
     Unibet pastes sometimes start with a ticket summary (e.g. ``TuplaVoitettu``)
     followed by the actual coupon row. We treat both the summary header and the
     ``Kuponkitunnus`` line as boundaries so each section stays intact.
+
+    ``lines`` is consumed once, so it can be a stream (e.g. a decompressing
+    file object or :func:`mapped_lines` over a memory map); only the section
+    being assembled is held. Decimal commas are rewritten line by line.
     """
 
-    sections: List[str] = []
+    coupon_pattern = locale.coupon_pattern
+    header_pattern = locale.header_pattern
+    history_toggle = locale.history_toggle.lower()
+
     current: List[str] = []
     pending_header: List[str] = []
 
-    for raw_line in raw_text.splitlines():
-        line = raw_line.strip()
+    def orphan(header: List[str]) -> bool:
+        # A header block about to be dropped that still holds a coupon id
+        # (written mid-line) is a ticket of its own.
+        return any(coupon_pattern.search(line) for line in header[1:])
+
+    for raw_line in lines:
+        line = DECIMAL_COMMA.sub(r"\1.", raw_line.strip())
         if not line:
             continue
 
         # The Unibet paste occasionally inserts a "show history" toggle between
         # coupons. Treat it as a safe boundary so it never swallows the next
         # ticket.
-        if line.lower().startswith("näytä tapahtumahistoria"):
+        if line.lower().startswith(history_toggle):
             if current:
-                sections.append("\n".join(current).strip())
+                yield "\n".join(current)
                 current = []
+            elif orphan(pending_header):
+                yield "\n".join(pending_header)
             pending_header = []
             continue
 
-        if COUPON_PATTERN.match(line):
+        if coupon_pattern.match(line):
             if current:
-                sections.append("\n".join(current).strip())
+                yield "\n".join(current)
             current = pending_header + [line]
             pending_header = []
             continue
 
-        if HEADER_PATTERN.match(line):
+        if header_pattern.match(line):
             if current:
-                sections.append("\n".join(current).strip())
+                yield "\n".join(current)
                 current = []
+            elif orphan(pending_header):
+                yield "\n".join(pending_header)
             pending_header = [line]
             continue
 
@@ -110,124 +144,9 @@ def _split_sections(raw_text: str) -> List[str]:
             current.append(line)
 
     if current:
-        sections.append("\n".join(current).strip())
+        yield "\n".join(current)
     elif pending_header:
-        sections.append("\n".join(pending_header).strip())
-
-    cleaned_sections = [s for s in sections if s]
-
-    # Fallback: if we unexpectedly produced fewer sections than coupon ids,
-    # regroup strictly by coupon boundaries so every ticket is surfaced.
-    coupon_count = len(COUPON_PATTERN.findall(raw_text))
-    if coupon_count and len(cleaned_sections) < coupon_count:
-        rebuilt: List[str] = []
-        buffer: List[str] = []
-        for raw_line in raw_text.splitlines():
-            line = raw_line.strip()
-            if not line:
-                continue
-            if COUPON_PATTERN.match(line):
-                if buffer:
-                    rebuilt.append("\n".join(buffer).strip())
-                buffer = [line]
-            else:
-                buffer.append(line)
-        if buffer:
-            rebuilt.append("\n".join(buffer).strip())
-
-        cleaned_sections = [s for s in rebuilt if s]
-
-    return cleaned_sections
-
-
-def _parse_legs(lines: List[str], bet_id: str | None, overall_odds: float | None) -> List[dict]:
-    legs: List[dict] = []
-
-    leg_pattern = re.compile(r"(.+?)@\s*([0-9.,]+)")
-    for idx, line in enumerate(lines):
-        match = leg_pattern.search(line)
-        if not match:
-            continue
-
-        left, odds_text = match.groups()
-        odds = _normalize_number(odds_text)
-
-        if ":" in left:
-            market, selection = [part.strip() for part in left.split(":", 1)]
-        else:
-            market, selection = None, left.strip()
-
-        event = None
-        for follow in lines[idx + 1 : idx + 3]:
-            if " - " in follow:
-                event = follow.strip()
-                break
-
-        legs.append(
-            {
-                "bet_id": bet_id,
-                "event": event,
-                "market": market or None,
-                "selection": selection or None,
-                "odds": odds,
-            }
-        )
-
-    if not legs:
-        # Fallback to a single leg using the overall odds
-        legs.append(
-            {
-                "bet_id": bet_id,
-                "event": next((ln for ln in lines if " - " in ln), None),
-                "market": None,
-                "selection": None,
-                "odds": overall_odds,
-            }
-        )
-
-    return legs
-
-
-def _parse_section(section: str) -> ParsedBet:
-    lines = [ln.strip() for ln in section.splitlines() if ln.strip()]
-    text_blob = "\n".join(lines)
-
-    bet_id_match = COUPON_PATTERN.search(text_blob)
-    bet_id = bet_id_match.group(1) if bet_id_match else None
-
-    placed_at = _parse_datetime(text_blob)
-
-    bet_type_match = HEADER_PATTERN.search(lines[0]) if lines else None
-    bet_type = bet_type_match.group(1).capitalize() if bet_type_match else None
-    if bet_type and bet_type.lower().startswith("tupla"):
-        bet_type = "Tupla"
-
-    status_match = STATUS_PATTERN.search(text_blob)
-    status = status_match.group(1).capitalize() if status_match else None
-
-    stake_match = re.search(r"Panos:\s*€?([0-9.,]+)", text_blob)
-    stake = _normalize_number(stake_match.group(1)) if stake_match else None
-
-    payout_match = re.search(r"Voitto:\s*€?([0-9.,]+)", text_blob)
-    payout = _normalize_number(payout_match.group(1)) if payout_match else None
-
-    odds_match = re.search(r"Kertoimet:\s*([0-9.,]+)", text_blob)
-    if not odds_match:
-        odds_match = re.search(r"@\s*([0-9.,]+)", text_blob)
-    odds = _normalize_number(odds_match.group(1)) if odds_match else None
-
-    legs = _parse_legs(lines, bet_id, odds)
-
-    return ParsedBet(
-        bet_id=bet_id,
-        placed_at=placed_at,
-        bet_type=bet_type,
-        status=status,
-        stake=stake,
-        odds=odds,
-        payout=payout,
-        legs=legs,
-    )
+        yield "\n".join(pending_header)
 
 
 # ---------------------------------------------------------------------------
@@ -235,25 +154,125 @@ def _parse_section(section: str) -> ParsedBet:
 # ---------------------------------------------------------------------------
 
 
-def parse_unibet_paste(raw_text: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+_POOL: ProcessPoolExecutor | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def _process_pool() -> ProcessPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            # Never ``fork``: the Streamlit server is multi-threaded.
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context("forkserver")
+                context.set_forkserver_preload(["imports.parse_worker"])
+            else:  # pragma: no cover - Windows
+                context = multiprocessing.get_context("spawn")
+            _POOL = ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=context)
+        return _POOL
+
+
+def _pool_batches(sections: Iterator[str], locale: UnibetLocale) -> Iterator[List[ParsedBet]]:
+    """Parse ``sections`` on the process pool with a bounded number of batches in flight."""
+
+    pool = _process_pool()
+    batches = iter(lambda: list(islice(sections, PARSE_BATCH_SECTIONS)), [])
+    pending: Deque[Future] = deque()
+    for batch in batches:
+        # Workers get the locale code; the packs are rebuilt on import there.
+        pending.append(pool.submit(parse_batch, batch, locale.code))
+        if len(pending) >= PARSE_BATCHES_IN_FLIGHT:
+            yield pending.popleft().result()
+    # Collected in submission order, so bets keep their paste order.
+    while pending:
+        yield pending.popleft().result()
+
+
+def _parse_sections(
+    sections: Iterable[str],
+    locale: UnibetLocale = FINNISH,
+    progress: ProgressCallback | None = None,
+    parallel: bool | None = None,
+) -> List[ParsedBet]:
+    """Parse streamed sections; progress totals stay unknown until the stream ends."""
+
+    sections = iter(sections)
+    if parallel is None:
+        parallel = False
+        if PARSE_WORKERS > 1:
+            head = list(islice(sections, PARALLEL_MIN_SECTIONS))
+            parallel = len(head) >= PARALLEL_MIN_SECTIONS
+            sections = chain(head, sections)
+    if parallel:
+        results = _pool_batches(sections, locale)
+    else:
+        results = ([parse_section(section, locale)] for section in sections)
+
+    parsed_bets: List[ParsedBet] = []
+    reported = 0
+    for batch in results:
+        parsed_bets.extend(batch)
+        done = len(parsed_bets)
+        if progress is not None and done - reported >= PROGRESS_EVERY:
+            progress("sections parsed", done, None)
+            reported = done
+    if progress is not None:
+        progress("sections parsed", len(parsed_bets), len(parsed_bets))
+    return parsed_bets
+
+
+def coupon_id(section: str) -> str | None:
+    """Coupon id (``Kuponkitunnus`` or its translation) of a section, without parsing the rest."""
+
+    match = ANY_COUPON_PATTERN.search(section)
+    return match.group(1) if match else None
+
+
+def parse_unibet_paste(
+    raw_text: str | Iterable[str],
+    progress: ProgressCallback | None = None,
+    known_ids: Collection[str] | None = None,
+    parallel: bool | None = None,
+    locale: str | None = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """Parse Unibet bet history pasted as raw text.
 
     Returns two dataframes: ``bets`` (one per coupon) and ``legs`` (one per
     selection). These frames are intentionally minimal so they can be converted
     to the canonical Coolbet-like schema with :func:`normalize_unibet_paste`.
-    """
 
-    cleaned = raw_text.replace("\r\n", "\n")
-    cleaned = re.sub(r"(\d),(?=\d{1,2}\b)", r"\1.", cleaned)
+    ``progress`` is called with ``("sections parsed", done, None)`` while the
+    sections stream in and with ``(count, count)`` once they are all parsed.
+
+    Sections whose coupon id is in ``known_ids`` are skipped before they are
+    parsed. Appending a weekly paste to an existing history therefore only
+    pays for the new coupons.
+
+    ``raw_text`` can also be an iterable of lines, such as a text stream over
+    a decompressed upload.
 
-    sections = _split_sections(cleaned)
-    parsed_bets = [_parse_section(section) for section in sections]
+    ``parallel`` forces the process pool on or off; by default it is used
+    for histories of at least ``PARALLEL_MIN_SECTIONS`` sections.
+
+    The site language is detected from the first ``DETECT_LINES`` lines
+    unless ``locale`` names a pack (``"fi"``, ``"sv"``, ...).
+    """
+
+    lines = iter(raw_text.splitlines() if isinstance(raw_text, str) else raw_text)
+    head = list(islice(lines, DETECT_LINES))
+    pack = LOCALES[locale] if locale else detect_locale(head)
+    sections = _split_sections(chain(head, lines), pack)
+    if known_ids:
+        sections = (section for section in sections if coupon_id(section) not in known_ids)
+    parsed_bets = _parse_sections(sections, pack, progress=progress, parallel=parallel)
 
     bets_df = pd.DataFrame(
         [
             {
                 "bet_id": bet.bet_id,
                 "bookmaker": "Unibet",
+                "locale": pack.code,
+                "experimental": pack.experimental,
                 "placed_at": bet.placed_at,
                 "bet_type": bet.bet_type,
                 "stake": bet.stake,
@@ -269,72 +288,94 @@ def parse_unibet_paste(raw_text: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
     all_legs = [leg for bet in parsed_bets for leg in bet.legs]
     legs_df = pd.DataFrame(all_legs, columns=["bet_id", "event", "market", "selection", "odds"])
 
+    # Whole-column conversions of the raw strings (see ``imports.parsing``).
+    legs_df["odds"] = parse_numbers(legs_df["odds"])
     if not bets_df.empty:
-        bets_df["placed_at"] = pd.to_datetime(bets_df["placed_at"], utc=True, errors="coerce")
+        placed_at = parse_dates(bets_df["placed_at"], errors="coerce", time_words=[pack.time_word])
+        bets_df["placed_at"] = pd.to_datetime(placed_at, errors="coerce").dt.tz_localize("UTC")
+        for col in ("stake", "odds", "payout"):
+            bets_df[col] = parse_numbers(bets_df[col])
 
     return bets_df, legs_df
 
 
 def normalize_unibet_paste(raw_text: str) -> pd.DataFrame:
-    """Normalize a pasted Unibet history block to the Coolbet schema."""
+    """Normalize a pasted Unibet history block to the Coolbet schema.
+
+    Stakes and payouts are returned as int64 cents like the Coolbet backend.
+    Each row keeps its coupon id in ``bet_id`` so parsed legs can be joined
+    back to their ticket.
+    """
 
     bets_df, legs_df = parse_unibet_paste(raw_text)
+    return normalize_unibet_frames(bets_df, legs_df)
 
-    status_map = {
-        "voitettu": "won",
-        "vireillä": "pending",
-        "hävitty": "lost",
-        "peruttu": "void",
-    }
-
-    type_map = {
-        "single": "single",
-        "tupla": "double",
-        "tripla": "triple",
-        "parlay": "parlay",
-    }
-
-    market_lookup = {}
-    if not legs_df.empty:
-        legs_df = legs_df.copy()
-        legs_df["market"] = legs_df["market"].fillna(legs_df["selection"])
-        for _, row in legs_df.iterrows():
-            if row["bet_id"] not in market_lookup and pd.notna(row["market"]):
-                market_lookup[row["bet_id"]] = row["market"]
 
-    normalized_rows = []
-    for _, bet in bets_df.iterrows():
-        ticket_type = str(bet.get("bet_type", "")).strip().lower()
-        ticket_type = type_map.get(ticket_type, ticket_type or "single")
+def _words(values: pd.Series | None, index: pd.Index) -> pd.Series:
+    # Lower-cased status or bet-type words; missing ones become "".
+    if values is None:
+        return pd.Series("", index=index, dtype=object)
+    return values.fillna("").astype(str).str.strip().str.lower()
 
-        status_value = str(bet.get("status", "")).strip().lower()
-        rank = status_map.get(status_value, status_value or "unknown")
 
-        normalized_rows.append(
-            {
-                "date": pd.to_datetime(bet.get("placed_at"), utc=True, errors="coerce"),
-                "rank": rank,
-                "ticket type": ticket_type,
-                "product": "unibet",
-                "bets": pd.to_numeric(bet.get("stake"), errors="coerce"),
-                "wins": pd.to_numeric(bet.get("payout"), errors="coerce"),
-                "odds": pd.to_numeric(bet.get("odds"), errors="coerce"),
-                "market name": market_lookup.get(bet.get("bet_id"), None),
-                "legs": pd.to_numeric(bet.get("leg_count"), errors="coerce"),
-            }
-        )
+def normalize_unibet_frames(
+    bets_df: pd.DataFrame, legs_df: pd.DataFrame, progress: ProgressCallback | None = None
+) -> pd.DataFrame:
+    """Normalize already parsed ``bets``/``legs`` frames to the Coolbet schema.
+
+    Status and bet-type words are mapped with the language pack named in the
+    ``locale`` column (Finnish when it is missing). ``progress`` is called with
+    ``("rows normalized", done, total)``.
+    """
 
-    normalized = pd.DataFrame(normalized_rows)
+    if bets_df.empty:
+        return pd.DataFrame()
+    bets_df = bets_df.reset_index(drop=True)
 
-    if normalized.empty:
-        return normalized
+    market_lookup = pd.Series(dtype=object)
+    if not legs_df.empty:
+        markets = legs_df.assign(market=legs_df["market"].fillna(legs_df["selection"]))
+        market_lookup = markets.dropna(subset=["market"]).drop_duplicates("bet_id").set_index("bet_id")["market"]
+
+    # One ``map`` per language pack present; a paste normally has just one.
+    locale = bets_df.get("locale", pd.Series(FINNISH.code, index=bets_df.index))
+    locale = locale.where(locale.isin(list(LOCALES)), FINNISH.code)
+    bet_types = _words(bets_df.get("bet_type"), bets_df.index)
+    statuses = _words(bets_df.get("status"), bets_df.index)
+    ticket_type = bet_types.mask(bet_types == "", "single")
+    rank = statuses.mask(statuses == "", "unknown")
+    for code in locale.unique():
+        in_locale = locale == code
+        ticket_type[in_locale] = bet_types[in_locale].map(TICKET_TYPES[code]).fillna(ticket_type[in_locale])
+        rank[in_locale] = statuses[in_locale].map(STATUS_RANKS[code]).fillna(rank[in_locale])
+
+    placed_at = parse_dates(bets_df["placed_at"], errors="coerce")
+    normalized = pd.DataFrame(
+        {
+            "bet_id": bets_df["bet_id"],
+            "bookmaker": "Unibet",
+            "date": pd.to_datetime(placed_at, utc=True, errors="coerce"),
+            "rank": rank,
+            "ticket type": ticket_type,
+            "product": "unibet",
+            "bets": parse_numbers(bets_df["stake"]),
+            "wins": parse_numbers(bets_df["payout"]),
+            "odds": parse_numbers(bets_df["odds"]),
+            "market name": bets_df["bet_id"].map(market_lookup),
+            "legs": pd.to_numeric(bets_df["leg_count"], errors="coerce"),
+        }
+    )
+    if progress is not None:
+        progress("rows normalized", len(normalized), len(normalized))
 
     normalized["date"] = pd.to_datetime(normalized["date"], utc=True, errors="coerce").ffill()
     normalized["rank"] = normalized["rank"].fillna("unknown")
     normalized["ticket type"] = normalized["ticket type"].fillna("single")
     normalized["product"] = normalized["product"].fillna("unibet")
 
-    for col, default in [("bets", 0.0), ("wins", 0.0), ("odds", 1.0), ("legs", 1)]:
+    normalized["bets"] = to_cents(normalized["bets"])
+    normalized["wins"] = to_cents(normalized["wins"])
+    for col, default in [("odds", 1.0), ("legs", 1)]:
         normalized[col] = pd.to_numeric(normalized[col], errors="coerce").fillna(default)
 
     if "market name" in normalized.columns:
@@ -343,4 +384,72 @@ def normalize_unibet_paste(raw_text: str) -> pd.DataFrame:
     return normalized
 
 
-__all__ = ["parse_unibet_paste", "normalize_unibet_paste"]
+def mapped_lines(buffer: bytes | mmap.mmap) -> Iterator[str]:
+    """Decoded lines of a UTF-8 buffer (or memory-mapped file), one at a time."""
+
+    start = 0
+    size = len(buffer)
+    while start < size:
+        end = buffer.find(b"\n", start)
+        if end < 0:
+            end = size
+        yield buffer[start:end].decode("utf-8", errors="replace")
+        start = end + 1
+
+
+def _is_disk_file(stream: BinaryIO) -> bool:
+    # Only plain files are mapped; decompressing readers expose the fileno of
+    # the compressed file underneath.
+    return isinstance(getattr(stream, "raw", stream), io.FileIO)
+
+
+def import_unibet_text(
+    stream: BinaryIO,
+    progress: ProgressCallback | None = None,
+    known_ids: Collection[str] | None = None,
+) -> ImportResult:
+    """Registry loader for Unibet histories (pasted text or a saved ``.txt``).
+
+    The stream is decoded and tokenized line by line; files on disk are
+    memory-mapped instead of read. The parsed ``bets``/``legs`` frames are
+    returned as previews and the legs are kept for the leg-level views.
+    """
+
+    if isinstance(stream, io.BytesIO):
+        # ``getvalue`` shares the upload's bytes instead of copying them.
+        bets_df, legs_df = parse_unibet_paste(
+            mapped_lines(stream.getvalue()), progress=progress, known_ids=known_ids
+        )
+    elif _is_disk_file(stream) and os.fstat(stream.fileno()).st_size:
+        with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            bets_df, legs_df = parse_unibet_paste(mapped_lines(buffer), progress=progress, known_ids=known_ids)
+    else:
+        lines = io.TextIOWrapper(stream, encoding="utf-8", errors="replace")
+        bets_df, legs_df = parse_unibet_paste(lines, progress=progress, known_ids=known_ids)
+    return ImportResult(
+        rows=normalize_unibet_frames(bets_df, legs_df, progress=progress),
+        legs=legs_df,
+        previews={"bets": bets_df, "legs": legs_df},
+    )
+
+
+def import_unibet_file(
+    path: str | os.PathLike,
+    progress: ProgressCallback | None = None,
+    known_ids: Collection[str] | None = None,
+) -> ImportResult:
+    """Import a Unibet history saved to disk, memory-mapping it for parsing."""
+
+    with open(path, "rb") as stream:
+        return import_unibet_text(stream, progress=progress, known_ids=known_ids)
+
+
+__all__ = [
+    "coupon_id",
+    "import_unibet_file",
+    "import_unibet_text",
+    "mapped_lines",
+    "normalize_unibet_frames",
+    "normalize_unibet_paste",
+    "parse_unibet_paste",
+]
@@ -0,0 +1,135 @@
+"""Section parser for Unibet histories, the entry point of the parse workers.
+
+:mod:`imports.unibet_paste` splits a history into one text section per coupon
+and hands them here, in-process or in batches on its process pool. The worker
+processes import only this module and the language packs, not pandas or the
+app, so they start quickly and hold little memory.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import List
+
+from imports.unibet_locales import FINNISH, LOCALES, UnibetLocale
+
+LEG_PATTERN = re.compile(r"(.+?)@\s*([0-9.,]+)")
+ANY_ODDS_PATTERN = re.compile(r"@\s*([0-9.,]+)")
+
+
+@dataclass
+class ParsedBet:
+    """One coupon as found in the text.
+
+    Dates, amounts and odds stay raw strings here;
+    :func:`imports.unibet_paste.parse_unibet_paste` converts them column-wise
+    with :mod:`imports.parsing`.
+    """
+
+    bet_id: str | None
+    placed_at: str | None
+    bet_type: str | None
+    status: str | None
+    stake: str | None
+    odds: str | None
+    payout: str | None
+    legs: List[dict]
+
+
+def _parse_legs(lines: List[str], bet_id: str | None, overall_odds: str | None) -> List[dict]:
+    legs: List[dict] = []
+
+    for idx, line in enumerate(lines):
+        match = LEG_PATTERN.search(line)
+        if not match:
+            continue
+
+        left, odds = match.groups()
+
+        if ":" in left:
+            market, selection = [part.strip() for part in left.split(":", 1)]
+        else:
+            market, selection = None, left.strip()
+
+        event = None
+        for follow in lines[idx + 1 : idx + 3]:
+            if " - " in follow:
+                event = follow.strip()
+                break
+
+        legs.append(
+            {
+                "bet_id": bet_id,
+                "event": event,
+                "market": market or None,
+                "selection": selection or None,
+                "odds": odds,
+            }
+        )
+
+    if not legs:
+        # Fallback to a single leg using the overall odds
+        legs.append(
+            {
+                "bet_id": bet_id,
+                "event": next((ln for ln in lines if " - " in ln), None),
+                "market": None,
+                "selection": None,
+                "odds": overall_odds,
+            }
+        )
+
+    return legs
+
+
+def parse_section(section: str, locale: UnibetLocale = FINNISH) -> ParsedBet:
+    """Fields of one bet section, as raw strings."""
+
+    lines = [ln.strip() for ln in section.splitlines() if ln.strip()]
+    text_blob = "\n".join(lines)
+
+    # One pass of the locale's scanner finds every labelled field.
+    found = locale.scan(text_blob)
+
+    bet_id = found["coupon"].group("coupon_value") if "coupon" in found else None
+
+    placed_at = found["date"].group("date") if "date" in found else None
+
+    bet_type_match = locale.header_pattern.search(lines[0]) if lines else None
+    bet_type = bet_type_match.group(1).capitalize() if bet_type_match else None
+
+    status = found["status"].group("status").capitalize() if "status" in found else None
+
+    stake = found["stake"].group("stake_value") if "stake" in found else None
+
+    payout = found["payout"].group("payout_value") if "payout" in found else None
+
+    if "odds" in found:
+        odds = found["odds"].group("odds_value")
+    else:
+        odds_match = ANY_ODDS_PATTERN.search(text_blob)
+        odds = odds_match.group(1) if odds_match else None
+
+    legs = _parse_legs(lines, bet_id, odds)
+
+    return ParsedBet(
+        bet_id=bet_id,
+        placed_at=placed_at,
+        bet_type=bet_type,
+        status=status,
+        stake=stake,
+        odds=odds,
+        payout=payout,
+        legs=legs,
+    )
+
+
+def parse_batch(sections: List[str], locale_code: str = FINNISH.code) -> List[ParsedBet]:
+    """Parse a batch of sections; workers get the locale code and look the pack up."""
+
+    locale = LOCALES[locale_code]
+    return [parse_section(section, locale) for section in sections]
+
+
+__all__ = ["ParsedBet", "parse_batch", "parse_section"]
@@ -0,0 +1,48 @@
+"""Shared fixtures: a small canonical history with known totals.
+
+Four tickets over three months and two bookmakers. The combo has one leg in
+each of two market groups, so leg-level and ticket-level counts differ.
+"""
+
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from analytics.tickets import group_tickets
+
+
+@pytest.fixture
+def rows() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "date": pd.to_datetime(
+                [
+                    "2024-01-01 10:00",
+                    "2024-01-15 12:00",
+                    "2024-01-15 12:00",
+                    "2024-02-03 18:00",
+                    "2024-03-10 09:00",
+                ]
+            ),
+            "rank": ["won", "lost", "lost", "won", "lost"],
+            "ticket type": ["single", "combo", "combo", "single", "single"],
+            "product": "sport",
+            "bets": [1000, 250, 250, 500, 200],
+            "wins": [2000, 0, 0, 900, 0],
+            "odds": [2.0, 1.5, 2.0, 1.8, 6.0],
+            "market_group": [
+                "Match Results",
+                "Match Results",
+                "Over/Under Goals",
+                "Over/Under Goals",
+                "Player Points",
+            ],
+            "bookmaker": ["coolbet", "coolbet", "coolbet", "unibet", "unibet"],
+        }
+    )
+
+
+@pytest.fixture
+def tickets(rows) -> pd.DataFrame:
+    return group_tickets(rows)
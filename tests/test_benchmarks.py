@@ -0,0 +1,143 @@
+"""Benchmark sketches, the Bloom filter of folded histories and the journal."""
+
+from __future__ import annotations
+
+import json
+
+import pandas as pd
+import pytest
+
+from analytics import benchmarks
+from analytics.benchmarks import (
+    BenchmarkStore,
+    MetricSketch,
+    history_identity,
+    load_benchmarks,
+    record_import,
+)
+
+STATS = {"ROI": 5.0, "Win Rate": 40.0}
+
+
+def win_rate_sketch(values) -> MetricSketch:
+    sketch = MetricSketch.for_metric("Win Rate")
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+def test_sketch_summaries():
+    sketch = win_rate_sketch(range(1, 101))
+
+    assert sketch.count == 100
+    assert sketch.mean == pytest.approx(50.5)
+    assert (sketch.minimum, sketch.maximum) == (1, 100)
+    assert sketch.quantile(0.5) == pytest.approx(50, abs=1)
+    assert sketch.percentile_rank(25) == pytest.approx(25, abs=1)
+
+
+def test_sketch_ignores_missing_values():
+    sketch = win_rate_sketch([None, float("nan"), float("inf"), 10.0])
+    assert sketch.count == 1
+
+
+def test_merged_sketches_equal_one_sketch_of_everything():
+    merged = win_rate_sketch(range(0, 50))
+    merged.merge(win_rate_sketch(range(50, 100)))
+    assert merged.to_dict() == win_rate_sketch(range(100)).to_dict()
+
+
+def test_sketches_with_other_bins_do_not_merge():
+    with pytest.raises(ValueError):
+        MetricSketch.for_metric("ROI").merge(MetricSketch.for_metric("Win Rate"))
+
+
+def test_folding_a_history_twice_counts_once():
+    store = BenchmarkStore()
+
+    assert store.fold(["coolbet|a"], STATS)
+    assert not store.fold(["coolbet|a"], STATS)
+    # A merged history that contains a folded one is not counted again.
+    assert not store.fold(["unibet|b", "coolbet|a"], STATS)
+    assert store.imports == 1
+    assert store.sketches["ROI"].count == 1
+    assert not store.has_seen(["unibet|b"])
+
+
+def test_store_round_trip_keeps_the_filter():
+    store = BenchmarkStore()
+    store.fold(["coolbet|a"], STATS)
+
+    restored = BenchmarkStore.from_dict(json.loads(json.dumps(store.to_dict())))
+
+    assert restored.imports == 1
+    assert restored.has_seen(["coolbet|a"])
+    assert restored.sketches["Win Rate"].to_dict() == store.sketches["Win Rate"].to_dict()
+
+
+def test_merged_stores_share_seen_histories():
+    first, second = BenchmarkStore(), BenchmarkStore()
+    first.fold(["coolbet|a"], STATS)
+    second.fold(["unibet|b"], STATS)
+
+    first.merge(second)
+
+    assert first.imports == 2
+    assert first.has_seen(["coolbet|a"]) and first.has_seen(["unibet|b"])
+
+
+def test_history_identity_survives_appends_and_merges(tickets):
+    identity = history_identity(tickets.iloc[:2])
+
+    assert history_identity(tickets.iloc[:2]) == identity
+    later = tickets.iloc[:2].assign(date=pd.Timestamp("2025-01-01"))
+    appended = pd.concat([tickets.iloc[:2], later], ignore_index=True)
+    assert history_identity(appended) == identity
+    # Adding another bookmaker's tickets only adds that bookmaker's identity.
+    assert set(identity) < set(history_identity(tickets))
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return tmp_path / "benchmarks.json"
+
+
+def test_record_import_appends_to_the_journal(store_path):
+    record_import(["coolbet|a"], STATS, path=store_path)
+    record_import(["coolbet|a"], STATS, path=store_path)
+
+    journal = store_path.with_suffix(".json.log")
+    assert len(journal.read_text().splitlines()) == 1
+    assert not store_path.exists()
+    assert load_benchmarks(store_path).imports == 1
+
+
+def test_journal_is_replayed_by_a_fresh_reader(store_path, monkeypatch):
+    record_import(["coolbet|a"], STATS, path=store_path)
+    record_import(["unibet|b"], STATS, path=store_path)
+    monkeypatch.setattr(benchmarks, "_LOADED", {})
+
+    store = load_benchmarks(store_path)
+
+    assert store.imports == 2
+    assert store.has_seen(["unibet|b"])
+
+
+def test_partial_journal_line_waits_for_the_writer(store_path):
+    record_import(["coolbet|a"], STATS, path=store_path)
+    with open(store_path.with_suffix(".json.log"), "a", encoding="utf-8") as handle:
+        handle.write('{"ids": ["unibet|b"], "st')
+
+    assert load_benchmarks(store_path).imports == 1
+
+
+def test_journal_is_compacted_into_the_snapshot(store_path, monkeypatch):
+    monkeypatch.setattr(benchmarks, "JOURNAL_LIMIT", 3)
+    for name in ("a", "b", "c"):
+        record_import([f"coolbet|{name}"], STATS, path=store_path)
+
+    assert not store_path.with_suffix(".json.log").exists()
+    monkeypatch.setattr(benchmarks, "_LOADED", {})
+    store = load_benchmarks(store_path)
+    assert store.imports == 3
+    assert store.has_seen(["coolbet|c"])
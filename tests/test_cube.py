@@ -0,0 +1,51 @@
+"""Slice cube rollups against totals computed from the tickets."""
+
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from analytics.cube import build_cube, rollup_cube
+
+
+@pytest.fixture
+def cube(tickets, rows):
+    return build_cube(tickets, rows)
+
+
+def test_rollup_by_bookmaker(cube):
+    table = rollup_cube(cube, ["bookmaker"])
+
+    assert table.loc["coolbet", ["stake", "ret", "tickets", "profit"]].tolist() == [1500, 2000, 2, 500]
+    assert table.loc["unibet", ["stake", "ret", "tickets", "profit"]].tolist() == [700, 900, 2, 200]
+    assert table.loc["unibet", "roi"] == pytest.approx(200 / 700 * 100)
+
+
+def test_market_groups_split_stake_and_count_ticket_group_pairs(cube, tickets):
+    table = rollup_cube(cube, ["market_group"])
+
+    assert table["stake"].to_dict() == {
+        "Match Results": 1250,
+        "Over/Under Goals": 750,
+        "Player Points": 200,
+    }
+    assert table["stake"].sum() == tickets["bets"].sum()
+    # The combo counts once in each of its two groups.
+    assert table["tickets"].sum() == len(tickets) + 1
+
+
+def test_other_pivots_count_each_ticket_once(cube, tickets):
+    table = rollup_cube(cube, ["month", "ticket type"])
+
+    assert table["tickets"].sum() == len(tickets)
+    assert table.loc[(pd.Timestamp("2024-01-01"), "combo"), "stake"] == 500
+
+
+def test_cube_without_market_groups(tickets, rows):
+    cube = build_cube(tickets, rows.drop(columns="market_group"))
+    assert rollup_cube(cube, ["market_group"])["tickets"].to_dict() == {"All markets": 4}
+
+
+def test_rollup_needs_a_dimension(cube):
+    with pytest.raises(ValueError):
+        rollup_cube(cube, ["not a dimension"])
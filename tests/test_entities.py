@@ -0,0 +1,48 @@
+"""Fuzzy entity matching: spelling variants fold, different teams do not."""
+
+from __future__ import annotations
+
+import pytest
+
+from analytics.entities import EntityResolver, normalize_name, split_participants
+
+
+@pytest.fixture
+def resolver() -> EntityResolver:
+    known = EntityResolver()
+    for name in ["Liverpool", "Inter", "Paris", "Arsenal", "BK Häcken", "Manchester United"]:
+        known.resolve(name)
+    return known
+
+
+def test_misspelled_single_token_name_matches(resolver):
+    assert resolver.resolve("Liverpol") == "Liverpool"
+
+
+def test_misspelled_word_in_longer_name_matches(resolver):
+    assert resolver.resolve("Manchester Unted") == "Manchester United"
+
+
+def test_prefix_and_accents_are_ignored(resolver):
+    assert resolver.resolve("FC Inter") == "Inter"
+    assert resolver.resolve("Hacken") == "BK Häcken"
+
+
+@pytest.mark.parametrize("name", ["Inter Miami", "Paris FC", "Arsenal W", "Liverpool Reserves"])
+def test_extra_words_stay_separate(resolver, name):
+    assert resolver.resolve(name) == name
+
+
+def test_unrelated_names_stay_separate(resolver):
+    assert resolver.resolve("Lille") == "Lille"
+
+
+def test_normalize_name_keeps_trailing_prefix():
+    assert normalize_name("FC Köln") == "koln"
+    assert normalize_name("Paris FC") == "paris fc"
+
+
+def test_split_participants():
+    assert split_participants("HJK - FC Inter") == ["HJK", "FC Inter"]
+    assert split_participants("Celtics vs. Lakers") == ["Celtics", "Lakers"]
+    assert split_participants(None) == []
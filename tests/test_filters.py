@@ -0,0 +1,58 @@
+"""Filter bitmaps: OR within a dimension, AND across dimensions."""
+
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from analytics.filters import FilterSpec, build_filter_index
+
+
+@pytest.fixture
+def index(tickets, rows):
+    return build_filter_index(tickets, rows)
+
+
+def selected(mask) -> list:
+    return [position for position, hit in enumerate(mask) if hit]
+
+
+def test_no_filter_selects_everything(index):
+    assert not FilterSpec().active
+    assert selected(index.ticket_mask(FilterSpec())) == [0, 1, 2, 3]
+
+
+def test_values_of_one_dimension_are_ored(index):
+    spec = FilterSpec(odds_bands=("3.00 – 5.00", "5.00+"))
+    assert selected(index.ticket_mask(spec)) == [1, 3]
+
+
+def test_dimensions_are_anded(index):
+    spec = FilterSpec(bookmakers=("coolbet",), market_groups=("Over/Under Goals",))
+    assert selected(index.ticket_mask(spec)) == [1]
+
+
+def test_date_range_is_start_inclusive_end_exclusive(index):
+    spec = FilterSpec(start=pd.Timestamp("2024-01-15 12:00"), end=pd.Timestamp("2024-03-10 09:00"))
+    assert selected(index.ticket_mask(spec)) == [1, 2]
+
+
+def test_leg_buckets(index):
+    assert index.options("legs") == ["1", "2"]
+    assert selected(index.ticket_mask(FilterSpec(legs=("2",)))) == [1]
+
+
+def test_unknown_values_match_nothing(index):
+    assert not index.ticket_mask(FilterSpec(bookmakers=("bet365",))).any()
+
+
+def test_market_group_rows_keep_only_matching_legs(index):
+    spec = FilterSpec(market_groups=("Over/Under Goals",))
+    assert selected(index.ticket_mask(spec)) == [1, 2]
+    # The combo's Match Results leg is dropped from the leg-level rows.
+    assert selected(index.row_mask(spec)) == [2, 3]
+
+
+def test_row_mask_follows_the_ticket_mask(index):
+    spec = FilterSpec(bookmakers=("coolbet",))
+    assert selected(index.row_mask(spec)) == [0, 1, 2]
@@ -0,0 +1,85 @@
+"""Peak memory of the per-rerun dashboard pipeline.
+
+The app runs under copy-on-write and shares cached frames between sessions,
+so grouping, rolling up and summarizing a history must not copy the canonical
+frame over and over. tracemalloc sees numpy buffers, so its peak is a fair
+measure of how much the pipeline allocates on top of the input frame.
+"""
+
+from __future__ import annotations
+
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.kpis import compute_kpis
+from analytics.rollups import build_rollups, pick_granularity, slice_rollup
+from analytics.tickets import group_tickets, prepare_canonical
+
+ROWS = 200_000
+
+# Allowed tracemalloc peak as a multiple of the canonical frame's size; the
+# pipeline currently stays near a third of it.
+PEAK_FACTOR = 1
+
+
+@pytest.fixture(autouse=True)
+def copy_on_write():
+    with pd.option_context("mode.copy_on_write", True):
+        yield
+
+
+def synthetic_rows(rows: int = ROWS, seed: int = 7) -> pd.DataFrame:
+    """A canonical frame with two-leg tickets spread over two years."""
+
+    rng = np.random.default_rng(seed)
+    tickets = rows // 2
+    placed = pd.Timestamp("2023-01-01") + pd.to_timedelta(
+        np.sort(rng.integers(0, 730 * 86_400, tickets)), unit="s"
+    )
+    won = rng.random(tickets) < 0.45
+    stake = rng.choice([500, 1000, 2000], tickets)
+    odds = rng.uniform(1.2, 3.5, rows).round(2)
+    leg_bets = np.zeros(rows, dtype="int64")
+    leg_bets[::2] = stake
+    leg_wins = np.zeros(rows, dtype="int64")
+    leg_wins[::2] = np.where(won, (stake * odds[::2] * odds[1::2]).astype("int64"), 0)
+    frame = pd.DataFrame(
+        {
+            "date": np.repeat(placed, 2),
+            "rank": np.repeat(np.where(won, "won", "lost"), 2),
+            "ticket type": "double",
+            "product": np.repeat(rng.choice(["Live", "Prematch"], tickets), 2),
+            "bets": leg_bets,
+            "wins": leg_wins,
+            "odds": odds,
+            "legs": 2,
+            "market name": rng.choice(["Match result", "Total goals over/under"], rows),
+        }
+    )
+    return prepare_canonical(frame)
+
+
+def test_dashboard_pipeline_peak_is_bounded():
+    df = synthetic_rows()
+    frame_bytes = int(df.memory_usage(deep=True).sum())
+
+    tracemalloc.start()
+    try:
+        tickets = group_tickets(df)
+        rollups = build_rollups(tickets)
+        for days in (30, 180, None):
+            end = tickets["date"].max()
+            start = tickets["date"].min() if days is None else (end - pd.Timedelta(days=days)).normalize()
+            view = tickets[tickets["date"] >= start]
+            slice_rollup(rollups, pick_granularity(start, end), start)
+            compute_kpis(view).headline()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert peak < PEAK_FACTOR * frame_bytes, (
+        f"pipeline peaked at {peak / 1e6:.1f} MB for a {frame_bytes / 1e6:.1f} MB frame"
+    )
@@ -0,0 +1,84 @@
+"""Merging overlapping histories: tickets and parsed legs are counted once."""
+
+from __future__ import annotations
+
+import io
+
+import pandas as pd
+
+from analytics.legs import build_leg_store, unibet_legs
+from analytics.merge import merge_histories, merge_legs
+from analytics.tickets import group_tickets, prepare_canonical
+from imports.unibet_paste import import_unibet_text
+
+PASTE = """Single
+Kuponkitunnus: 100
+01.01.2023 klo 16.00.00
+Yli/Alle 2.5 maalia: VPS @ 1,86
+VPS - Haka
+Panos: €10,00
+Kertoimet: 1,86
+Voitto: €18,60
+Voitettu
+
+Tripla
+Kuponkitunnus: 101
+04.01.2023 klo 13.00.00
+Pelaaja tekee maalin: Haka @ 2,37
+Haka - Ilves
+Yli/Alle 2.5 maalia: HJK @ 2,98
+HJK - FC Lahti
+Ottelun voittaja: Ilves @ 1,89
+Ilves - SJK
+Panos: €10,00
+Kertoimet: 13,35
+Voitto: €133,48
+Voitettu
+"""
+
+
+def _source():
+    result = import_unibet_text(io.BytesIO(PASTE.encode("utf-8")))
+    rows = prepare_canonical(result.rows)
+    return rows, group_tickets(rows), result.legs
+
+
+def test_same_paste_twice_counts_tickets_and_legs_once():
+    first_rows, first_tickets, first_legs = _source()
+    second_rows, second_tickets, second_legs = _source()
+
+    merged = merge_histories([(first_rows, first_tickets), (second_rows, second_tickets)])
+    legs = merge_legs([first_legs, second_legs], merged)
+
+    assert len(merged) == len(first_rows)
+    assert len(group_tickets(merged)) == 2
+    assert len(legs) == len(first_legs) == 4
+    store = build_leg_store(unibet_legs(legs, merged), group_tickets(merged))
+    assert len(store.legs) == 4
+
+
+def test_merge_legs_drops_coupons_merged_away():
+    rows, _, legs = _source()
+    kept = rows[rows["bet_id"].astype(str) == "100"]
+    assert merge_legs([legs], kept)["bet_id"].astype(str).tolist() == ["100"]
+
+
+def test_overlap_between_sources_keeps_earlier_source():
+    rows = pd.DataFrame(
+        {
+            "date": pd.to_datetime(["2024-01-01 10:00", "2024-01-02 10:00"]),
+            "rank": ["won", "lost"],
+            "ticket type": ["single", "single"],
+            "product": ["sport", "sport"],
+            "bets": [1000, 500],
+            "wins": [2000, 0],
+            "odds": [2.0, 1.5],
+            "bookmaker": ["coolbet", "coolbet"],
+        }
+    )
+    later = rows.iloc[1:].assign(**{"market name": "late copy"})
+
+    merged = merge_histories([(rows, group_tickets(rows)), (later, group_tickets(later))])
+
+    assert len(merged) == 2
+    assert merged["market name"].isna().all()
@@ -0,0 +1,74 @@
+"""Column-wise number and date parsing of the import backends."""
+
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from imports import parsing
+from imports.parsing import parse_dates, parse_numbers
+
+
+@pytest.fixture(autouse=True)
+def empty_format_cache(monkeypatch):
+    monkeypatch.setattr(parsing, "_FORMAT_CACHE", {})
+
+
+@pytest.mark.parametrize(
+    ("values", "expected"),
+    [
+        (["€10,50", "1.234,56", "2,00"], [10.5, 1234.56, 2.0]),
+        (["1,234.56", "$7.25"], [1234.56, 7.25]),
+        (["12,345", "1,000"], [12345.0, 1000.0]),
+        (["1 234,5", " 3,75"], [1234.5, 3.75]),
+        ([2.5, "3,5", None], [2.5, 3.5, float("nan")]),
+    ],
+)
+def test_parse_numbers(values, expected):
+    parsed = parse_numbers(pd.Series(values, dtype=object))
+    pd.testing.assert_series_equal(parsed, pd.Series(expected, dtype="float64"))
+
+
+def test_parse_numbers_unparseable_becomes_nan():
+    assert parse_numbers(pd.Series(["abc", "1,5"])).isna().tolist() == [True, False]
+
+
+def dates(*values: str) -> list:
+    return [pd.Timestamp(value) for value in values]
+
+
+def test_slash_dates_read_day_first():
+    parsed = parse_dates(pd.Series(["06/02/2024 11:00", "13/02/2024 09:30"]))
+    assert parsed.tolist() == dates("2024-02-06 11:00", "2024-02-13 09:30")
+
+
+def test_localized_time_word():
+    parsed = parse_dates(pd.Series(["01.02.2023 klo 10.00.00"]), time_words=["klo"])
+    assert parsed.tolist() == dates("2023-02-01 10:00")
+
+
+def test_stray_rows_use_the_other_formats_day_first():
+    values = pd.Series(["2024-02-01 10:00:00"] * 3 + ["06.02.2024 11:00", "06-02-2024 11:00"])
+    parsed = parse_dates(values)
+    assert parsed.tolist()[-2:] == dates("2024-02-06 11:00", "2024-02-06 11:00")
+
+
+def test_inferred_column_reads_day_first():
+    parsed = parse_dates(pd.Series(["06-02-2024 11:00", "07-02-2024 12:00"]))
+    assert parsed.tolist() == dates("2024-02-06 11:00", "2024-02-07 12:00")
+
+
+def test_cached_format_is_checked_against_the_column():
+    # A format cached for the same first-value shape, but month first.
+    parsing._FORMAT_CACHE["99/99/9999 99:99"] = "%m/%d/%Y %H:%M"
+    values = pd.Series(["06/02/2024 11:00", "13/02/2024 11:00", "14/02/2024 11:00"])
+    parsed = parse_dates(values)
+    assert parsed.tolist() == dates("2024-02-06 11:00", "2024-02-13 11:00", "2024-02-14 11:00")
+    assert parsing._FORMAT_CACHE["99/99/9999 99:99"] == "%d/%m/%Y %H:%M"
+
+
+def test_unparseable_dates_coerce_or_raise():
+    values = pd.Series(["06.02.2024", "not a date"])
+    assert parse_dates(values, errors="coerce").isna().tolist() == [False, True]
+    with pytest.raises(ValueError):
+        parse_dates(values)
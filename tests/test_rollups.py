@@ -0,0 +1,61 @@
+"""Day/week/month rollups, appends and range slicing."""
+
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from analytics.rollups import build_rollups, extend_rollups, pick_granularity, slice_rollup
+
+
+def test_month_rollup_totals(tickets):
+    months = build_rollups(tickets)["month"]
+
+    assert months["period"].tolist() == list(pd.to_datetime(["2024-01-01", "2024-02-01", "2024-03-01"]))
+    assert months["Profit"].tolist() == [500, 400, -200]
+    assert months["tickets"].tolist() == [2, 1, 1]
+    assert months["singles"].tolist() == [1, 1, 1]
+    assert months["combos"].tolist() == [1, 0, 0]
+
+
+@pytest.mark.parametrize("granularity", ["day", "week", "month"])
+def test_every_rollup_adds_up_to_the_tickets(tickets, granularity):
+    table = build_rollups(tickets)[granularity]
+    assert table["bets"].sum() == tickets["bets"].sum()
+    assert table["tickets"].sum() == len(tickets)
+
+
+def test_extend_matches_a_full_rebuild(tickets):
+    extended = extend_rollups(build_rollups(tickets.iloc[:2]), tickets.iloc[2:])
+    rebuilt = build_rollups(tickets)
+    for granularity, table in rebuilt.items():
+        pd.testing.assert_frame_equal(extended[granularity], table)
+
+
+def test_slice_clips_the_first_bucket_to_the_start(tickets):
+    start = pd.Timestamp("2024-01-10")
+    sliced = slice_rollup(build_rollups(tickets), "month", start)
+
+    assert sliced["period"].tolist() == [start, pd.Timestamp("2024-02-01"), pd.Timestamp("2024-03-01")]
+    # Only the combo of 15 January is inside the range.
+    assert sliced.iloc[0][["bets", "Profit", "tickets"]].tolist() == [500, -500, 1]
+
+
+def test_slice_on_a_bucket_boundary_keeps_whole_buckets(tickets):
+    rollups = build_rollups(tickets)
+    sliced = slice_rollup(rollups, "month", pd.Timestamp("2024-02-01"))
+    pd.testing.assert_frame_equal(sliced, rollups["month"].iloc[1:])
+
+
+def test_slice_without_start_returns_the_table(tickets):
+    rollups = build_rollups(tickets)
+    assert slice_rollup(rollups, "week") is rollups["week"]
+
+
+@pytest.mark.parametrize(
+    ("days", "granularity"),
+    [(30, "day"), (120, "day"), (121, "week"), (730, "week"), (731, "month")],
+)
+def test_pick_granularity(days, granularity):
+    start = pd.Timestamp("2024-01-01")
+    assert pick_granularity(start, start + pd.Timedelta(days=days)) == granularity